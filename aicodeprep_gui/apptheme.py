@@ -152,6 +152,39 @@ def create_arrow_pixmap(direction: str, size: int = 16, color: str = "#000000")
     painter.end()
     return pixmap
 
+ARROW_COLORS = {"light": "#333333", "dark": "#DDDDDD"}
+
+def cached_arrow_pixmap_paths() -> dict:
+    """
+    Return {"light"|"dark": {"down"|"right": png_path}} for the group box arrows.
+    The PNGs are rendered once into the user cache folder and reused on later
+    launches; the color is part of the file name so a new color renders anew.
+    """
+    cache_dir = os.path.join(
+        QtCore.QStandardPaths.writableLocation(
+            QtCore.QStandardPaths.GenericCacheLocation),
+        "aicodeprep-gui", "theme")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        logging.warning(f"Could not create theme asset cache {cache_dir}: {e}")
+        return {}
+    paths = {}
+    for theme, color in ARROW_COLORS.items():
+        paths[theme] = {}
+        for direction in ("down", "right"):
+            path = os.path.join(
+                cache_dir, f"arrow_{direction}_{color.lstrip('#').lower()}.png")
+            if not os.path.exists(path):
+                # Write then rename so a concurrent launch never reads half a file
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                if not create_arrow_pixmap(direction, color=color).save(tmp_path, "PNG"):
+                    logging.warning(f"Could not write theme asset {path}")
+                    return {}
+                os.replace(tmp_path, path)
+            paths[theme][direction] = path
+    return paths
+
 def get_groupbox_style(arrow_down_path: str, arrow_right_path: str, dark: bool) -> str:
     """Generates QSS for a collapsible QGroupBox with custom arrow indicators."""
     border_color = "#555555" if dark else "#AAAAAA"
@@ -0,0 +1,213 @@
+"""
+Files that tend to change together, mined from the local git history.
+
+CoChangeIndex reads one `git log --name-only` stream and, for every pair of
+files changed in the same commit, adds up how often and how recently that
+happened. Recent commits count for more: a commit's weight doubles every
+HALF_LIFE_DAYS, measured from a fixed epoch, so weights added in later runs
+stay comparable with the old ones and the history never has to be re-read.
+The pairs are cached in the user cache directory together with the last
+commit seen; the next run only reads the commits after it.
+
+related() ranks other files by how likely they are to change when the given
+ones do: for each given file, the recency-weighted share of its commits
+that also touched the other file, summed.
+"""
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aicodeprep_gui import outbox
+
+CACHE_VERSION = 1
+HALF_LIFE_DAYS = 180
+# Commits read on the first run; older history rarely says much about today's code
+MAX_COMMITS = 20000
+# Larger commits are reformats, renames and vendor drops, not related changes
+MAX_COMMIT_FILES = 30
+# Pairs seen together fewer times than this are not suggested
+MIN_SHARED_COMMITS = 2
+GIT_TIMEOUT = 120
+
+
+def _git(cwd, *args, **kwargs):
+    kwargs.setdefault("stdout", subprocess.PIPE)
+    kwargs.setdefault("stderr", subprocess.DEVNULL)
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    return subprocess.Popen(["git", "-c", "core.quotePath=false", "-C", cwd] + list(args),
+                            stdin=subprocess.DEVNULL, text=True, encoding="utf-8",
+                            errors="replace", **kwargs)
+
+
+def _git_output(cwd, *args) -> Optional[str]:
+    try:
+        proc = _git(cwd, *args)
+        out, _ = proc.communicate(timeout=GIT_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.strip() if proc.returncode == 0 else None
+
+
+def repo_root(path: str) -> Optional[str]:
+    """The top folder of the git work tree containing path; None if there is none or no git."""
+    top = _git_output(path, "rev-parse", "--show-toplevel")
+    return os.path.normpath(top) if top else None
+
+
+class CoChangeIndex:
+    """
+    Co-change counts for one git repository. Paths are relative to its top
+    folder, with "/" separators, as git prints them.
+    """
+
+    def __init__(self, top: str, cache_path: Optional[str] = None):
+        self.top = os.path.normpath(top)
+        self.cache_path = cache_path or os.path.join(
+            outbox.user_cache_dir(), "cochange",
+            hashlib.sha1(self.top.encode("utf-8")).hexdigest()[:16] + ".json")
+        self._reset()
+
+    def _reset(self):
+        self.head = None  # last commit read
+        self.epoch = None  # commit time weights are measured from
+        self.paths: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.changes: List[float] = []  # path id -> weight of the commits that touched it
+        self.pairs: Dict[int, Dict[int, list]] = {}  # id -> other id -> [commits, weight]
+        self.commits = 0
+
+    # --- Persistence -------------------------------------------------------------
+
+    def load(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION or data.get("top") != self.top:
+            return
+        self.head, self.epoch, self.commits = data["head"], data["epoch"], data["commits"]
+        self.paths, self.changes = data["paths"], data["changes"]
+        self.ids = {path: i for i, path in enumerate(self.paths)}
+        for a, b, count, weight in data["pairs"]:
+            self.pairs.setdefault(a, {})[b] = [count, weight]
+            self.pairs.setdefault(b, {})[a] = [count, weight]
+
+    def save(self):
+        pairs = [[a, b, count, weight] for a, others in self.pairs.items()
+                 for b, (count, weight) in others.items() if a < b]
+        data = {"version": CACHE_VERSION, "top": self.top, "head": self.head, "epoch": self.epoch,
+                "commits": self.commits, "paths": self.paths, "changes": self.changes, "pairs": pairs}
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not save the co-change index: {e}")
+
+    # --- Mining -------------------------------------------------------------------
+
+    def _id(self, path):
+        i = self.ids.get(path)
+        if i is None:
+            i = self.ids[path] = len(self.paths)
+            self.paths.append(path)
+            self.changes.append(0.0)
+        return i
+
+    def add_commit(self, timestamp: int, paths: List[str]):
+        if len(paths) > MAX_COMMIT_FILES:
+            return
+        if self.epoch is None:
+            self.epoch = timestamp
+        weight = 2.0 ** ((timestamp - self.epoch) / (HALF_LIFE_DAYS * 86400))
+        ids = sorted({self._id(path) for path in paths})
+        for a in ids:
+            self.changes[a] += weight
+            others = self.pairs.setdefault(a, {})
+            for b in ids:
+                if b != a:
+                    entry = others.get(b)
+                    if entry is None:
+                        others[b] = [1, weight]
+                    else:
+                        entry[0] += 1
+                        entry[1] += weight
+        self.commits += 1
+
+    def _read_log(self, revisions) -> bool:
+        """Add the commits of one git log stream; False if git failed."""
+        try:
+            proc = _git(self.top, "log", "--no-merges", "--name-only", "--format=%x00%ct",
+                        f"--max-count={MAX_COMMITS}", revisions, "--")
+        except OSError as e:
+            logging.info(f"Co-change mining unavailable: {e}")
+            return False
+        timestamp, paths = None, []
+        # Newest commit first; the epoch is taken from the oldest one read
+        commits = []
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if line.startswith("\0"):
+                if timestamp is not None:
+                    commits.append((timestamp, paths))
+                timestamp, paths = int(line[1:] or 0), []
+            elif line:
+                paths.append(line)
+        if timestamp is not None:
+            commits.append((timestamp, paths))
+        if proc.wait() != 0:
+            return False
+        for timestamp, paths in reversed(commits):
+            self.add_commit(timestamp, paths)
+        return True
+
+    def update(self) -> bool:
+        """
+        Read the commits since the last run (the recent history on the first
+        one) and save. Returns False if the repository could not be read.
+        """
+        if self.head is None:
+            self.load()
+        head = _git_output(self.top, "rev-parse", "HEAD")
+        if head is None:
+            return False
+        if head == self.head:
+            return True
+        # Only commits that descend from the old head are new; after a branch
+        # switch, rebase or history rewrite the history is read again
+        if self.head is None or _git_output(self.top, "merge-base", "--is-ancestor",
+                                            self.head, head) is None \
+                or not self._read_log(f"{self.head}..{head}"):
+            self._reset()
+            if not self._read_log(head):
+                return False
+        self.head = head
+        self.save()
+        return True
+
+    # --- Queries -----------------------------------------------------------------
+
+    def related(self, paths: Iterable[str], limit: int = 20) -> List[Tuple[str, float, int]]:
+        """
+        Files most often changed together with paths, as (path, score,
+        shared commits), best first; paths themselves are left out.
+        """
+        given = {self.ids[path] for path in paths if path in self.ids}
+        scores, shared = {}, {}
+        for a in given:
+            total = self.changes[a]
+            for b, (count, weight) in self.pairs.get(a, {}).items():
+                if b in given or count < MIN_SHARED_COMMITS:
+                    continue
+                scores[b] = scores.get(b, 0.0) + weight / total
+                shared[b] = shared.get(b, 0) + count
+        best = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+        return [(self.paths[b], scores[b], shared[b]) for b in best]
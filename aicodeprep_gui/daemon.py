@@ -0,0 +1,509 @@
+"""
+Resident bundle daemon and its thin client.
+
+`aicp-daemon` keeps recently used projects warm: the scan of each root, the
+contents (and so token estimates) of its files, keyed by file identity so a
+changed file is never served stale. It listens on 127.0.0.1 and writes its
+port and an access token to a state file only the current user can read;
+requests without the token are refused. It holds an exclusive lock file
+while it runs, so clients starting it at the same moment get one daemon.
+
+`aicp-bundle [-d DIR] [PATTERN ...]` asks the daemon for a bundle and prints
+it (or writes it with -o), starting the daemon first if none is running.
+Patterns are gitignore-style and matched relative to the project root; with
+no patterns the files the GUI checks by default are bundled.
+
+A watcher thread polls the directory mtimes recorded at scan time and rescans
+a project when files are added, removed or renamed; edits to existing files
+are caught when the bundle is built, since every cached entry is re-validated
+with a stat.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import secrets
+import stat
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOKEN_HEADER = "X-Aicodeprep-Token"
+MAX_PROJECTS = 8
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+POLL_SECONDS = 2.0
+IDLE_TIMEOUT_SECONDS = 2 * 60 * 60
+START_TIMEOUT_SECONDS = 15.0
+
+
+def state_file_path() -> str:
+    """Where a running daemon records its port and access token."""
+    from aicodeprep_gui.outbox import user_cache_dir
+    return os.path.join(user_cache_dir(), "daemon.json")
+
+
+def lock_file_path() -> str:
+    """Held by the daemon for its whole run, so only one can start at a time."""
+    return state_file_path()[:-len(".json")] + ".lock"
+
+
+class ContentCache:
+    """Byte-bounded LRU of file contents keyed by (dev, inode, size, mtime_ns)."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+            return text
+
+    def put(self, key, text):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            if len(text) > self.max_bytes:
+                return
+            self._entries[key] = text
+            self.nbytes += len(text)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+
+class Project:
+    """The warm state of one project root: its scan and the directory mtimes it saw."""
+
+    def __init__(self, root):
+        from aicodeprep_gui.workspace import Workspace
+        self.root = root
+        self.workspace = Workspace([root])
+        self.lock = threading.Lock()
+        self.entries = []
+        self.dir_mtimes = {}
+        self.scanned_at = 0.0
+        self.last_used = time.monotonic()
+        self.stale = True
+
+    def ensure_scanned(self):
+        with self.lock:
+            if self.stale:
+                self._scan()
+
+    def _scan(self):
+        from aicodeprep_gui.smart_logic import collect_all_files
+        started = time.perf_counter()
+        entries = collect_all_files(self.root)
+        dir_mtimes = {}
+        for abs_path in [self.root] + [e[0] for e in entries]:
+            try:
+                st = os.stat(abs_path)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                dir_mtimes[abs_path] = st.st_mtime_ns
+        self.entries = [e for e in entries if e[0] not in dir_mtimes]
+        self.dir_mtimes = dir_mtimes
+        self.scanned_at = time.time()
+        self.stale = False
+        logging.info(f"Scanned {self.root}: {len(self.entries)} files in "
+                     f"{(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def check_fresh(self) -> bool:
+        """Compare the recorded directory mtimes with the disk; mark stale on any change."""
+        for dir_path, mtime_ns in list(self.dir_mtimes.items()):
+            try:
+                if os.stat(dir_path).st_mtime_ns != mtime_ns:
+                    break
+            except OSError:
+                break
+        else:
+            return True
+        self.stale = True
+        return False
+
+    def select(self, patterns):
+        """Files matching the gitignore-style patterns, or the default-checked ones."""
+        if not patterns:
+            return [abs_path for abs_path, _, checked in self.entries if checked]
+        from pathspec import PathSpec
+        from pathspec.patterns import GitWildMatchPattern
+        spec = PathSpec.from_lines(GitWildMatchPattern, patterns)
+        return [abs_path for abs_path, rel_path, _ in self.entries
+                if spec.match_file(rel_path.replace(os.sep, '/'))]
+
+
+class BundleDaemon:
+    def __init__(self, max_projects=MAX_PROJECTS, idle_timeout=IDLE_TIMEOUT_SECONDS):
+        self.max_projects = max_projects
+        self.idle_timeout = idle_timeout
+        self.projects = OrderedDict()
+        self.contents = ContentCache()
+        self.token = secrets.token_hex(16)
+        self.last_request = time.monotonic()
+        self._projects_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.server = None
+
+    def project(self, root) -> Project:
+        root = os.path.abspath(root)
+        with self._projects_lock:
+            project = self.projects.get(root)
+            if project is None:
+                project = self.projects[root] = Project(root)
+                while len(self.projects) > self.max_projects:
+                    evicted, _ = self.projects.popitem(last=False)
+                    logging.info(f"Dropped {evicted} from the warm set")
+            self.projects.move_to_end(root)
+        project.last_used = time.monotonic()
+        return project
+
+    def bundle(self, request: dict) -> dict:
+        from aicodeprep_gui.file_processor import _file_identity, write_bundle
+        started = time.perf_counter()
+        root = request.get("root")
+        if not root or not os.path.isdir(root):
+            raise ValueError(f"Not a directory: {root!r}")
+        project = self.project(root)
+        project.ensure_scanned()
+        files = project.select(request.get("patterns") or [])
+
+        # Pre-fill the writer's read cache from the warm contents, then keep what it read
+        read_cache = {}
+        hits = 0
+        for file_path in files:
+            try:
+                key = _file_identity(file_path)
+            except OSError:
+                continue
+            text = self.contents.get(key)
+            hits += text is not None
+            read_cache[key] = [text]
+        out = io.StringIO()
+        write_bundle(out, files, request.get("format", "xml"), request.get("prompt", ""),
+                     bool(request.get("prompt_to_top", False)),
+                     bool(request.get("prompt_to_bottom", True)),
+                     ws=project.workspace, read_cache=read_cache)
+        for key, (text,) in read_cache.items():
+            if text is not None:
+                self.contents.put(key, text)
+        output = out.getvalue()
+        return {
+            "output": output,
+            "files": len(files),
+            "tokens": len(output) // 4,
+            "cache_hits": hits,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "projects": [{"root": p.root, "files": len(p.entries), "stale": p.stale,
+                          "scanned_at": p.scanned_at}
+                         for p in list(self.projects.values())],
+            "cached_files": len(self.contents),
+            "cached_bytes": self.contents.nbytes,
+        }
+
+    def _watch(self):
+        """Rescan projects whose directories changed, so the next bundle is already warm."""
+        while not self._stop.wait(POLL_SECONDS):
+            for project in list(self.projects.values()):
+                if not project.stale and not project.check_fresh():
+                    logging.info(f"Change detected under {project.root}; rescanning")
+                    try:
+                        project.ensure_scanned()
+                    except Exception as e:
+                        logging.error(f"Rescan of {project.root} failed: {e}")
+            if self.idle_timeout and time.monotonic() - self.last_request > self.idle_timeout:
+                logging.info("Idle timeout reached; shutting down")
+                self.stop()
+
+    def stop(self):
+        self._stop.set()
+        if self.server is not None:
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def serve(self, port=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(self))
+        self.server.daemon_threads = True
+        state_path = state_file_path()
+        _write_state(state_path, {"pid": os.getpid(),
+                                  "port": self.server.server_address[1],
+                                  "token": self.token})
+        logging.info(f"Bundle daemon listening on 127.0.0.1:{self.server.server_address[1]}")
+        threading.Thread(target=self._watch, name="aicp-watcher", daemon=True).start()
+        try:
+            self.server.serve_forever(poll_interval=0.5)
+        finally:
+            self._stop.set()
+            self.server.server_close()
+            try:
+                with open(state_path, encoding="utf-8") as f:
+                    if json.load(f).get("pid") == os.getpid():
+                        os.remove(state_path)
+            except (OSError, ValueError):
+                pass
+
+
+def _write_state(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _acquire_lock() -> bool:
+    """
+    Create the lock file exclusively. A lock left by a daemon that crashed is
+    taken over once it is older than the start timeout and nothing answers.
+    """
+    path = lock_file_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    owner = f.read()
+                age = time.time() - os.path.getmtime(path)
+            except OSError:
+                continue  # released meanwhile
+            if age < START_TIMEOUT_SECONDS or _running_daemon() is not None:
+                return False
+            logging.info(f"Removing stale daemon lock (pid {owner or '?'})")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    if f.read() == owner:
+                        os.remove(path)
+            except OSError:
+                pass
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def _release_lock():
+    path = lock_file_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == str(os.getpid()):
+                os.remove(path)
+    except OSError:
+        pass
+
+
+def _make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            logging.debug("%s - %s", self.address_string(), fmt % args)
+
+        def _reply(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self):
+            if secrets.compare_digest(self.headers.get(TOKEN_HEADER, ""), daemon.token):
+                daemon.last_request = time.monotonic()
+                return True
+            self._reply(403, {"error": "bad or missing token"})
+            return False
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if self.path == "/status":
+                self._reply(200, daemon.status())
+            else:
+                self._reply(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/bundle":
+                    self._reply(200, daemon.bundle(request))
+                elif self.path == "/shutdown":
+                    self._reply(200, {"stopping": True})
+                    daemon.stop()
+                else:
+                    self._reply(404, {"error": f"unknown path {self.path}"})
+            except ValueError as e:
+                self._reply(400, {"error": str(e)})
+            except Exception as e:
+                logging.exception("Request failed")
+                self._reply(500, {"error": str(e)})
+
+    return Handler
+
+
+# --- Thin client ---
+
+def _read_state():
+    try:
+        with open(state_file_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _call(state, method, path, payload=None, timeout=300):
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(f"http://127.0.0.1:{state['port']}{path}",
+                                 data=data, method=method,
+                                 headers={TOKEN_HEADER: state["token"],
+                                          "Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.load(resp)
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.load(e).get("error", str(e))
+        except ValueError:
+            message = str(e)
+        raise RuntimeError(message) from None
+
+
+def _running_daemon():
+    state = _read_state()
+    if state is None:
+        return None
+    try:
+        _call(state, "GET", "/status", timeout=2)
+        return state
+    except (OSError, RuntimeError):
+        return None
+
+
+def _start_daemon():
+    """Start a detached daemon and wait until it answers."""
+    kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL,
+              "stderr": subprocess.DEVNULL}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen([sys.executable, "-m", "aicodeprep_gui.daemon"], **kwargs)
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        state = _running_daemon()
+        if state is not None:
+            return state
+    return None
+
+
+def client_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="aicp-bundle",
+        description="Bundle files through the resident aicodeprep-gui daemon (started on demand).")
+    parser.add_argument("patterns", nargs="*",
+                        help="gitignore-style patterns relative to the project root "
+                             "(default: the files the GUI checks by default)")
+    parser.add_argument("-d", "--directory", default=".",
+                        help="Project root (default: current directory)")
+    parser.add_argument("-o", "--output",
+                        help="Write the bundle to this file instead of stdout")
+    parser.add_argument("-f", "--format", choices=("xml", "markdown"), default="xml")
+    parser.add_argument("-p", "--prompt", default="", help="Prompt appended to the bundle")
+    parser.add_argument("--prompt-top", action="store_true",
+                        help="Put the prompt at the top instead of the bottom")
+    parser.add_argument("--status", action="store_true", help="Show the daemon's warm projects")
+    parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    args = parser.parse_args(argv)
+
+    if args.stop or args.status:
+        state = _running_daemon()
+        if state is None:
+            print("No daemon running.")
+            return 0 if args.stop else 1
+        if args.stop:
+            _call(state, "POST", "/shutdown", {})
+            print("Daemon stopped.")
+        else:
+            print(json.dumps(_call(state, "GET", "/status"), indent=2))
+        return 0
+
+    state = _running_daemon() or _start_daemon()
+    if state is None:
+        print("Could not start the aicodeprep-gui daemon.", file=sys.stderr)
+        return 1
+    try:
+        result = _call(state, "POST", "/bundle", {
+            "root": os.path.abspath(args.directory),
+            "patterns": args.patterns,
+            "format": args.format,
+            "prompt": args.prompt,
+            "prompt_to_top": args.prompt_top,
+            "prompt_to_bottom": not args.prompt_top,
+        })
+    except (OSError, RuntimeError) as e:
+        print(f"Bundle failed: {e}", file=sys.stderr)
+        return 1
+    summary = (f"{result['files']} files, ~{result['tokens']} tokens "
+               f"in {result['elapsed_ms']} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(result["output"])
+        print(f"Wrote {args.output}: {summary}", file=sys.stderr)
+    else:
+        sys.stdout.write(result["output"])
+        print(f"\n{summary}", file=sys.stderr)
+    return 0
+
+
+def daemon_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="aicp-daemon",
+        description="Run the resident aicodeprep-gui bundle daemon in the foreground.")
+    parser.add_argument("--port", type=int, default=0,
+                        help="Port on 127.0.0.1 (default: any free port)")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT_SECONDS / 60,
+                        help="Exit after this many idle minutes; 0 to never exit (default: 120)")
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable debug logging")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    # Two clients finding no daemon may both start one; only the first gets the lock
+    if not _acquire_lock():
+        print("A daemon is already running or starting.", file=sys.stderr)
+        return 1
+    try:
+        if _running_daemon() is not None:
+            print("A daemon is already running.", file=sys.stderr)
+            return 1
+        BundleDaemon(idle_timeout=args.idle_timeout * 60).serve(args.port)
+    finally:
+        _release_lock()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(daemon_main())
@@ -0,0 +1,515 @@
+"""
+Data files as a summary: their shape, the first few records and a count.
+
+A CSV export, a JSON dump or a lock file can cost more tokens than all the
+code that reads it, and past the first few records it tells a model little.
+summarize() streams the file and writes instead: the columns and their types
+for delimited files, the key structure for JSON, JSON Lines and YAML, the
+packages of a lock file; then the first records and how many there are.
+Memory is bounded by the sample, whatever the size of the file.
+
+Types and structure come from the first records (INFER_RECORDS of them, and
+the first SHAPE_ITEMS items of nested arrays); counts cover the whole file.
+Row and line counts are newline counts made on raw bytes, so a CSV with
+line breaks inside quoted fields is marked as approximate.
+"""
+import csv
+import io
+import json
+import os
+import re
+
+from aicodeprep_gui.jsonscan import Scanner
+
+# Extension -> kind of data file
+DATA_KINDS = {
+    ".csv": "csv", ".tsv": "tsv",
+    ".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl",
+    ".yaml": "yaml", ".yml": "yaml",
+    ".lock": "lock",
+}
+DEFAULT_SAMPLE_ROWS = 5
+INFER_RECORDS = 1000
+SHAPE_ITEMS = 100
+WALK_BUDGET = 200000     # JSON values walked for the structure, per file
+MAX_DEPTH = 8
+MAX_KEYS = 50            # distinct keys tracked per object
+SHOWN_KEYS = 20          # keys listed per object in the structure
+MAP_KEYS = 3             # listed for an object with more than SHOWN_KEYS (a map, not a record)
+MAX_STRUCTURE_LINES = 150
+MAX_LINE_CHARS = 64 * 1024
+MAX_SAMPLE_CHARS = 300   # per sample record
+SAMPLE_KEYS, SAMPLE_ITEMS, SAMPLE_STRING = 10, 3, 80
+COUNT_CHUNK = 1024 * 1024
+
+_INT = re.compile(r"[+-]?\d+\Z")
+_FLOAT = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?\Z")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}\Z")
+_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+_BOOLS = {"true", "false", "yes", "no"}
+_YAML_KEY = re.compile(r"( *)(- +)?((?:\"[^\"]*\"|'[^']*'|[^\s#'\"\-:][^:#]*?|-[^\s:][^:#]*?)) *:(?: |$)")
+_TOML_STRING = re.compile(r'(name|version) = "([^"]*)"')
+_YARN_VERSION = re.compile(r' +version:? +"?([^"\s]+)')
+_GEM_SPEC = re.compile(r" {4}(\S+) \(([^)]+)\)$")
+
+
+def kind_of(path: str):
+    """The kind of data file path is ("csv", "json", ...), or None."""
+    return DATA_KINDS.get(os.path.splitext(path)[1].lower())
+
+
+def _clip(text, limit=MAX_SAMPLE_CHARS):
+    return text if len(text) <= limit else text[:limit] + " ..."
+
+
+def _count_lines(abs_path):
+    """(newlines, whether the last line lacks one), counted on raw bytes."""
+    count, last = 0, b"\n"
+    with open(abs_path, "rb") as f:
+        for chunk in iter(lambda: f.read(COUNT_CHUNK), b""):
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+    return count, last != b"\n"
+
+
+def _lines(stream, limit):
+    """The first lines of a text stream; longer lines are cut at MAX_LINE_CHARS."""
+    for _ in range(limit):
+        line = stream.readline(MAX_LINE_CHARS)
+        if not line:
+            return
+        if not line.endswith("\n"):
+            while True:  # step over the rest of an overlong line
+                rest = stream.readline(MAX_LINE_CHARS)
+                if not rest or rest.endswith("\n"):
+                    break
+        yield line.rstrip("\r\n")
+
+
+# --- delimited files -----------------------------------------------------------
+
+def _cell_type(value):
+    value = value.strip()
+    if not value:
+        return None
+    if _INT.match(value):
+        return "int"
+    if _FLOAT.match(value):
+        return "float"
+    if value.lower() in _BOOLS:
+        return "bool"
+    if _DATETIME.match(value):
+        return "datetime"
+    if _DATE.match(value):
+        return "date"
+    return "text"
+
+
+def _column_type(types, empty):
+    if not types:
+        return "empty"
+    if len(types) == 1:
+        label = next(iter(types))
+    elif types <= {"int", "float"}:
+        label = "float"
+    elif types <= {"date", "datetime"}:
+        label = "datetime"
+    else:
+        label = "text"
+    return label + (" (some empty)" if empty else "")
+
+
+def _summarize_delimited(abs_path, kind, sample_rows):
+    with open(abs_path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        head = f.read(64 * 1024)
+        delimiter = "\t" if kind == "tsv" else ","
+        if kind == "csv":
+            try:
+                delimiter = csv.Sniffer().sniff(head, delimiters=",;\t|").delimiter
+            except csv.Error:
+                pass
+        f.seek(0)
+        reader = csv.reader(f, delimiter=delimiter)
+        try:
+            rows = [row for _, row in zip(range(INFER_RECORDS + 1), reader)]
+        except csv.Error as e:
+            raise ValueError(str(e)) from e
+    if not rows:
+        return ["Empty file."]
+    header = rows[0]
+    has_header = not any(_cell_type(cell) in ("int", "float") for cell in header)
+    records = rows[1:] if has_header else rows
+    width = max(len(row) for row in rows)
+    names = list(header) if has_header else []
+    names += [f"column {i + 1}" for i in range(len(names), width)]
+    types = [set() for _ in range(width)]
+    empty = [False] * width
+    multiline = False
+    for row in records:
+        for i, cell in enumerate(row):
+            multiline = multiline or "\n" in cell
+            cell_type = _cell_type(cell)
+            if cell_type is None:
+                empty[i] = True
+            else:
+                types[i].add(cell_type)
+        for i in range(len(row), width):
+            empty[i] = True
+
+    newlines, unterminated = _count_lines(abs_path)
+    total = newlines + unterminated - (1 if has_header else 0)
+    lines = [f"Rows: {'about ' if multiline else ''}{total:,}" + (" (plus a header)" if has_header else "")]
+    lines.append(f"Columns ({width}; types from the first {len(records):,} rows):")
+    lines.extend(f"  {name}: {_column_type(types[i], empty[i])}" for i, name in enumerate(names))
+    lines.append(f"First {min(sample_rows, len(records))} rows:")
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+    for row in ([header] if has_header else []) + records[:sample_rows]:
+        out.seek(0)
+        out.truncate()
+        writer.writerow(row)
+        lines.append(_clip(out.getvalue().rstrip("\n")))
+    return lines
+
+
+# --- JSON ----------------------------------------------------------------------
+
+class _Shape:
+    """What the values seen at one place in a document look like."""
+    __slots__ = ("types", "seen", "objects", "keys", "max_keys", "items", "max_items")
+
+    def __init__(self):
+        self.types = set()
+        self.seen = 0
+        self.objects = 0
+        self.keys = {}
+        self.max_keys = 0
+        self.items = None
+        self.max_items = 0
+
+
+_PEEKED_TYPES = {"{": "object", "[": "array", '"': "string", "t": "bool", "f": "bool", "n": "null"}
+
+
+def _walk(scanner, shape, depth, keep, budget):
+    """
+    Read the next value into shape. Returns a clipped copy of it if keep,
+    for the sample. budget is a one-item list: values left to walk.
+    """
+    char = scanner.peek()
+    if not keep and (depth >= MAX_DEPTH or budget[0] <= 0):
+        shape.types.add(_PEEKED_TYPES.get(char, "number"))
+        scanner.skip()
+        return None
+    budget[0] -= 1
+    shape.seen += 1
+    if char == "{":
+        shape.types.add("object")
+        shape.objects += 1
+        sample, count = ({} if keep else None), 0
+        for key in scanner.items():
+            count += 1
+            child = shape.keys.get(key)
+            if child is None and len(shape.keys) < MAX_KEYS:
+                child = shape.keys[key] = _Shape()
+            keep_child = keep and count <= SAMPLE_KEYS
+            if child is None and not keep_child:
+                scanner.skip()
+                continue
+            value = _walk(scanner, child or _Shape(), depth + 1, keep_child, budget)
+            if keep_child:
+                sample[key] = value
+        shape.max_keys = max(shape.max_keys, count)
+        if keep and count > SAMPLE_KEYS:
+            sample["..."] = f"{count - SAMPLE_KEYS} more keys"
+        return sample
+    if char == "[":
+        shape.types.add("array")
+        if shape.items is None:
+            shape.items = _Shape()
+        sample, count = ([] if keep else None), 0
+        for _ in scanner.elements():
+            count += 1
+            keep_item = keep and count <= SAMPLE_ITEMS
+            if not keep_item and count > SHAPE_ITEMS:
+                scanner.skip()
+                count += scanner.count_rest()
+                break
+            value = _walk(scanner, shape.items, depth + 1, keep_item, budget)
+            if keep_item:
+                sample.append(value)
+        shape.max_items = max(shape.max_items, count)
+        if keep and count > SAMPLE_ITEMS:
+            sample.append(f"... {count - SAMPLE_ITEMS} more")
+        return sample
+    if char == '"':
+        shape.types.add("string")
+        if keep:
+            text, cut = scanner.string(SAMPLE_STRING)
+            return text + "..." if cut else text
+        scanner.skip()
+        return None
+    if not char:
+        raise ValueError("unexpected end of file")
+    text = scanner.scalar()
+    if text in ("true", "false"):
+        shape.types.add("bool")
+    elif text == "null":
+        shape.types.add("null")
+    else:
+        shape.types.add("int" if _INT.match(text) else "number")
+    return json.loads(text) if keep else None
+
+
+def _type_label(shape):
+    types = set(shape.types)
+    if {"int", "number"} <= types:
+        types.discard("int")
+    order = ["object", "array", "string", "int", "number", "bool", "null"]
+    labels = []
+    for name in sorted(types, key=order.index):
+        if name == "array" and shape.items is not None and shape.items.types:
+            labels.append(f"array of {_type_label(shape.items)} (up to {shape.max_items:,} items)")
+        else:
+            labels.append(name)
+    return " | ".join(labels) or "empty"
+
+
+def _structure(shape, name, indent, lines):
+    if len(lines) >= MAX_STRUCTURE_LINES:
+        return
+    lines.append(f"{'  ' * indent}{name}: {_type_label(shape)}")
+    _children(shape, indent, lines)
+
+
+def _children(shape, indent, lines):
+    shown = MAP_KEYS if shape.max_keys > SHOWN_KEYS else SHOWN_KEYS
+    for i, (key, child) in enumerate(shape.keys.items()):
+        if i == shown or len(lines) >= MAX_STRUCTURE_LINES:
+            lines.append(f"{'  ' * (indent + 1)}... (up to {shape.max_keys:,} keys)")
+            break
+        optional = " (optional)" if child.seen < shape.objects else ""
+        _structure(child, json.dumps(key, ensure_ascii=False)[1:-1] + optional, indent + 1, lines)
+    items = shape.items
+    if items is not None and (items.keys or (items.items is not None and items.items.types)):
+        _structure(items, "[]", indent + 1, lines)
+
+
+def _dump(value):
+    return _clip(json.dumps(value, ensure_ascii=False))
+
+
+def _summarize_json_document(scanner, sample_rows):
+    """Lines describing the JSON value the scanner is at."""
+    shape, budget = _Shape(), [WALK_BUDGET]
+    char = scanner.peek()
+    lines = []
+    if char == "[":
+        shape.types.add("array")
+        shape.items = _Shape()
+        samples, count = [], 0
+        for _ in scanner.elements():
+            count += 1
+            keep = count <= sample_rows
+            if not keep and count > INFER_RECORDS:
+                scanner.skip()
+                count += scanner.count_rest()
+                break
+            value = _walk(scanner, shape.items, 1, keep, budget)
+            if keep:
+                samples.append(value)
+        shape.max_items = count
+        lines.append(f"Top level: array of {count:,} items")
+        if shape.items.types:
+            lines.append(f"Items (structure from the first {min(count, INFER_RECORDS):,}): "
+                         f"{_type_label(shape.items)}")
+            _children(shape.items, 0, lines)
+        lines.append(f"First {len(samples)} items:")
+        lines.extend("  " + _dump(value) for value in samples)
+    elif char == "{":
+        shape.types.add("object")
+        shape.seen = shape.objects = 1
+        samples, count = [], 0
+        for key in scanner.items():
+            count += 1
+            keep = count <= sample_rows
+            child = shape.keys.get(key)
+            if child is None and len(shape.keys) < MAX_KEYS:
+                child = shape.keys[key] = _Shape()
+            if child is None and not keep:
+                scanner.skip()
+                continue
+            value = _walk(scanner, child or _Shape(), 1, keep, budget)
+            if keep:
+                samples.append((key, value))
+        shape.max_keys = count
+        lines.append(f"Top level: object with {count:,} keys")
+        lines.append("Structure:")
+        _children(shape, 0, lines)
+        lines.append(f"First {len(samples)} keys:")
+        lines.extend(f"  {json.dumps(key, ensure_ascii=False)}: {_dump(value)}" for key, value in samples)
+    else:
+        lines.append(f"Value: {_dump(_walk(scanner, shape, 0, True, budget))}")
+    return lines
+
+
+def _summarize_json(abs_path, sample_rows):
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        scanner = Scanner(f)
+        if not scanner.peek():
+            return ["Empty file."]
+        return _summarize_json_document(scanner, sample_rows)
+
+
+def _summarize_json_lines(abs_path, sample_rows):
+    shape, budget = _Shape(), [WALK_BUDGET]
+    samples, records = [], 0
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in _lines(f, INFER_RECORDS):
+            if not line.strip():
+                continue
+            records += 1
+            keep = records <= sample_rows
+            try:
+                value = _walk(Scanner(io.StringIO(line)), shape, 0, keep, budget)
+            except ValueError:
+                continue  # cut at MAX_LINE_CHARS, or not JSON
+            if keep:
+                samples.append(value)
+    newlines, unterminated = _count_lines(abs_path)
+    lines = [f"Records: {newlines + unterminated:,} lines",
+             f"Records (structure from the first {records:,}): {_type_label(shape)}"]
+    _children(shape, 0, lines)
+    lines.append(f"First {len(samples)} records:")
+    lines.extend("  " + _dump(value) for value in samples)
+    return lines
+
+
+# --- YAML and lock files ---------------------------------------------------------
+
+def _summarize_yaml(abs_path, sample_rows):
+    """Key outline from indentation; YAML is not parsed (there is no parser in the standard library)."""
+    paths, stack = {}, []  # stack: (indent, path)
+    documents, entries, sample = 1, 0, []
+    scanned = INFER_RECORDS * 5
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        for number, line in enumerate(_lines(f, scanned)):
+            stripped = line.strip()
+            if line.startswith("---"):
+                documents += number > 0
+                stack = []
+                continue
+            if not stripped or stripped.startswith("#"):
+                continue
+            if not line[0].isspace():
+                entries += 1
+            if entries <= sample_rows and len(sample) < sample_rows * 8:
+                sample.append(_clip(line))
+            match = _YAML_KEY.match(line)
+            if not match:
+                continue
+            indent = len(match.group(1))
+            key = match.group(3).strip("\"'")
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            parent = stack[-1][1] if stack else ()
+            if match.group(2):
+                parent += ("-",)
+                stack.append((indent, parent))
+                indent += len(match.group(2))
+            path = parent + (key,)
+            stack.append((indent, path))
+            if len(paths) < MAX_STRUCTURE_LINES:
+                for i in range(1, len(path) + 1):
+                    paths.setdefault(path[:i], None)
+    newlines, unterminated = _count_lines(abs_path)
+    lines = [f"Lines: {newlines + unterminated:,}"]
+    if documents > 1:
+        lines.append(f"Documents: {documents:,}")
+    lines.append(f"Keys (from the first {scanned:,} lines):")
+    lines.extend("  " * len(path) + path[-1] for path in paths)
+    lines.append(f"First {min(entries, sample_rows)} top-level entries:")
+    lines.extend(sample)
+    return lines
+
+
+def _lock_packages(stream):
+    """(name, version) of each package in a TOML, yarn or Gemfile lock, read line by line."""
+    entry, toml = None, False
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if line == "[[package]]":  # poetry.lock, Cargo.lock, uv.lock
+            if entry:
+                yield entry
+            entry, toml = {}, True
+        elif toml:
+            if entry is None:
+                continue
+            if not line or line.startswith("["):
+                yield entry
+                entry = None
+            else:
+                match = _TOML_STRING.match(line)
+                if match:
+                    entry.setdefault(match.group(1), match.group(2))
+        elif line and not line[0].isspace() and line.endswith(":") and not line.startswith(("#", "__")):
+            spec = line[:-1].split(",")[0].strip().strip('"')  # yarn.lock
+            at = spec.rfind("@")
+            entry = {"name": spec[:at] if at > 0 else spec}
+        elif entry is not None:
+            match = _YARN_VERSION.match(line)
+            if match:
+                entry["version"] = match.group(1)
+                yield entry
+                entry = None
+        else:
+            match = _GEM_SPEC.match(line)  # Gemfile.lock
+            if match:
+                yield {"name": match.group(1), "version": match.group(2)}
+    if entry:
+        yield entry
+
+
+def _summarize_lock(abs_path, sample_rows):
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        scanner = Scanner(f)
+        if scanner.peek() in ("{", "["):  # composer.lock, Pipfile.lock
+            return _summarize_json_document(scanner, sample_rows)
+    count, first = 0, []
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        for package in _lock_packages(f):
+            if "name" not in package:
+                continue
+            count += 1
+            if len(first) < sample_rows:
+                first.append(f"  {package['name']} {package.get('version', '')}".rstrip())
+    newlines, unterminated = _count_lines(abs_path)
+    if not count:
+        with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+            head = [_clip(line) for line in _lines(f, sample_rows * 4)]
+        return [f"Lines: {newlines + unterminated:,}", f"First {len(head)} lines:"] + head
+    return [f"Packages: {count:,}", f"First {len(first)}:"] + first + [f"Lines: {newlines + unterminated:,}"]
+
+
+_SUMMARIZERS = {
+    "csv": lambda path, rows: _summarize_delimited(path, "csv", rows),
+    "tsv": lambda path, rows: _summarize_delimited(path, "tsv", rows),
+    "json": _summarize_json,
+    "jsonl": _summarize_json_lines,
+    "yaml": _summarize_yaml,
+    "lock": _summarize_lock,
+}
+
+
+def summarize(abs_path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> str:
+    """
+    The summary of a data file, as text for the bundle. Raises ValueError
+    if the file is not a data file or cannot be parsed as its kind.
+    """
+    kind = kind_of(abs_path)
+    if kind is None:
+        raise ValueError(f"not a data file: {abs_path}")
+    size = os.path.getsize(abs_path)
+    lines = [f"[{kind.upper()} data file, {size:,} bytes, summarized: structure, first records and counts]"]
+    lines.extend(_SUMMARIZERS[kind](abs_path, sample_rows))
+    return "\n".join(lines)
@@ -1,82 +1,240 @@
+import hashlib
 import os
 import sys
 import logging
-from typing import List, Literal
+from typing import Dict, List, Literal
+
+from aicodeprep_gui import tracing, workspace
 
 OutputFmt = Literal['xml', 'markdown']
 
-def _write_one_file_xml(outfile, rel_path, abs_path, skip_binfiles=None):
+# Per-file output levels (the Pro Level column); files without one get the
+# default for their type and size
+LEVEL_FULL = "full"
+LEVEL_SUMMARY = "summary"
+
+# Bytes hashed to tell apart same-sized copies in different workspace roots
+HEAD_HASH_BYTES = 4096
+
+def _file_identity(abs_path):
+    st = os.stat(abs_path)
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+def _read_text(abs_path, read_cache=None):
+    """
+    Read a file as text. read_cache maps file identity to a one-item list
+    holding the contents (None until read) for files that appear more than
+    once in a bundle, e.g. through overlapping workspace roots or links.
+    Files with the same contents share the list, so each is read only once.
+    """
+    if read_cache is not None:
+        slot = read_cache.get(_file_identity(abs_path))
+        if slot is not None:
+            if slot[0] is None:
+                with open(abs_path, "r", encoding="utf-8", errors="ignore") as infile:
+                    slot[0] = infile.read()
+            return slot[0]
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as infile:
+        return infile.read()
+
+def _file_text(abs_path, read_cache=None, root_dir=None, level=None):
+    """
+    A file's contents as they go into the bundle: whole, or as a head-and-tail
+    excerpt when it is over its size limit. None if it is left out for size.
+    Notebooks are rendered to their source whatever their size, since most
+    of a large notebook is outputs. Data files are summarized at
+    LEVEL_SUMMARY, or by default when over [data_files] summarize_over.
+    """
+    if abs_path.endswith(".ipynb"):
+        text = notebook_text(abs_path, root_dir)
+        if text is not None:
+            return text
+    size = os.path.getsize(abs_path)
+    if level == LEVEL_SUMMARY or (level is None and summarizes(abs_path, size, root_dir)):
+        text = data_file_summary(abs_path, root_dir)
+        if text is not None:
+            return text
+    cut = size_policy(abs_path, size, root_dir)
+    if cut is False:
+        return None
+    if cut:
+        # Bounded reads; not worth keeping in the read cache
+        return truncation.head_tail(abs_path, *cut, size=size)
+    return _read_text(abs_path, read_cache)
+
+def _write_one_file_xml(outfile, rel_path, abs_path, skip_binfiles=None, read_cache=None, root_dir=None,
+                        level=None):
     if is_binary_file(abs_path):
         if skip_binfiles is not None:
             skip_binfiles.append(rel_path)
         return
     outfile.write(f"{rel_path}:\n<code>\n")
     try:
-        with open(abs_path, "r", encoding="utf-8", errors="ignore") as infile:
-            outfile.write(infile.read())
+        text = _file_text(abs_path, read_cache, root_dir, level)
+        outfile.write(text if text is not None else ".. contents skipped (over max_file_size) ..")
     except Exception:
         outfile.write(".. contents skipped (read error) ..")
     outfile.write("\n</code>\n\n")
 
-from aicodeprep_gui.smart_logic import is_binary_file
+from aicodeprep_gui import truncation
+from aicodeprep_gui.smart_logic import (data_file_summary, is_binary_file, notebook_text, size_policy,
+                                        summarizes)
 
-def _write_one_file_md(outfile, rel_path, abs_path, skip_binfiles=None):
+def _write_one_file_md(outfile, rel_path, abs_path, skip_binfiles=None, read_cache=None, root_dir=None,
+                       level=None):
     if is_binary_file(abs_path):
         if skip_binfiles is not None:
             skip_binfiles.append(rel_path)
         return
     outfile.write(f"### START OF FILE {rel_path} ###\n")
     try:
-        with open(abs_path, "r", encoding="utf-8", errors="ignore") as infile:
-            outfile.write(infile.read())
+        text = _file_text(abs_path, read_cache, root_dir, level)
+        outfile.write(text if text is not None else ".. contents skipped (over max_file_size) ..\n")
     except Exception:
         outfile.write(".. contents skipped (read error) ..\n")
     outfile.write(f"\n### END OF FILE {rel_path} ###\n\n")
 
+def _content_hash(abs_path, limit=None):
+    digest = hashlib.sha1()
+    with open(abs_path, "rb") as f:
+        if limit is not None:
+            digest.update(f.read(limit))
+        else:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.digest()
+
+def _same_contents(keys, paths, limit=None):
+    """Groups of two or more identities whose files hash the same (on their first limit bytes)."""
+    groups = {}
+    for key in keys:
+        try:
+            groups.setdefault(_content_hash(paths[key], limit), []).append(key)
+        except OSError:
+            pass
+    return [group for group in groups.values() if len(group) > 1]
+
+def _shared_read_cache(file_paths, ws=None):
+    """
+    Cache slots (identity -> [None] until read) for files selected more than
+    once, and for copies with the same contents under different workspace
+    roots. Copies are found among files of the same name and size in
+    different roots, by a hash of their head and then of the whole file.
+    """
+    ws = ws or workspace.current()
+    slots, seen = {}, {}
+    candidates = {}  # (name, size) -> {root: identity}
+    for file_path in file_paths:
+        try:
+            key = _file_identity(file_path)
+        except OSError:
+            continue
+        if key in seen:
+            slots.setdefault(key, [None])
+            continue
+        seen[key] = file_path
+        if ws.multi_root and key[2] > 0:
+            candidates.setdefault((os.path.basename(file_path), key[2]), {}).setdefault(
+                ws.root_of(file_path), key)
+    for (_, size), keys in candidates.items():
+        if len(keys) < 2:
+            continue
+        for heads in _same_contents(keys.values(), seen, HEAD_HASH_BYTES):
+            # Matching heads of longer files still need a full hash to tell
+            for copies in [heads] if size <= HEAD_HASH_BYTES else _same_contents(heads, seen):
+                slot = next((slots[key] for key in copies if key in slots), [None])
+                for key in copies:
+                    slots[key] = slot
+    return slots or None
+
+def write_bundle(
+    outfile,
+    selected_files: List[str],
+    fmt: OutputFmt = 'xml',
+    prompt: str = "",
+    prompt_to_top: bool = False,
+    prompt_to_bottom: bool = True,
+    ws=None,
+    read_cache=None,
+    levels: Dict[str, str] = None,
+    duplicates: Dict[str, str] = None
+):
+    """
+    Write the bundle for selected_files to an open text stream. Paths are
+    labelled relative to ws (default: the current workspace). read_cache is
+    as for _read_text; by default only files selected twice are cached.
+    levels maps file paths to LEVEL_FULL or LEVEL_SUMMARY. duplicates maps
+    files to leave out to the near-identical file included in their place;
+    they are listed at the end instead.
+    """
+    levels = levels or {}
+    duplicates = duplicates or {}
+    skip_binfiles = []
+    skip_duplicates = []
+    writer = _write_one_file_xml if fmt == 'xml' else _write_one_file_md
+    ws = ws or workspace.current()
+    if read_cache is None:
+        read_cache = _shared_read_cache(selected_files, ws)
+
+    # Write prompt at the top if requested
+    if prompt and prompt_to_top:
+        outfile.write(prompt.strip() + "\n\n")
+
+    def label(file_path):
+        try:
+            return ws.display_path(file_path)
+        except ValueError:
+            return file_path
+
+    for file_path in selected_files:
+        try:
+            rel_path = label(file_path)
+            if file_path in duplicates:
+                skip_duplicates.append((rel_path, label(duplicates[file_path])))
+                continue
+            writer(outfile, rel_path, file_path, skip_binfiles=skip_binfiles,
+                   read_cache=read_cache, root_dir=ws.root_of(file_path), level=levels.get(file_path))
+            logging.info(f"Processed: {rel_path}")
+        except Exception as exc:
+            logging.error(f"Error processing {file_path}: {exc}")
+
+    if skip_binfiles:
+        outfile.write("\n")
+        for rel_path in skip_binfiles:
+            outfile.write(f"{rel_path} binary file skipped..\n")
+
+    if skip_duplicates:
+        outfile.write("\n")
+        for rel_path, kept_path in skip_duplicates:
+            outfile.write(f"{rel_path} near-duplicate of {kept_path} skipped..\n")
+
+    # Write prompt at the bottom if requested
+    if prompt and prompt_to_bottom:
+        outfile.write("\n\n" + prompt.strip())
+
+@tracing.traced("process_files")
 def process_files(
     selected_files: List[str],
     output_file: str,
     fmt: OutputFmt = 'xml',
     prompt: str = "",
     prompt_to_top: bool = False,
-    prompt_to_bottom: bool = True
+    prompt_to_bottom: bool = True,
+    levels: Dict[str, str] = None,
+    duplicates: Dict[str, str] = None
 ) -> int:
     """
     Process selected files and write their contents to output_file.
-    Optionally prepend and/or append a prompt/question.
-    Returns the number of files processed.
+    Optionally prepend and/or append a prompt/question. levels and
+    duplicates are as for write_bundle. Returns the number of files processed.
     """
     try:
         output_path = os.path.join(os.getcwd(), output_file)
         logging.info(f"Writing output to: {output_path}")
 
-        skip_binfiles = []
-        writer = _write_one_file_xml if fmt == 'xml' else _write_one_file_md
-
         with open(output_path, 'w', encoding='utf-8') as outfile:
-            # Write prompt at the top if requested
-            if prompt and prompt_to_top:
-                outfile.write(prompt.strip() + "\n\n")
-
-            for file_path in selected_files:
-                try:
-                    try:
-                        rel_path = os.path.relpath(file_path, os.getcwd())
-                    except ValueError:
-                        rel_path = file_path
-                    writer(outfile, rel_path, file_path, skip_binfiles=skip_binfiles)
-                    logging.info(f"Processed: {rel_path}")
-                except Exception as exc:
-                    logging.error(f"Error processing {file_path}: {exc}")
-
-            if skip_binfiles:
-                outfile.write("\n")
-                for rel_path in skip_binfiles:
-                    outfile.write(f"{rel_path} binary file skipped..\n")
-
-            # Write prompt at the bottom if requested
-            if prompt and prompt_to_bottom:
-                outfile.write("\n\n" + prompt.strip())
+            write_bundle(outfile, selected_files, fmt, prompt,
+                         prompt_to_top, prompt_to_bottom, levels=levels, duplicates=duplicates)
 
         return len(selected_files)
     except Exception as exc:
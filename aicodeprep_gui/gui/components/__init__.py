@@ -1,8 +1,23 @@
 from .layouts import FlowLayout
-from .dialogs import DialogManager, VoteDialog
 from .tree_widget import FileTreeManager
 from .preset_buttons import PresetButtonManager
+from .tree_filter import TreeFilterManager
+from .tree_stats import TreeStatsManager
+from .dependency_select import DependencyManager
+from .relevance_select import RelevanceManager
+from .duplicate_groups import NearDuplicateManager
+from .cochange_list import CoChangeManager
 
 # Removed export of multi_state_level_delegate; Level delegate is now in pro/
 __all__ = ['FlowLayout', 'DialogManager', 'VoteDialog',
-           'FileTreeManager', 'PresetButtonManager']
+           'FileTreeManager', 'PresetButtonManager', 'TreeFilterManager',
+           'TreeStatsManager', 'DependencyManager',
+           'RelevanceManager', 'NearDuplicateManager', 'CoChangeManager']
+
+
+def __getattr__(name):
+    # dialogs pulls in QtNetwork, so it is only imported when first asked for
+    if name in ("DialogManager", "VoteDialog"):
+        from . import dialogs
+        return getattr(dialogs, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,129 @@
+import logging
+import os
+from PySide6 import QtCore, QtWidgets
+from aicodeprep_gui import workspace
+from aicodeprep_gui.gui.handlers.cochange_events import CoChangeWorker
+
+
+class CoChangeManager:
+    """
+    Shows the files "often changed together" with the checked ones in a list
+    under the tree; double-click one to check it too.
+
+    The pairs come from aicodeprep_gui.cochange, mined from the local git
+    history on the thread pool after the scan. The list is hidden outside a
+    git repository and while nothing is checked, and only lists files shown
+    in the tree that are not checked yet.
+    """
+    REFRESH_MS = 150
+    MAX_LISTED = 20
+    # Beyond this many checked files the suggestions say little and cost more
+    MAX_SELECTED = 500
+    CANDIDATES = 100
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.workspace = workspace.current()
+        self.indexes = None
+        self.container = None
+        self._items_by_path = {}
+        self._worker = None
+        self._timer = QtCore.QTimer(main_window)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self._refresh)
+
+    def setup_list(self, layout):
+        self.container = QtWidgets.QWidget()
+        container_layout = QtWidgets.QVBoxLayout(self.container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        container_layout.setSpacing(2)
+        title = QtWidgets.QLabel("Often changed together (double-click to check):")
+        title.setToolTip("Files that were committed together with the checked files,\n"
+                         "recent commits counting for more")
+        self.list_widget = QtWidgets.QListWidget()
+        self.list_widget.setMaximumHeight(120)
+        self.list_widget.itemDoubleClicked.connect(self._check_item)
+        container_layout.addWidget(title)
+        container_layout.addWidget(self.list_widget)
+        self.container.hide()
+        layout.addWidget(self.container)
+
+    def start(self):
+        """Read the git history of the scanned roots in the background."""
+        worker = CoChangeWorker(list(self.workspace.roots))
+        worker.signals.finished.connect(self._on_mined)
+        self._worker = worker
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def _on_mined(self, indexes):
+        self.indexes = indexes
+        self._worker = None
+        self.selection_changed()
+
+    def selection_changed(self):
+        """Called when files are checked or unchecked; the list follows shortly after."""
+        if self.indexes and not self._timer.isActive():
+            self._timer.start()
+
+    def related(self, file_paths, limit=MAX_LISTED):
+        """
+        Absolute paths of the files shown in the tree and not among file_paths
+        that most often changed together with them, with their shared commits.
+        """
+        by_index = {}
+        for file_path in file_paths:
+            root = self.workspace.root_of(file_path)
+            if root not in self.indexes:
+                continue
+            index, prefix = self.indexes[root]
+            rel_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+            by_index.setdefault(id(index), (index, []))[1].append(prefix + rel_path)
+        items_by_path = self._tree_items()
+        ranked = []
+        for index, rel_paths in by_index.values():
+            for rel_path, score, shared in index.related(rel_paths, self.CANDIDATES):
+                for file_path in self._abs_paths(index, rel_path):
+                    if file_path in items_by_path and file_path not in file_paths:
+                        ranked.append((score, shared, file_path))
+        ranked.sort(key=lambda entry: entry[0], reverse=True)
+        return [(file_path, shared) for _, shared, file_path in ranked[:limit]]
+
+    def _abs_paths(self, index, rel_path):
+        for root, (root_index, prefix) in self.indexes.items():
+            if root_index is index and rel_path.startswith(prefix):
+                yield os.path.join(root, *rel_path[len(prefix):].split("/"))
+
+    def _tree_items(self):
+        # Only rebuilt when folders have been loaded since
+        path_to_item = self.main_window.path_to_item
+        if len(self._items_by_path) != len(path_to_item):
+            self._items_by_path = {item.data(0, QtCore.Qt.UserRole): item
+                                   for item in path_to_item.values()}
+        return self._items_by_path
+
+    def _refresh(self):
+        if self.container is None:
+            return
+        selected = self.main_window.selected_files
+        if not selected or len(selected) > self.MAX_SELECTED:
+            self.container.hide()
+            return
+        related = self.related(selected)
+        self.list_widget.clear()
+        for file_path, shared in related:
+            entry = QtWidgets.QListWidgetItem(
+                f"{self.workspace.display_path(file_path)}  ·  {shared} shared commit{'' if shared == 1 else 's'}")
+            entry.setData(QtCore.Qt.UserRole, file_path)
+            self.list_widget.addItem(entry)
+        self.container.setVisible(bool(related))
+
+    def _check_item(self, entry):
+        mw = self.main_window
+        item = self._tree_items().get(entry.data(QtCore.Qt.UserRole))
+        if item is None:
+            return
+        mw.tree_manager.set_items_checked([item], QtCore.Qt.Checked)
+        mw.tree_manager.expand_parents_of_item(item)
+        mw.tree_widget.scrollToItem(item)
+        logging.info(f"Checked co-changed file {entry.data(QtCore.Qt.UserRole)}")
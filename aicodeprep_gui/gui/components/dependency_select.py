@@ -0,0 +1,91 @@
+import logging
+import os
+from PySide6 import QtCore, QtWidgets
+from aicodeprep_gui import workspace
+from aicodeprep_gui.import_graph import language_of
+from aicodeprep_gui.gui.handlers.dependency_events import DependencyIndexWorker
+
+
+class DependencyManager:
+    """
+    Right-click a source file in the tree to check the project files it
+    imports, directly or a few levels down, in one batch.
+
+    The import graph of each root is built from the scan on the thread pool
+    and cached by file content, so after the first run only edited files are
+    parsed again.
+    """
+    DEPTHS = ((1, "Direct imports"), (2, "Up to 2 levels"),
+              (3, "Up to 3 levels"), (None, "All levels"))
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.workspace = workspace.current()
+        self.indexes = None
+        self._worker = None
+
+    def setup_menu(self):
+        tree = self.main_window.tree_widget
+        tree.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        tree.customContextMenuRequested.connect(self._show_menu)
+
+    def start_indexing(self):
+        """Build the import graph in the background from every source file in the tree."""
+        from .tree_widget import IS_FILE_ROLE
+        files_by_root = {}
+        for item in self.main_window.path_to_item.values():
+            file_path = item.data(0, QtCore.Qt.UserRole)
+            if not item.data(0, IS_FILE_ROLE) or language_of(file_path) is None:
+                continue
+            root = self.workspace.root_of(file_path)
+            rel_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+            files_by_root.setdefault(root, []).append(rel_path)
+        worker = DependencyIndexWorker(files_by_root)
+        worker.signals.finished.connect(self._on_index_built)
+        self._worker = worker
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def _on_index_built(self, indexes):
+        self.indexes = indexes
+        self._worker = None
+        logging.debug(f"Dependency index ready: {sum(len(i.edges) for i in indexes.values())} files")
+
+    def dependencies(self, file_path, depth=None):
+        """Absolute paths of the project files file_path imports, up to depth levels."""
+        root = self.workspace.root_of(file_path)
+        index = (self.indexes or {}).get(root)
+        if index is None:
+            return []
+        rel_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+        return [os.path.join(root, *dep.split("/")) for dep in index.dependencies(rel_path, depth)]
+
+    def _show_menu(self, pos):
+        from .tree_widget import IS_FILE_ROLE
+        tree = self.main_window.tree_widget
+        item = tree.itemAt(pos)
+        if item is None or not item.data(0, IS_FILE_ROLE):
+            return
+        file_path = item.data(0, QtCore.Qt.UserRole)
+        if language_of(file_path) is None:
+            return
+        menu = QtWidgets.QMenu(tree)
+        submenu = menu.addMenu("Check imported files")
+        if self.indexes is None:
+            submenu.addAction("Indexing imports…").setEnabled(False)
+        else:
+            for depth, label in self.DEPTHS:
+                deps = self.dependencies(file_path, depth)
+                action = submenu.addAction(f"{label} ({len(deps)})")
+                action.setEnabled(bool(deps))
+                action.triggered.connect(
+                    lambda _=False, item=item, deps=deps: self.check_dependencies(item, deps))
+        menu.exec(tree.viewport().mapToGlobal(pos))
+
+    def check_dependencies(self, item, dep_paths):
+        """Check the file and those of dep_paths shown in the tree, as one batch."""
+        mw = self.main_window
+        wanted = set(dep_paths)
+        items = [item] + [other for other in mw.path_to_item.values()
+                          if other.data(0, QtCore.Qt.UserRole) in wanted]
+        mw.tree_manager.set_items_checked(items, QtCore.Qt.Checked)
+        logging.info(f"Checked {len(items) - 1} of {len(wanted)} imported files")
@@ -401,8 +401,8 @@ class DialogManager:
         dlg.exec()
 
     def add_new_preset_dialog(self):
-        # Corrected relative import
-        from aicodeprep_gui.settings import presets as global_preset_manager
+        from aicodeprep_gui.gui.settings.presets import get_global_preset_manager
+        global_preset_manager = get_global_preset_manager()
 
         lbl, ok = QtWidgets.QInputDialog.getText(
             self.parent, "New preset", "Button label:")
@@ -434,8 +434,8 @@ class DialogManager:
                 self.parent, "Error", "Failed to save preset.")
 
     def delete_preset_dialog(self):
-        # Corrected relative import
-        from aicodeprep_gui.settings import presets as global_preset_manager
+        from aicodeprep_gui.gui.settings.presets import get_global_preset_manager
+        global_preset_manager = get_global_preset_manager()
 
         presets = global_preset_manager.get_all_presets()
         if not presets:
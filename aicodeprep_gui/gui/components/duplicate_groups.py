@@ -0,0 +1,73 @@
+import logging
+from PySide6 import QtCore
+from aicodeprep_gui import near_duplicates, workspace
+from aicodeprep_gui.gui.handlers.duplicate_events import NearDuplicateWorker
+
+
+class NearDuplicateManager:
+    """
+    Flags groups of near-identical files in the tree (in italics, with the
+    other members in the tooltip) and, when "Keep one file per near-duplicate
+    group" is on, works out which selected files to leave out of the output.
+
+    Groups come from aicodeprep_gui.near_duplicates, computed on the thread
+    pool after the scan. Before files are left out, the selected members of
+    each group are compared again as they are now.
+    """
+    MAX_LISTED = 5
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.workspace = workspace.current()
+        self.groups = []
+        self._worker = None
+
+    def start(self):
+        """Group every text file currently in the tree in the background."""
+        from .tree_widget import IS_FILE_ROLE, IS_BINARY_ROLE
+        paths = [item.data(0, QtCore.Qt.UserRole)
+                 for item in self.main_window.path_to_item.values()
+                 if item.data(0, IS_FILE_ROLE) and not item.data(0, IS_BINARY_ROLE)]
+        worker = NearDuplicateWorker(paths)
+        worker.signals.finished.connect(self._on_grouped)
+        self._worker = worker
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def _on_grouped(self, groups):
+        self.groups = groups
+        self._worker = None
+        logging.debug(f"Near-duplicates: {sum(map(len, groups))} files in {len(groups)} groups")
+        items_by_path = {item.data(0, QtCore.Qt.UserRole): item
+                         for item in self.main_window.path_to_item.values()}
+        for group in groups:
+            for file_path in group:
+                item = items_by_path.get(file_path)
+                if item is not None:
+                    self._flag(item, file_path, group)
+
+    def _flag(self, item, file_path, group):
+        others = [self.workspace.display_path(path) for path in group if path != file_path]
+        listed = "\n".join(others[:self.MAX_LISTED])
+        if len(others) > self.MAX_LISTED:
+            listed += f"\n… and {len(others) - self.MAX_LISTED} more"
+        font = item.font(0)
+        font.setItalic(True)
+        item.setFont(0, font)
+        item.setToolTip(0, f"Near-duplicate of {len(others)} other file{'' if len(others) == 1 else 's'}:\n{listed}")
+
+    def redundant_files(self, selected_files):
+        """
+        Selected files to leave out, mapped to the selected file kept in their
+        place: all but the first selected member of each group that are still
+        near-identical to it.
+        """
+        selected = set(selected_files)
+        groups = [group for group in self.groups if len(selected.intersection(group)) > 1]
+        signatures = {}
+        for group in groups:
+            for file_path in selected.intersection(group):
+                try:
+                    signatures[file_path] = near_duplicates.file_signature(file_path)
+                except OSError:
+                    pass
+        return near_duplicates.redundant(selected_files, groups, signatures)
@@ -1,6 +1,6 @@
 import logging
 from PySide6 import QtWidgets, QtCore
-from aicodeprep_gui.gui.settings.presets import global_preset_manager
+from aicodeprep_gui.gui.settings.presets import get_global_preset_manager
 
 class PresetButtonManager:
     def __init__(self, main_window):
@@ -8,7 +8,7 @@ class PresetButtonManager:
 
     def _load_global_presets(self):
         try:
-            presets = global_preset_manager.get_all_presets()
+            presets = get_global_preset_manager().get_all_presets()
             for label, text in presets:
                 self._add_preset_button(label, text, from_global=True)
         except Exception as e: 
@@ -29,7 +29,7 @@ class PresetButtonManager:
         reply = QtWidgets.QMessageBox.question(self.main_window, "Delete Preset", f"Are you sure you want to delete the preset '{label}'?", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.No)
         if reply == QtWidgets.QMessageBox.Yes:
             if from_global:
-                if not global_preset_manager.delete_preset(label): 
+                if not get_global_preset_manager().delete_preset(label): 
                     QtWidgets.QMessageBox.warning(self.main_window, "Error", f"Failed to delete global preset '{label}'")
                     return
             else: 
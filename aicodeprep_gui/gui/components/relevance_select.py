@@ -0,0 +1,137 @@
+import logging
+import os
+import time
+from PySide6 import QtCore, QtWidgets
+from aicodeprep_gui import workspace
+from aicodeprep_gui.project_config import config_for
+from aicodeprep_gui.gui.handlers.relevance_events import RelevanceIndexWorker
+
+
+class RelevanceManager:
+    """
+    Drives the "Auto-select relevant files" button under the prompt box.
+
+    Files are ranked against the prompt with the BM25 index from
+    aicodeprep_gui.relevance, built on the thread pool after the scan and
+    kept between sessions. The best ranked files are checked, in order, while
+    they fit the token budget of the [relevance] config settings. An index
+    older than REFRESH_SECONDS is brought up to date first, which only reads
+    files edited since.
+    """
+    REFRESH_SECONDS = 30
+    CANDIDATES = 200
+    # Files scoring below this share of the best match are left out
+    MIN_SCORE_SHARE = 0.2
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.workspace = workspace.current()
+        self.indexes = None
+        self.built_at = 0.0
+        self._pending_prompt = None
+        self._worker = None
+
+    def setup_button(self, layout):
+        mw = self.main_window
+        self.button = QtWidgets.QPushButton("Auto-select relevant files")
+        self.button.setToolTip(
+            "Check the files that best match the prompt, up to the token budget\n"
+            "set by [relevance] token_budget in aicodeprep-gui.toml")
+        self.button.clicked.connect(self.select_relevant)
+        self.status_label = QtWidgets.QLabel("")
+        layout.addWidget(self.button)
+        layout.addWidget(self.status_label)
+        mw.prompt_textbox.textChanged.connect(self._update_button)
+        self._update_button()
+
+    def _update_button(self):
+        has_prompt = bool(self.main_window.prompt_textbox.toPlainText().strip())
+        self.button.setEnabled(has_prompt and self._worker is None)
+
+    def _text_files(self):
+        from .tree_widget import IS_FILE_ROLE, IS_BINARY_ROLE
+        files_by_root = {}
+        for item in self.main_window.path_to_item.values():
+            if not item.data(0, IS_FILE_ROLE) or item.data(0, IS_BINARY_ROLE):
+                continue
+            file_path = item.data(0, QtCore.Qt.UserRole)
+            root = self.workspace.root_of(file_path)
+            rel_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+            files_by_root.setdefault(root, []).append(rel_path)
+        return files_by_root
+
+    def start_indexing(self):
+        """Update the index in the background from every text file currently in the tree."""
+        worker = RelevanceIndexWorker(self._text_files(), self.indexes)
+        worker.signals.finished.connect(self._on_index_built)
+        self._worker = worker
+        self._update_button()
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def _on_index_built(self, indexes):
+        self.indexes = indexes
+        self.built_at = time.monotonic()
+        self._worker = None
+        logging.debug(f"Relevance index ready: {sum(len(i) for i in indexes.values())} files")
+        self._update_button()
+        if self._pending_prompt is not None:
+            prompt, self._pending_prompt = self._pending_prompt, None
+            self._select(prompt)
+
+    def rank(self, prompt, limit=CANDIDATES):
+        """Absolute paths of the files best matching prompt, with their scores, best first."""
+        ranked = []
+        for root, index in (self.indexes or {}).items():
+            ranked.extend((os.path.join(root, *rel_path.split("/")), score)
+                          for rel_path, score in index.search(prompt, limit))
+        ranked.sort(key=lambda entry: entry[1], reverse=True)
+        return ranked[:limit]
+
+    def select_relevant(self):
+        prompt = self.main_window.prompt_textbox.toPlainText().strip()
+        if not prompt:
+            return
+        if self._worker is not None or self.indexes is None \
+                or time.monotonic() - self.built_at > self.REFRESH_SECONDS:
+            self._pending_prompt = prompt
+            self.status_label.setText("Indexing…")
+            if self._worker is None:
+                self.start_indexing()
+            return
+        self._select(prompt)
+
+    def _select(self, prompt):
+        mw = self.main_window
+        settings = config_for(self.workspace.roots[0]).config.get("relevance", {})
+        budget = settings.get("token_budget", 30000)
+        max_files = settings.get("max_files", 25)
+        items_by_path = {item.data(0, QtCore.Qt.UserRole): item for item in mw.path_to_item.values()}
+        ranked = self.rank(prompt)
+        chosen, tokens = [], 0
+        for file_path, score in ranked:
+            if len(chosen) >= max_files or score < ranked[0][1] * self.MIN_SCORE_SHARE:
+                break
+            item = items_by_path.get(file_path)
+            if item is None or file_path in mw.selected_files:
+                continue
+            file_tokens = mw.tree_stats.estimated_tokens(file_path) or self._size(file_path) // 4
+            if tokens + file_tokens > budget:
+                continue
+            chosen.append(item)
+            tokens += file_tokens
+        if not chosen:
+            self.status_label.setText("No further matching files" if ranked else "No matching files")
+            return
+        mw.tree_manager.set_items_checked(chosen, QtCore.Qt.Checked)
+        mw._expand_folders_for_paths(
+            [self.workspace.display_path(item.data(0, QtCore.Qt.UserRole)) for item in chosen])
+        self.status_label.setText(
+            f"Checked {len(chosen)} file{'' if len(chosen) == 1 else 's'} (~{tokens:,} tokens)")
+        logging.info(f"Auto-selected {len(chosen)} of {len(ranked)} ranked files, ~{tokens} tokens")
+
+    @staticmethod
+    def _size(file_path):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
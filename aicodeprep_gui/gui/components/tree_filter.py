@@ -0,0 +1,121 @@
+import logging
+from PySide6 import QtCore
+from aicodeprep_gui.gui.handlers.index_events import PathIndexWorker
+
+
+class TreeFilterManager:
+    """
+    Drives the filter box above the file tree.
+
+    Matches come from a PathIndex built from the scan results on the thread
+    pool, so no folder has to be expanded or listed to be searched. Only the
+    branches leading to the best matches are shown; everything else is hidden
+    level by level, so the cost follows the size of the result, not the tree.
+    """
+    MAX_SHOWN = 2000
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.index = None
+        self.matches = []
+        self._pending_paths = []
+        self._hidden_items = []
+        self._expanded_items = []
+        self._worker = None
+
+    def start_indexing(self):
+        """Build the index in the background from every path currently in the tree."""
+        worker = PathIndexWorker(list(self.main_window.path_to_item))
+        worker.signals.finished.connect(self._on_index_built)
+        self._worker = worker
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def add_path(self, rel_path):
+        """Index a path created after the scan, e.g. by lazy folder expansion."""
+        if self.index is None:
+            self._pending_paths.append(rel_path)
+        else:
+            self.index.add(rel_path)
+
+    def _on_index_built(self, index):
+        for rel_path in self._pending_paths:
+            index.add(rel_path)
+        self._pending_paths = []
+        self.index = index
+        self._worker = None
+        logging.debug(f"Filter index ready: {len(index)} paths")
+        if self.main_window.filter_box.text().strip():
+            self.apply_filter(self.main_window.filter_box.text())
+
+    def apply_filter(self, text):
+        mw = self.main_window
+        tree = mw.tree_widget
+        text = text.strip()
+        tree.setUpdatesEnabled(False)
+        try:
+            self._restore_hidden()
+            if not text:
+                self.matches = []
+                for item in self._expanded_items:
+                    item.setExpanded(False)
+                self._expanded_items = []
+                self._show_status("")
+                return
+            if self.index is None:
+                self.matches = []
+                self._show_status("Indexing…")
+                return
+            self.matches = [p for p in self.index.search(text)
+                            if p in mw.path_to_item]
+            self._show_matches(
+                [mw.path_to_item[p] for p in self.matches[:self.MAX_SHOWN]])
+            shown = min(len(self.matches), self.MAX_SHOWN)
+            status = f"{len(self.matches):,} match{'' if len(self.matches) == 1 else 'es'}"
+            if shown < len(self.matches):
+                status += f" (showing {shown:,})"
+            self._show_status(status)
+        finally:
+            tree.setUpdatesEnabled(True)
+
+    def _show_matches(self, items):
+        tree = self.main_window.tree_widget
+        matched = set(items)
+        keep = set()
+        for item in items:
+            node = item
+            while node is not None and node not in keep:
+                keep.add(node)
+                node = node.parent()
+        # Walk down only through kept folders; a matching folder keeps its
+        # whole subtree visible.
+        stack = [tree.invisibleRootItem()]
+        while stack:
+            parent = stack.pop()
+            for i in range(parent.childCount()):
+                child = parent.child(i)
+                if child not in keep:
+                    child.setHidden(True)
+                    self._hidden_items.append(child)
+                elif child not in matched:
+                    if not child.isExpanded():
+                        child.setExpanded(True)
+                        self._expanded_items.append(child)
+                    stack.append(child)
+        if items:
+            tree.scrollToItem(items[0])
+
+    def _restore_hidden(self):
+        for item in self._hidden_items:
+            item.setHidden(False)
+        self._hidden_items = []
+
+    def _show_status(self, text):
+        self.main_window.filter_status_label.setText(text)
+        self.main_window.check_matches_button.setEnabled(bool(self.matches))
+
+    def check_all_matches(self):
+        """Check every match, including those beyond the displayed limit, in one batch."""
+        mw = self.main_window
+        items = [mw.path_to_item[p] for p in self.matches if p in mw.path_to_item]
+        if items:
+            mw.tree_manager.set_items_checked(items, QtCore.Qt.Checked)
@@ -0,0 +1,213 @@
+import logging
+import math
+from PySide6 import QtCore, QtGui, QtWidgets
+from aicodeprep_gui import workspace
+from aicodeprep_gui.gui.handlers.stats_events import TreeStatsWorker, dir_chain
+
+
+def _compact(n):
+    if n >= 1_000_000:
+        return f"{n / 1_000_000:.1f}M"
+    if n >= 1_000:
+        return f"{n / 1_000:.1f}k"
+    return str(n)
+
+
+def _size(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+class TreeStatsManager:
+    """
+    Fills the tree's size column: estimated tokens for the selected content
+    and for everything under each folder, shaded by share of the whole tree.
+
+    File sizes are gathered and rolled up per folder on the thread pool.
+    After that, checking a file or receiving its exact count from the token
+    counter only walks that file's ancestors, and changed folders are
+    repainted together on a short timer.
+    """
+    COLUMN = 2
+    REFRESH_MS = 100
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.workspace = workspace.current()
+        self._files = {}  # file_path -> (rel_dir, size)
+        self._dirs = {}  # rel_dir -> [all_bytes, all_tokens, sel_bytes, sel_tokens]
+        self._rule_sizes = {}  # rule dir_path -> (bytes, tokens)
+        self._applied_rules = set()
+        self._dirty = set()
+        self._painted_total = None
+        self._workers = []
+        self._timer = QtCore.QTimer(main_window)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self._refresh_items)
+
+    def setup_column(self):
+        tree = self.main_window.tree_widget
+        tree.headerItem().setText(self.COLUMN, "Tokens (selected / all)")
+        header = tree.header()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(self.COLUMN, QtWidgets.QHeaderView.Fixed)
+        header.resizeSection(self.COLUMN, 150)
+
+    def start(self):
+        """Size every text file currently in the tree in the background."""
+        from .tree_widget import IS_FILE_ROLE, IS_BINARY_ROLE
+        paths = [item.data(0, QtCore.Qt.UserRole)
+                 for item in self.main_window.path_to_item.values()
+                 if item.data(0, IS_FILE_ROLE) and not item.data(0, IS_BINARY_ROLE)]
+        self.add_files(paths)
+
+    def add_files(self, file_paths):
+        """Size files created after the scan, e.g. by lazy folder expansion."""
+        if not file_paths:
+            return
+        worker = TreeStatsWorker(list(file_paths), self.workspace.display_path)
+        worker.signals.sized.connect(self._on_sized)
+        worker.signals.finished.connect(lambda: self._workers.remove(worker))
+        self._workers.append(worker)
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def _on_sized(self, entries, totals):
+        mw = self.main_window
+        for rel_dir, (nbytes, tokens) in totals.items():
+            self._add(rel_dir, nbytes, tokens, 0, 0)
+        for file_path, rel_dir, size in entries:
+            if file_path in self._files:
+                # Sized before (e.g. start() run again): take it back out of the batch totals
+                self._add_chain(rel_dir, -size, -(size // 4), 0, 0)
+                continue
+            self._files[file_path] = (rel_dir, size)
+            exact = mw.file_token_counts.get(file_path)
+            if exact is not None:
+                self._add_chain(rel_dir, 0, exact - size // 4, 0, 0)
+            if file_path in mw.selected_files:
+                self._add_chain(rel_dir, 0, 0, size, self._tokens(file_path))
+        self._schedule()
+
+    @property
+    def sized_count(self):
+        return len(self._files)
+
+    def estimated_tokens(self, file_path):
+        """Counted tokens, else the size-based estimate; 0 until the file is sized."""
+        if file_path in self._files or file_path in self.main_window.file_token_counts:
+            return self._tokens(file_path)
+        return 0
+
+    def _tokens(self, file_path):
+        exact = self.main_window.file_token_counts.get(file_path)
+        return exact if exact is not None else self._files[file_path][1] // 4
+
+    def _add(self, rel_dir, all_bytes, all_tokens, sel_bytes, sel_tokens):
+        stats = self._dirs.get(rel_dir)
+        if stats is None:
+            stats = self._dirs[rel_dir] = [0, 0, 0, 0]
+        stats[0] += all_bytes
+        stats[1] += all_tokens
+        stats[2] += sel_bytes
+        stats[3] += sel_tokens
+        self._dirty.add(rel_dir)
+
+    def _add_chain(self, rel_dir, all_bytes, all_tokens, sel_bytes, sel_tokens):
+        for dir_rel in dir_chain(rel_dir):
+            self._add(dir_rel, all_bytes, all_tokens, sel_bytes, sel_tokens)
+
+    # --- Hooks called as the selection and token counts change ---
+
+    def file_selected(self, file_path, selected):
+        entry = self._files.get(file_path)
+        if entry is None:
+            return  # added with its selection state once sized
+        sign = 1 if selected else -1
+        self._add_chain(entry[0], 0, 0, sign * entry[1],
+                        sign * self._tokens(file_path))
+        self._schedule()
+
+    def file_counted(self, file_path, tokens):
+        """Replace a file's size-based estimate with its counted tokens."""
+        entry = self._files.get(file_path)
+        if entry is None:
+            return
+        delta = tokens - entry[1] // 4
+        selected = file_path in self.main_window.selected_files
+        self._add_chain(entry[0], 0, delta, 0, delta if selected else 0)
+        self._schedule()
+
+    def rule_changed(self, dir_path, selected):
+        if selected and dir_path in self._rule_sizes and dir_path not in self._applied_rules:
+            self._apply_rule(dir_path, 1)
+        elif not selected and dir_path in self._applied_rules:
+            self._apply_rule(dir_path, -1)
+
+    def rule_counted(self, dir_path, tokens, nbytes):
+        self._rule_sizes[dir_path] = (nbytes, tokens)
+        if dir_path in self.main_window.selection_rules:
+            self.rule_changed(dir_path, True)
+
+    def _apply_rule(self, dir_path, sign):
+        try:
+            rel_dir = self.workspace.display_path(dir_path)
+        except ValueError:
+            return
+        nbytes, tokens = self._rule_sizes[dir_path]
+        if sign > 0:
+            self._applied_rules.add(dir_path)
+        else:
+            self._applied_rules.discard(dir_path)
+        self._add_chain(rel_dir, 0, 0, sign * nbytes, sign * tokens)
+        self._schedule()
+
+    def clear_selection(self):
+        for rel_dir, stats in self._dirs.items():
+            if stats[2] or stats[3]:
+                stats[2] = stats[3] = 0
+                self._dirty.add(rel_dir)
+        self._applied_rules.clear()
+        self._schedule()
+
+    # --- Painting ---
+
+    def _schedule(self):
+        if self._dirty and not self._timer.isActive():
+            self._timer.start()
+
+    def _refresh_items(self):
+        mw = self.main_window
+        root_stats = self._dirs.get("")
+        if root_stats is not None:
+            mw.tree_widget.headerItem().setToolTip(
+                self.COLUMN, self._tooltip(root_stats))
+        total = root_stats[1] if root_stats else 0
+        # Shading is relative to the whole tree, so a new total repaints
+        # every folder rather than just the dirty ones
+        dirty = self._dirty
+        if total != self._painted_total:
+            self._painted_total = total
+            dirty = self._dirs
+        total = max(1, total)
+        for rel_dir in list(dirty):
+            item = mw.path_to_item.get(rel_dir)
+            stats = self._dirs.get(rel_dir)
+            if item is None or stats is None:
+                continue
+            item.setText(self.COLUMN,
+                         f"{_compact(stats[3])} / {_compact(stats[1])}")
+            item.setToolTip(self.COLUMN, self._tooltip(stats))
+            share = math.sqrt(stats[1] / total)
+            item.setBackground(self.COLUMN, QtGui.QColor(
+                220, 60, 40, int(160 * min(1.0, share))))
+        self._dirty.clear()
+        logging.debug(f"Tree stats repainted {len(dirty)} folders")
+
+    @staticmethod
+    def _tooltip(stats):
+        return (f"Selected: {stats[3]:,} tokens, {_size(stats[2])}\n"
+                f"All: {stats[1]:,} tokens, {_size(stats[0])}")
@@ -1,9 +1,17 @@
 import os
 import logging
 from PySide6 import QtWidgets, QtCore, QtGui
-from aicodeprep_gui import smart_logic
+from aicodeprep_gui import file_processor, smart_logic, workspace
 # LEVEL_ROLE is provided dynamically from main_window when Pro Level column is installed
 
+# Column 0 data roles recorded when an item is created, so check handling and
+# selection reads never have to go back to the filesystem.
+IS_FILE_ROLE = QtCore.Qt.UserRole + 2
+IS_BINARY_ROLE = QtCore.Qt.UserRole + 3
+
+# Level column values that change how a selected file is written
+OUTPUT_LEVELS = {3: file_processor.LEVEL_FULL, 4: file_processor.LEVEL_SUMMARY}
+
 
 class FileTreeManager:
     def __init__(self, main_window):
@@ -13,20 +21,31 @@ class FileTreeManager:
         dir_path = item.data(0, QtCore.Qt.UserRole)
         if not dir_path or not os.path.isdir(dir_path):
             return
-        if item.childCount() > 0 and item.child(0).data(0, QtCore.Qt.UserRole) is not None:
+        if self._children_loaded(item):
             return
+        # Children inherit the folder's state; block itemChanged while they are
+        # created so the half-built folder is not re-evaluated from them.
+        folder_state = item.checkState(0)
+        new_files = []
+        ws = workspace.current()
+        cfg = smart_logic.config_for(ws.root_of(dir_path))
+        was_blocked = self.main_window.tree_widget.blockSignals(True)
         try:
             item.takeChildren()
             for name in sorted(os.listdir(dir_path)):
                 abs_path = os.path.join(dir_path, name)
                 try:
-                    rel_path = os.path.relpath(abs_path, os.getcwd())
+                    rel_path = ws.display_path(abs_path)
+                    root_rel = ws.root_relpath(abs_path)
                 except ValueError:
                     logging.warning(
                         f"Skipping {abs_path}: not on current drive.")
                     continue
                 if rel_path in self.main_window.path_to_item:
                     continue
+                is_dir = os.path.isdir(abs_path)
+                if cfg.is_ignored(root_rel, is_dir):
+                    continue
                 # Always create with two columns since tree widget always has two columns
                 new_item = QtWidgets.QTreeWidgetItem(item, [name, ""])
 
@@ -54,26 +73,36 @@ class FileTreeManager:
                         pass
 
                 self.main_window.path_to_item[rel_path] = new_item
-                is_excluded = smart_logic.exclude_spec.match_file(
-                    rel_path) or smart_logic.exclude_spec.match_file(rel_path + '/')
-                if os.path.isdir(abs_path):
+                self.main_window.tree_filter.add_path(rel_path)
+                is_excluded = cfg.is_excluded(root_rel, is_dir)
+                if is_dir:
                     new_item.setIcon(0, self.main_window.folder_icon)
                     if is_excluded:
-                        new_item.setCheckState(0, QtCore.Qt.Unchecked)
+                        self.set_item_checked(new_item, QtCore.Qt.Unchecked)
                     else:
-                        new_item.setCheckState(0, item.checkState(0))
+                        self.set_item_checked(new_item, folder_state)
                 else:
                     new_item.setIcon(0, self.main_window.file_icon)
+                    new_item.setData(0, IS_FILE_ROLE, True)
                     if smart_logic.is_binary_file(abs_path):
+                        new_item.setData(0, IS_BINARY_ROLE, True)
                         is_excluded = True
+                    else:
+                        new_files.append(abs_path)
                     if is_excluded:
-                        new_item.setCheckState(0, QtCore.Qt.Unchecked)
-                    elif self.main_window.preferences_manager.prefs_loaded and rel_path in self.main_window.preferences_manager.checked_files_from_prefs:
-                        new_item.setCheckState(0, QtCore.Qt.Checked)
+                        self.set_item_checked(new_item, QtCore.Qt.Unchecked)
+                    elif self.main_window.preferences_manager.prefs_loaded and self.main_window.preferences_manager.selection_from_prefs.is_selected(rel_path):
+                        self.set_item_checked(new_item, QtCore.Qt.Checked)
                     else:
-                        new_item.setCheckState(0, item.checkState(0))
+                        self.set_item_checked(new_item, folder_state)
         except OSError as e:
             logging.error(f"Error scanning directory {dir_path}: {e}")
+        finally:
+            self.main_window.tree_widget.blockSignals(was_blocked)
+        # Children now carry the folder's state themselves
+        self._set_rule(dir_path, item, False)
+        self.main_window.tree_stats.add_files(new_files)
+        self.main_window.update_token_counter()
         # After populating children, sync Skeleton Level values for this branch
         if (hasattr(self.main_window, "level_role") and self.main_window.level_delegate
                 and self.main_window.is_pro_level_column_enabled()):
@@ -84,50 +113,16 @@ class FileTreeManager:
             self.main_window.tree_widget.blockSignals(True)
             try:
                 new_state = item.checkState(0)
-
-                def apply_to_children(parent_item, state):
-                    for i in range(parent_item.childCount()):
-                        child = parent_item.child(i)
-                        if child.flags() & QtCore.Qt.ItemIsUserCheckable and child.flags() & QtCore.Qt.ItemIsEnabled:
-                            abs_path = child.data(0, QtCore.Qt.UserRole)
-                            if state == QtCore.Qt.Checked and abs_path and os.path.isfile(abs_path) and smart_logic.is_binary_file(abs_path):
-                                child.setCheckState(0, QtCore.Qt.Unchecked)
-                            else:
-                                child.setCheckState(0, state)
-                            if os.path.isdir(abs_path):
-                                apply_to_children(child, state)
-                apply_to_children(item, new_state)
+                self._track_selection(item)
+                self._apply_to_children(item, new_state)
                 parent = item.parent()
                 while parent:
-                    all_children_checked = True
-                    all_children_unchecked = True
-                    has_checkable_children = False
-                    for i in range(parent.childCount()):
-                        child = parent.child(i)
-                        if child.flags() & QtCore.Qt.ItemIsUserCheckable and child.flags() & QtCore.Qt.ItemIsEnabled:
-                            has_checkable_children = True
-                            if child.checkState(0) == QtCore.Qt.Checked:
-                                all_children_unchecked = False
-                            elif child.checkState(0) == QtCore.Qt.Unchecked:
-                                all_children_checked = False
-                            else:
-                                all_children_checked = False
-                                all_children_unchecked = False
-                    if has_checkable_children:
-                        if all_children_checked:
-                            parent.setCheckState(0, QtCore.Qt.Checked)
-                        elif all_children_unchecked:
-                            parent.setCheckState(0, QtCore.Qt.Unchecked)
-                        else:
-                            parent.setCheckState(0, QtCore.Qt.PartiallyChecked)
-                    else:
-                        parent.setCheckState(0, QtCore.Qt.Unchecked)
+                    self._refresh_folder_state(parent)
                     parent = parent.parent()
             finally:
                 self.main_window.tree_widget.blockSignals(False)
             if item.checkState(0) == QtCore.Qt.Checked:
-                file_path = item.data(0, QtCore.Qt.UserRole)
-                if file_path and os.path.isfile(file_path):
+                if item.data(0, IS_FILE_ROLE):
                     QtCore.QTimer.singleShot(
                         0, lambda: self.expand_parents_of_item(item))
             # Keep Level column in sync with check states
@@ -144,30 +139,223 @@ class FileTreeManager:
                 self._apply_level_to_children(item, new_level)
             self.main_window.update_token_counter()
 
+    def _apply_to_children(self, parent_item, state):
+        for i in range(parent_item.childCount()):
+            child = parent_item.child(i)
+            if child.flags() & QtCore.Qt.ItemIsUserCheckable and child.flags() & QtCore.Qt.ItemIsEnabled:
+                if state == QtCore.Qt.Checked and child.data(0, IS_BINARY_ROLE):
+                    self.set_item_checked(child, QtCore.Qt.Unchecked)
+                else:
+                    self.set_item_checked(child, state)
+                if not child.data(0, IS_FILE_ROLE):
+                    self._apply_to_children(child, state)
+
+    def _refresh_folder_state(self, parent):
+        """Set a folder's check state from its direct children."""
+        all_children_checked = True
+        all_children_unchecked = True
+        has_checkable_children = False
+        for i in range(parent.childCount()):
+            child = parent.child(i)
+            if child.flags() & QtCore.Qt.ItemIsUserCheckable and child.flags() & QtCore.Qt.ItemIsEnabled:
+                has_checkable_children = True
+                if child.checkState(0) == QtCore.Qt.Checked:
+                    all_children_unchecked = False
+                elif child.checkState(0) == QtCore.Qt.Unchecked:
+                    all_children_checked = False
+                else:
+                    all_children_checked = False
+                    all_children_unchecked = False
+        if has_checkable_children:
+            if all_children_checked:
+                parent.setCheckState(0, QtCore.Qt.Checked)
+            elif all_children_unchecked:
+                parent.setCheckState(0, QtCore.Qt.Unchecked)
+            else:
+                parent.setCheckState(0, QtCore.Qt.PartiallyChecked)
+        else:
+            parent.setCheckState(0, QtCore.Qt.Unchecked)
+
+    def set_items_checked(self, items, state):
+        """
+        Check or uncheck many items as one batched operation: folders cascade
+        to their children, binary files are never checked, and each affected
+        ancestor folder is re-evaluated once, deepest first.
+        """
+        tree = self.main_window.tree_widget
+        ancestors = {}
+        tree.setUpdatesEnabled(False)
+        was_blocked = tree.blockSignals(True)
+        try:
+            for item in items:
+                if not (item.flags() & QtCore.Qt.ItemIsUserCheckable):
+                    continue
+                if state == QtCore.Qt.Checked and item.data(0, IS_BINARY_ROLE):
+                    continue
+                self.set_item_checked(item, state)
+                if not item.data(0, IS_FILE_ROLE):
+                    self._apply_to_children(item, state)
+                chain, parent = [], item.parent()
+                while parent is not None:
+                    chain.append(parent)
+                    parent = parent.parent()
+                for depth, parent in enumerate(reversed(chain)):
+                    ancestors[id(parent)] = (depth, parent)
+            # Deeper folders first so each parent sees its children's final state
+            for _, parent in sorted(ancestors.values(), key=lambda entry: -entry[0]):
+                self._refresh_folder_state(parent)
+        finally:
+            tree.blockSignals(was_blocked)
+            tree.setUpdatesEnabled(True)
+        if (hasattr(self.main_window, "level_role") and self.main_window.level_delegate
+                and self.main_window.is_pro_level_column_enabled()):
+            self.sync_levels_to_checks()
+        self.main_window.update_token_counter()
+
     def expand_parents_of_item(self, item):
         parent = item.parent()
         while parent is not None:
             self.main_window.tree_widget.expandItem(parent)
             parent = parent.parent()
 
+    def set_item_checked(self, item, state):
+        """Set an item's check state and keep the selection set in step with it."""
+        item.setCheckState(0, state)
+        self._track_selection(item)
+
+    def _track_selection(self, item):
+        """
+        Record an item's current check state in the main window's ordered
+        selection set and running token total. A folder whose children have
+        not been loaded is recorded as a selection rule instead.
+        """
+        mw = self.main_window
+        if not item.data(0, IS_FILE_ROLE):
+            dir_path = item.data(0, QtCore.Qt.UserRole)
+            if dir_path and not self._children_loaded(item):
+                self._set_rule(dir_path, item, item.checkState(0) == QtCore.Qt.Checked)
+            return
+        file_path = item.data(0, QtCore.Qt.UserRole)
+        if item.checkState(0) == QtCore.Qt.Checked:
+            if file_path not in mw.selected_files:
+                mw.selected_files[file_path] = item
+                mw.selected_files_order = None
+                if file_path in mw.file_token_counts:
+                    mw.total_tokens += mw.file_token_counts[file_path]
+                else:
+                    mw.token_counter.note_uncounted()
+                mw.tree_stats.file_selected(file_path, True)
+                mw.cochange.selection_changed()
+        elif file_path in mw.selected_files:
+            del mw.selected_files[file_path]
+            mw.total_tokens -= mw.file_token_counts.get(file_path, 0)
+            mw.selected_files_order = None
+            mw.tree_stats.file_selected(file_path, False)
+            mw.cochange.selection_changed()
+
+    @staticmethod
+    def _children_loaded(item):
+        return item.childCount() > 0 and item.child(0).data(0, QtCore.Qt.UserRole) is not None
+
+    def _set_rule(self, dir_path, item, checked):
+        """
+        Add or remove a "whole folder" selection rule for an unloaded directory.
+        Its files are resolved lazily: on expansion, by the background token
+        counter, and by get_selected_files at generate time.
+        """
+        mw = self.main_window
+        if checked:
+            if dir_path not in mw.selection_rules:
+                mw.selection_rules[dir_path] = item
+                if dir_path in mw.rule_token_counts:
+                    mw.total_tokens += mw.rule_token_counts[dir_path]
+                else:
+                    mw.token_counter.note_uncounted()
+                mw.tree_stats.rule_changed(dir_path, True)
+        elif dir_path in mw.selection_rules:
+            del mw.selection_rules[dir_path]
+            mw.total_tokens -= mw.rule_token_counts.get(dir_path, 0)
+            mw.tree_stats.rule_changed(dir_path, False)
+
+    def _clear_selection(self):
+        self.main_window.selected_files.clear()
+        self.main_window.selected_files_order = None
+        self.main_window.selection_rules.clear()
+        self.main_window.total_tokens = 0
+        self.main_window.tree_stats.clear_selection()
+        self.main_window.cochange.selection_changed()
+
     def get_selected_files(self):
-        selected = []
-        iterator = QtWidgets.QTreeWidgetItemIterator(
-            self.main_window.tree_widget)
-        while iterator.value():
-            item = iterator.value()
-            file_path = item.data(0, QtCore.Qt.UserRole)
-            if file_path and os.path.isfile(file_path) and item.checkState(0) == QtCore.Qt.Checked:
-                selected.append(file_path)
-            iterator += 1
-        return selected
+        """
+        Return checked file paths in tree order. Explicitly checked files come
+        from the maintained selection set; folders selected by rule are
+        resolved here by streaming them from the scanner, and take their
+        folder's place.
+        """
+        mw = self.main_window
+        if mw.selected_files_order is None:
+            mw.selected_files_order = sorted(
+                (self._tree_position(item), file_path) for file_path, item in mw.selected_files.items())
+        selected = list(mw.selected_files_order)
+        if mw.selection_rules:
+            ws = workspace.current()
+            for dir_path, item in mw.selection_rules.items():
+                position = self._tree_position(item)
+                selected.extend((position + [i], file_path) for i, file_path in enumerate(
+                    smart_logic.iter_included_files(dir_path, ws.root_of(dir_path))))
+            selected.sort()
+        return [file_path for _, file_path in selected]
+
+    def _tree_position(self, item):
+        """An item's child indexes from the top of the tree; sorts in tree order."""
+        position = []
+        while item is not None:
+            parent = item.parent()
+            if parent is None:
+                position.append(self.main_window.tree_widget.indexOfTopLevelItem(item))
+            else:
+                position.append(parent.indexOfChild(item))
+            item = parent
+        position.reverse()
+        return position
+
+    def get_file_levels(self):
+        """
+        Output levels chosen in the Level column for the checked files, by
+        path, for process_files. Empty while the column is off.
+        """
+        mw = self.main_window
+        if (not hasattr(mw, "level_role") or not mw.level_delegate
+                or not mw.is_pro_level_column_enabled()):
+            return {}
+        levels = {}
+        for file_path, item in mw.selected_files.items():
+            level = OUTPUT_LEVELS.get(item.data(1, mw.level_role))
+            if level:
+                levels[file_path] = level
+        return levels
+
+    @staticmethod
+    def _default_level(item):
+        """
+        Level for a file item from its check state: 'Paths only' (1) when
+        unchecked, otherwise 'Full content' (3), or 'Data summary' (4) for a
+        data file summarized by default.
+        """
+        if item.checkState(0) != QtCore.Qt.Checked:
+            return 1
+        abs_path = item.data(0, QtCore.Qt.UserRole)
+        try:
+            if smart_logic.summarizes(abs_path, os.path.getsize(abs_path)):
+                return 4
+        except OSError:
+            pass
+        return 3
 
     def sync_levels_to_checks(self):
         """
-        Sync Level column for all FILE items to match checkbox state:
-        - Unchecked -> 'Paths only' (index 1)
-        - Checked   -> 'Full content' (index 3)
-        Safely no-ops if Level column is not installed.
+        Sync Level column for all FILE items to match checkbox state (see
+        _default_level). Safely no-ops if Level column is not installed.
         """
         if (not hasattr(self.main_window, "level_role") or not self.main_window.level_delegate
                 or not self.main_window.is_pro_level_column_enabled()):
@@ -179,8 +367,7 @@ class FileTreeManager:
             item = iterator.value()
             abs_path = item.data(0, QtCore.Qt.UserRole)
             if abs_path and os.path.isfile(abs_path):
-                is_checked = item.checkState(0) == QtCore.Qt.Checked
-                level_index = 3 if is_checked else 1
+                level_index = self._default_level(item)
                 item.setData(1, self.main_window.level_role, level_index)
                 if labels and 0 <= level_index < len(labels):
                     item.setData(1, QtCore.Qt.DisplayRole, labels[level_index])
@@ -198,8 +385,7 @@ class FileTreeManager:
         def recurse(item):
             abs_path = item.data(0, QtCore.Qt.UserRole)
             if abs_path and os.path.isfile(abs_path):
-                is_checked = item.checkState(0) == QtCore.Qt.Checked
-                level_index = 3 if is_checked else 1
+                level_index = self._default_level(item)
                 item.setData(1, self.main_window.level_role, level_index)
                 if labels and 0 <= level_index < len(labels):
                     item.setData(1, QtCore.Qt.DisplayRole, labels[level_index])
@@ -209,23 +395,28 @@ class FileTreeManager:
         recurse(root_item)
 
     def select_all(self):
+        ws = workspace.current()
+        configs = {}
+
         def check_all(item):
             abs_path = item.data(0, QtCore.Qt.UserRole)
-            rel_path = os.path.relpath(
-                abs_path, os.getcwd()) if abs_path else None
+            rel_path = ws.root_relpath(abs_path) if abs_path else None
             is_excluded = False
             if rel_path:
-                is_excluded = smart_logic.exclude_spec.match_file(
-                    rel_path) or smart_logic.exclude_spec.match_file(rel_path + '/')
-                if os.path.isfile(abs_path) and smart_logic.is_binary_file(abs_path):
+                root = ws.root_of(abs_path)
+                cfg = configs.get(root)
+                if cfg is None:
+                    cfg = configs[root] = smart_logic.config_for(root)
+                is_excluded = cfg.is_excluded(rel_path, not item.data(0, IS_FILE_ROLE))
+                if item.data(0, IS_BINARY_ROLE):
                     is_excluded = True
+            # Unloaded folders are not expanded here; checking them records
+            # a selection rule that is applied when they are expanded.
             if item.flags() & QtCore.Qt.ItemIsUserCheckable and item.flags() & QtCore.Qt.ItemIsEnabled and not is_excluded:
-                item.setCheckState(0, QtCore.Qt.Checked)
+                self.set_item_checked(item, QtCore.Qt.Checked)
             else:
-                item.setCheckState(0, QtCore.Qt.Unchecked)
+                self.set_item_checked(item, QtCore.Qt.Unchecked)
             for i in range(item.childCount()):
-                if os.path.isdir(abs_path):
-                    self.on_item_expanded(item)
                 check_all(item.child(i))
         self.main_window.tree_widget.blockSignals(True)
         try:
@@ -251,6 +442,7 @@ class FileTreeManager:
                 iterator += 1
         finally:
             self.main_window.tree_widget.blockSignals(False)
+        self._clear_selection()
         # Sync Level column across tree after bulk deselection
         if (hasattr(self.main_window, "level_role") and self.main_window.level_delegate
                 and self.main_window.is_pro_level_column_enabled()):
@@ -1,3 +1,12 @@
 from .update_events import UpdateCheckWorker
+from .token_events import TokenCountWorker
+from .index_events import PathIndexWorker
+from .stats_events import TreeStatsWorker
+from .dependency_events import DependencyIndexWorker
+from .relevance_events import RelevanceIndexWorker
+from .duplicate_events import NearDuplicateWorker
+from .cochange_events import CoChangeWorker
 
-__all__ = ['UpdateCheckWorker']
+__all__ = ['UpdateCheckWorker', 'TokenCountWorker', 'PathIndexWorker',
+           'TreeStatsWorker', 'DependencyIndexWorker',
+           'RelevanceIndexWorker', 'NearDuplicateWorker', 'CoChangeWorker']
@@ -0,0 +1,34 @@
+import logging
+import os
+from PySide6 import QtCore
+from aicodeprep_gui.cochange import CoChangeIndex, repo_root
+
+
+class CoChangeSignals(QtCore.QObject):
+    finished = QtCore.Signal(object)  # {root: (CoChangeIndex, path of root in the repository)}
+
+
+class CoChangeWorker(QtCore.QRunnable):
+    """Mines the git history of each scanned root's repository on the thread pool."""
+
+    def __init__(self, roots):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.roots = roots
+        self.signals = CoChangeSignals()
+
+    def run(self):
+        indexes, by_top = {}, {}
+        for root in self.roots:
+            top = repo_root(root)
+            if top is None:
+                continue
+            if top not in by_top:
+                index = CoChangeIndex(top)
+                by_top[top] = index if index.update() else None
+            if by_top[top] is None:
+                continue
+            prefix = os.path.relpath(os.path.realpath(root), os.path.realpath(top))
+            indexes[root] = (by_top[top], "" if prefix == "." else prefix.replace(os.sep, "/") + "/")
+        logging.debug(f"Co-change mining done for {len(by_top)} repositories")
+        self.signals.finished.emit(indexes)
@@ -0,0 +1,32 @@
+import logging
+from PySide6 import QtCore
+from aicodeprep_gui.import_graph import DependencyIndex
+
+
+class DependencyIndexSignals(QtCore.QObject):
+    finished = QtCore.Signal(object)  # {root: DependencyIndex}
+
+
+class DependencyIndexWorker(QtCore.QRunnable):
+    """
+    Builds the import graph of each workspace root on the thread pool. Files
+    unchanged since the last run are taken from the on-disk cache.
+    """
+
+    def __init__(self, files_by_root):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.files_by_root = files_by_root  # root -> ["/"-separated paths relative to it]
+        self.signals = DependencyIndexSignals()
+
+    def run(self):
+        indexes = {}
+        for root, rel_paths in self.files_by_root.items():
+            index = DependencyIndex(root)
+            try:
+                index.build(rel_paths)
+            except Exception as e:
+                logging.warning(f"Could not build the dependency index for {root}: {e}")
+                continue
+            indexes[root] = index
+        self.signals.finished.emit(indexes)
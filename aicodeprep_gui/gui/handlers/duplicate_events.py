@@ -0,0 +1,29 @@
+import logging
+from PySide6 import QtCore
+from aicodeprep_gui import near_duplicates
+
+
+class NearDuplicateSignals(QtCore.QObject):
+    finished = QtCore.Signal(object)  # [[file_path, ...], ...]
+
+
+class NearDuplicateWorker(QtCore.QRunnable):
+    """Signs scanned text files and groups near-duplicates on the thread pool."""
+
+    def __init__(self, file_paths):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.file_paths = file_paths
+        self.signals = NearDuplicateSignals()
+
+    def run(self):
+        signatures = {}
+        for file_path in self.file_paths:
+            try:
+                sig = near_duplicates.file_signature(file_path)
+            except OSError as e:
+                logging.debug(f"Near-duplicate scan skipped {file_path}: {e}")
+                continue
+            if sig is not None:
+                signatures[file_path] = sig
+        self.signals.finished.emit(near_duplicates.clusters(signatures))
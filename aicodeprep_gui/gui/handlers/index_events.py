@@ -0,0 +1,19 @@
+from PySide6 import QtCore
+from aicodeprep_gui.path_index import PathIndex
+
+
+class PathIndexSignals(QtCore.QObject):
+    finished = QtCore.Signal(object)  # PathIndex
+
+
+class PathIndexWorker(QtCore.QRunnable):
+    """Builds the filter box's PathIndex from scanned paths on the thread pool."""
+
+    def __init__(self, paths):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.paths = paths
+        self.signals = PathIndexSignals()
+
+    def run(self):
+        self.signals.finished.emit(PathIndex(self.paths))
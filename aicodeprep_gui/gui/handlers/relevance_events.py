@@ -0,0 +1,34 @@
+import logging
+from PySide6 import QtCore
+from aicodeprep_gui.relevance import RelevanceIndex
+
+
+class RelevanceIndexSignals(QtCore.QObject):
+    finished = QtCore.Signal(object)  # {root: RelevanceIndex}
+
+
+class RelevanceIndexWorker(QtCore.QRunnable):
+    """
+    Brings the prompt relevance index of each workspace root up to date on
+    the thread pool. Only files changed since the last run are read; the rest
+    comes from the on-disk index, or from indexes passed in from an earlier run.
+    """
+
+    def __init__(self, files_by_root, indexes=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.files_by_root = files_by_root  # root -> ["/"-separated paths relative to it]
+        self.indexes = dict(indexes or {})
+        self.signals = RelevanceIndexSignals()
+
+    def run(self):
+        indexes = {}
+        for root, rel_paths in self.files_by_root.items():
+            index = self.indexes.get(root) or RelevanceIndex(root)
+            try:
+                index.build(rel_paths)
+            except Exception as e:
+                logging.warning(f"Could not build the relevance index for {root}: {e}")
+                continue
+            indexes[root] = index
+        self.signals.finished.emit(indexes)
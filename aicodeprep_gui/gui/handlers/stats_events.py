@@ -0,0 +1,57 @@
+import os
+from PySide6 import QtCore
+
+
+def dir_chain(rel_dir):
+    """The folder itself and all its ancestors, as relative paths ("" is the root)."""
+    chain = [""]
+    if rel_dir:
+        parts = rel_dir.split(os.sep)
+        for i in range(1, len(parts) + 1):
+            chain.append(os.sep.join(parts[:i]))
+    return chain
+
+
+class TreeStatsSignals(QtCore.QObject):
+    # [(file_path, rel_dir, size), ...], {rel_dir: [bytes, tokens]}
+    sized = QtCore.Signal(object, object)
+    finished = QtCore.Signal()
+
+
+class TreeStatsWorker(QtCore.QRunnable):
+    """
+    Stats scanned files on the thread pool and rolls their sizes up into
+    per-folder totals, so the GUI only merges one small dict per batch.
+    Tokens are estimated from the size at the same 4 bytes per token as
+    smart_logic.estimate_tokens until the token counter reads the file.
+    """
+    BATCH_SIZE = 2048
+
+    def __init__(self, file_paths, display_path):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.file_paths = file_paths
+        self.display_path = display_path  # abs path -> tree-relative path
+        self.signals = TreeStatsSignals()
+
+    def run(self):
+        entries, totals = [], {}
+        for file_path in self.file_paths:
+            try:
+                size = os.path.getsize(file_path)
+                rel_dir = os.path.dirname(self.display_path(file_path))
+            except (OSError, ValueError):
+                continue
+            entries.append((file_path, rel_dir, size))
+            for dir_rel in dir_chain(rel_dir):
+                total = totals.get(dir_rel)
+                if total is None:
+                    total = totals[dir_rel] = [0, 0]
+                total[0] += size
+                total[1] += size // 4
+            if len(entries) >= self.BATCH_SIZE:
+                self.signals.sized.emit(entries, totals)
+                entries, totals = [], {}
+        if entries:
+            self.signals.sized.emit(entries, totals)
+        self.signals.finished.emit()
@@ -0,0 +1,70 @@
+import os
+import time
+from PySide6 import QtCore
+from aicodeprep_gui import tracing, workspace
+from aicodeprep_gui.smart_logic import estimate_tokens, iter_included_files
+
+
+class TokenCountSignals(QtCore.QObject):
+    counted = QtCore.Signal(int, object)  # generation, [(file_path, tokens), ...]
+    rule_counted = QtCore.Signal(int, str, object, object)  # generation, dir_path, tokens, bytes
+    finished = QtCore.Signal(int)  # generation
+
+
+class TokenCountWorker(QtCore.QRunnable):
+    """
+    Counts tokens for a list of files, then for each rule-selected folder as a
+    whole, on the thread pool. Stops early once superseded; a folder that was
+    interrupted reports nothing and is recounted by the next worker.
+    """
+    BATCH_SIZE = 64
+    BATCH_INTERVAL = 0.1  # seconds between partial results
+
+    def __init__(self, generation, file_paths, is_current, rule_dirs=()):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.file_paths = file_paths
+        self.rule_dirs = rule_dirs
+        self.is_current = is_current
+        self.signals = TokenCountSignals()
+
+    def run(self):
+        with tracing.span("tokens.count", files=len(self.file_paths),
+                          folders=len(self.rule_dirs)):
+            self._count()
+        self.signals.finished.emit(self.generation)
+
+    def _count(self):
+        batch = []
+        last_emit = time.monotonic()
+        for file_path in self.file_paths:
+            if not self.is_current(self.generation):
+                break
+            batch.append((file_path, estimate_tokens(file_path)))
+            now = time.monotonic()
+            if len(batch) >= self.BATCH_SIZE or now - last_emit >= self.BATCH_INTERVAL:
+                self.signals.counted.emit(self.generation, batch)
+                batch = []
+                last_emit = now
+        if batch:
+            self.signals.counted.emit(self.generation, batch)
+        for dir_path in self.rule_dirs:
+            counted = self._count_folder(dir_path)
+            if counted is None:
+                break
+            self.signals.rule_counted.emit(self.generation, dir_path, *counted)
+
+    def _count_folder(self, dir_path):
+        """(tokens, bytes) of a rule-selected folder, or None if superseded midway."""
+        tokens = nbytes = 0
+        root_dir = workspace.current().root_of(dir_path)
+        for file_path in iter_included_files(dir_path, root_dir):
+            if not self.is_current(self.generation):
+                return None
+            tokens += estimate_tokens(file_path, root_dir)
+            try:
+                nbytes += os.path.getsize(file_path)
+            except OSError:
+                pass
+        return tokens, nbytes
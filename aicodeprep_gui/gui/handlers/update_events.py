@@ -5,10 +5,10 @@ from PySide6 import QtCore
 from aicodeprep_gui import update_checker
 
 class UpdateCheckWorker(QtCore.QObject):
-    """A worker that runs in a separate thread to check for updates without blocking the GUI."""
+    """Checks for updates off the GUI thread; run() is called as an outbox job."""
     finished = QtCore.Signal(str)  # Emits message string or empty string if no update
 
     def run(self):
-        """Fetches update info and emits the result."""
+        """Fetches update info (or reuses the cached answer) and emits the result."""
         message = update_checker.get_update_info()
         self.finished.emit(message or "")
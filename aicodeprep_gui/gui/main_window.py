@@ -3,78 +3,82 @@ import os
 import sys
 import platform
 import logging
+import time
 import uuid
 import json
 from datetime import datetime, date
-from PySide6 import QtWidgets, QtCore, QtGui, QtNetwork
+from PySide6 import QtWidgets, QtCore, QtGui
 from aicodeprep_gui import __version__
-from aicodeprep_gui import update_checker
-from PySide6.QtCore import QTemporaryDir
 from importlib import resources
 from aicodeprep_gui.apptheme import (
     system_pref_is_dark, apply_dark_palette, apply_light_palette,
     get_checkbox_style_dark, get_checkbox_style_light,
-    create_arrow_pixmap, get_groupbox_style
+    cached_arrow_pixmap_paths, get_groupbox_style
 )
 from typing import List, Tuple
 from aicodeprep_gui import smart_logic
+from aicodeprep_gui import tracing
+from aicodeprep_gui import outbox, update_checker
 from aicodeprep_gui.file_processor import process_files
 from aicodeprep_gui import __version__
 from aicodeprep_gui import pro
 
 # New modular imports
+# Dialogs, installer dialogs, presets, QtNetwork and the update checker are
+# imported on first use so they stay off the cold-start path.
 from .components.layouts import FlowLayout
-from .components.dialogs import DialogManager, VoteDialog
-from .components.tree_widget import FileTreeManager
+from .components.tree_widget import FileTreeManager, IS_FILE_ROLE, IS_BINARY_ROLE
 from .components.preset_buttons import PresetButtonManager
+from .components.tree_filter import TreeFilterManager
+from .components.tree_stats import TreeStatsManager
+from .components.dependency_select import DependencyManager
+from .components.relevance_select import RelevanceManager
+from .components.duplicate_groups import NearDuplicateManager
+from .components.cochange_list import CoChangeManager
 # Level delegate is provided via Pro getter when enabled
 from aicodeprep_gui import pro
-from .settings.presets import global_preset_manager
 from .settings.preferences import PreferencesManager
+from .settings.selection_sets import SelectionSetsManager
 from .settings.ui_settings import UISettingsManager
-from .handlers.update_events import UpdateCheckWorker
 from .utils.metrics import MetricsManager
+from .utils.token_counter import TokenCounterManager
 from .utils.helpers import WindowHelpers
 
 
 class FileSelectionGUI(QtWidgets.QMainWindow):
+    @tracing.traced("window.init")
     def __init__(self, files):
         super().__init__()
-        self.dialog_manager = DialogManager(self)
+        self._dialog_manager = None
+        self._network_manager = None
         self.preferences_manager = PreferencesManager(self)
+        self.selection_sets = SelectionSetsManager(self)
         self.ui_settings_manager = UISettingsManager(self)
         self.tree_manager = FileTreeManager(self)
         self.preset_manager = PresetButtonManager(self)
+        self.tree_filter = TreeFilterManager(self)
+        self.tree_stats = TreeStatsManager(self)
+        self.dependency_select = DependencyManager(self)
+        self.relevance_select = RelevanceManager(self)
+        self.near_duplicates = NearDuplicateManager(self)
+        self.cochange = CoChangeManager(self)
         self.metrics_manager = MetricsManager(self)
+        self.token_counter = TokenCounterManager(self)
         self.window_helpers = WindowHelpers(self)
 
         self.initial_show_event = True
-        self.temp_dir = QTemporaryDir()
-        self.arrow_pixmap_paths = {}
-        if self.temp_dir.isValid():
-            self._generate_arrow_pixmaps()
-        else:
-            logging.warning(
-                "Could not create temporary directory for theme assets.")
-
+        self.first_paint_done = False
+        self._startup_deferred_done = False
+        self._construct_started = time.perf_counter()
+        # Rendered once into the user cache folder, then reused across launches
+        self.arrow_pixmap_paths = cached_arrow_pixmap_paths()
+
+        self.app_icon = None
+        self.tray_icon = None
         try:
             with resources.path('aicodeprep_gui.images', 'favicon.ico') as icon_path:
-                app_icon = QtGui.QIcon(str(icon_path))
-            self.setWindowIcon(app_icon)
-            from PySide6.QtWidgets import QSystemTrayIcon, QMenu
-            from PySide6.QtGui import QAction
-            tray = QSystemTrayIcon(app_icon, parent=self)
-            menu = QMenu()
-            show_act = QAction("Show", self)
-            quit_act = QAction("Quit", self)
-            show_act.triggered.connect(self.show)
-            quit_act.triggered.connect(self.quit_without_processing)
-            menu.addAction(show_act)
-            menu.addSeparator()
-            menu.addAction(quit_act)
-            tray.setContextMenu(menu)
-            tray.show()
-            self.tray_icon = tray
+                self.app_icon = QtGui.QIcon(str(icon_path))
+            self.setWindowIcon(self.app_icon)
         except FileNotFoundError:
             logging.warning(
                 "Application icon 'favicon.ico' not found in package resources.")
@@ -83,7 +87,6 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         self.setAcceptDrops(True)
         self.files = files
         self.latest_pypi_version = None
-        self.network_manager = QtNetwork.QNetworkAccessManager(self)
 
         settings = QtCore.QSettings("aicodeprep-gui", "UserIdentity")
         self.user_uuid = settings.value("user_uuid")
@@ -102,8 +105,6 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         settings.setValue("app_open_count", app_open_count)
         self.app_open_count = app_open_count
 
-        self._send_metric_event("open")
-
         # Track generate context clicks for share dialog
         generate_count = settings.value("generate_count", 0, type=int)
         try:
@@ -119,13 +120,7 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
             install_date_str = today_iso
         logging.debug(f"Stored install_date: {install_date_str}")
 
-        now = datetime.now()
-        time_str = f"{now.strftime('%I').lstrip('0') or '12'}{now.strftime('%M')}{now.strftime('%p').lower()}"
-        request = QtNetwork.QNetworkRequest(QtCore.QUrl(
-            f"https://wuu73.org/dixels/newaicp.html?t={time_str}&user={self.user_uuid}"))
-        self.network_manager.get(request)
-
-        self.update_thread = None
+        self.update_worker = None
         self.setWindowTitle("aicodeprep-gui - File Selection")
         self.app = QtWidgets.QApplication.instance()
         if self.app is None:
@@ -172,9 +167,8 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
 
         # Add OS-specific installer menu items
         if platform.system() == "Windows":
-            from .components.installer_dialogs import RegistryManagerDialog
-
             def open_registry_manager():
+                from .components.installer_dialogs import RegistryManagerDialog
                 dialog = RegistryManagerDialog(self)
                 dialog.exec()
             install_menu_act = QtGui.QAction(
@@ -184,9 +178,8 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
             file_menu.addSeparator()
 
         elif platform.system() == "Darwin":
-            from .components.installer_dialogs import MacInstallerDialog
-
             def open_mac_installer():
+                from .components.installer_dialogs import MacInstallerDialog
                 dialog = MacInstallerDialog(self)
                 dialog.exec()
             install_menu_act = QtGui.QAction(
@@ -196,9 +189,8 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
             file_menu.addSeparator()
 
         elif platform.system() == "Linux":
-            from .components.installer_dialogs import LinuxInstallerDialog
-
             def open_linux_installer():
+                from .components.installer_dialogs import LinuxInstallerDialog
                 dialog = LinuxInstallerDialog(self)
                 dialog.exec()
             install_menu_act = QtGui.QAction(
@@ -288,8 +280,14 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         main_layout.addWidget(self.text_label)
 
         # Initialize some required attributes
-        self.selected_files = []
+        # Checked files as an insertion-ordered set (abs_path -> tree item),
+        # maintained by the tree manager on every check state change.
+        self.selected_files = {}
+        self.selected_files_order = None
+        # Checked folders whose children are not loaded yet (abs_path -> tree item)
+        self.selection_rules = {}
         self.file_token_counts = {}
+        self.rule_token_counts = {}
         self.total_tokens = 0
 
         # Preset buttons setup
@@ -347,6 +345,8 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         # Hide level column by default
         self.tree_widget.setColumnHidden(1, True)
         self.tree_widget.header().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        # Aggregated per-folder token column
+        self.tree_stats.setup_column()
 
         # Pro level column state tracking
         self.pro_level_column_enabled = False
@@ -364,7 +364,30 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         ) if self.is_dark_mode else get_checkbox_style_light()
         self.tree_widget.setStyleSheet(base_style + checkbox_style)
 
-        self.splitter.addWidget(self.tree_widget)
+        # Filter box above the tree, backed by an index of the scanned paths
+        self.filter_box = QtWidgets.QLineEdit()
+        self.filter_box.setPlaceholderText("Filter files… (substring or fuzzy)")
+        self.filter_box.setClearButtonEnabled(True)
+        self.filter_box.textChanged.connect(self.tree_filter.apply_filter)
+        self.filter_status_label = QtWidgets.QLabel("")
+        self.check_matches_button = QtWidgets.QPushButton("Check all matches")
+        self.check_matches_button.setEnabled(False)
+        self.check_matches_button.clicked.connect(
+            self.tree_filter.check_all_matches)
+
+        filter_layout = QtWidgets.QHBoxLayout()
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout.addWidget(self.filter_box)
+        filter_layout.addWidget(self.filter_status_label)
+        filter_layout.addWidget(self.check_matches_button)
+
+        tree_container = QtWidgets.QWidget()
+        tree_layout = QtWidgets.QVBoxLayout(tree_container)
+        tree_layout.setContentsMargins(0, 0, 0, 0)
+        tree_layout.addLayout(filter_layout)
+        tree_layout.addWidget(self.tree_widget)
+        self.cochange.setup_list(tree_layout)
+        self.splitter.addWidget(tree_container)
 
         prompt_widget = QtWidgets.QWidget()
         prompt_layout = QtWidgets.QVBoxLayout(prompt_widget)
@@ -381,7 +404,11 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         self.clear_prompt_btn = QtWidgets.QPushButton("Clear")
         self.clear_prompt_btn.setToolTip("Clear the prompt box")
         self.clear_prompt_btn.clicked.connect(self.prompt_textbox.clear)
-        prompt_layout.addWidget(self.clear_prompt_btn)
+        prompt_buttons_layout = QtWidgets.QHBoxLayout()
+        prompt_buttons_layout.addWidget(self.clear_prompt_btn)
+        self.relevance_select.setup_button(prompt_buttons_layout)
+        prompt_buttons_layout.addStretch()
+        prompt_layout.addLayout(prompt_buttons_layout)
 
         self.splitter.addWidget(prompt_widget)
         self.splitter.setStretchFactor(0, 4)
@@ -390,49 +417,14 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
 
         # Build tree from files
         self.path_to_item = {}
-        root_node = self.tree_widget.invisibleRootItem()
-        for abs_path, rel_path, is_checked in files:
-            parts = rel_path.split(os.sep)
-            parent_node = root_node
-            path_so_far = ""
-            for part in parts[:-1]:
-                # Ensure Level column default state for intermediate folders if created
-                path_so_far = os.path.join(
-                    path_so_far, part) if path_so_far else part
-                if path_so_far in self.path_to_item:
-                    parent_node = self.path_to_item[path_so_far]
-                else:
-                    # Always create with two columns since tree widget always has two columns
-                    new_parent = QtWidgets.QTreeWidgetItem(
-                        parent_node, [part, ""])
-                    new_parent.setIcon(0, self.folder_icon)
-                    new_parent.setFlags(new_parent.flags()
-                                        | QtCore.Qt.ItemIsUserCheckable)
-                    new_parent.setCheckState(0, QtCore.Qt.Unchecked)
-                    self.path_to_item[path_so_far] = new_parent
-                    parent_node = new_parent
-
-            item_text = parts[-1]
-            # Always create with two columns since tree widget always has two columns
-            item = QtWidgets.QTreeWidgetItem(parent_node, [item_text, ""])
-            item.setData(0, QtCore.Qt.UserRole, abs_path)
-            self.path_to_item[rel_path] = item
-
-            if self.preferences_manager.prefs_loaded:
-                is_checked = rel_path in self.preferences_manager.checked_files_from_prefs
-
-            if os.path.isdir(abs_path):
-                item.setIcon(0, self.folder_icon)
-                item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
-                item.setCheckState(0, QtCore.Qt.Unchecked)
-            else:
-                item.setIcon(0, self.file_icon)
-                item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
-                if smart_logic.is_binary_file(abs_path):
-                    is_checked = False
+        self._populate_tree(files)
 
-            item.setCheckState(
-                0, QtCore.Qt.Checked if is_checked else QtCore.Qt.Unchecked)
+        self.tree_filter.start_indexing()
+        self.tree_stats.start()
+        self.dependency_select.start_indexing()
+        self.relevance_select.start_indexing()
+        self.near_duplicates.start()
+        self.cochange.start()
 
         # Do not attach Level delegate by default; installed via Pro toggle
         self.level_delegate = None
@@ -440,11 +432,12 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         # Connect tree signals
         self.tree_widget.itemExpanded.connect(self.on_item_expanded)
         self.tree_widget.itemChanged.connect(self.handle_item_changed)
+        self.dependency_select.setup_menu()
 
         # Auto-expand folders containing checked files
-        if self.preferences_manager.prefs_loaded and self.preferences_manager.checked_files_from_prefs:
+        if self.preferences_manager.prefs_loaded and self.preferences_manager.selection_from_prefs:
             self._expand_folders_for_paths(
-                self.preferences_manager.checked_files_from_prefs)
+                self.preferences_manager.checked_relpaths())
         else:
             # On first load (no prefs), expand based on smart-selected files
             initial_checked_paths = {rel_path for _,
@@ -460,6 +453,8 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
             "Add prompt/question to top")
         self.prompt_bottom_checkbox = QtWidgets.QCheckBox(
             "Add prompt/question to bottom")
+        self.skip_duplicates_checkbox = QtWidgets.QCheckBox(
+            "Keep one file per near-duplicate group")
 
         # Load global prompt option settings
         self._load_prompt_options()
@@ -469,6 +464,8 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
             self._save_prompt_options)
         self.prompt_bottom_checkbox.stateChanged.connect(
             self._save_prompt_options)
+        self.skip_duplicates_checkbox.stateChanged.connect(
+            self._save_prompt_options)
 
         # Options group
         options_group_box = QtWidgets.QGroupBox("Options")
@@ -525,6 +522,19 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         prompt_bottom_layout.addStretch()
         options_content_layout.addLayout(prompt_bottom_layout)
 
+        # Near-duplicate checkbox with help icon
+        skip_duplicates_help = QtWidgets.QLabel(
+            "<b style='color:#0078D4; font-size:14px; cursor:help;'>?</b>")
+        skip_duplicates_help.setToolTip(
+            "Files that are nearly identical (generated clients, per-locale variants, copied templates) are shown in italics. With this on, only the first checked file of each group goes into the output; the others are listed at the end as skipped, to save tokens")
+        skip_duplicates_help.setAlignment(QtCore.Qt.AlignVCenter)
+        skip_duplicates_layout = QtWidgets.QHBoxLayout()
+        skip_duplicates_layout.setContentsMargins(0, 0, 0, 0)
+        skip_duplicates_layout.addWidget(self.skip_duplicates_checkbox)
+        skip_duplicates_layout.addWidget(skip_duplicates_help)
+        skip_duplicates_layout.addStretch()
+        options_content_layout.addLayout(skip_duplicates_layout)
+
         group_box_main_layout = QtWidgets.QVBoxLayout(options_group_box)
         group_box_main_layout.setContentsMargins(10, 5, 10, 10)
         group_box_main_layout.addWidget(options_container)
@@ -655,6 +665,15 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         button_layout1.addWidget(deselect_all_button)
 
         button_layout2.addStretch()
+        selection_sets_button = QtWidgets.QPushButton("Selection sets")
+        selection_sets_menu = QtWidgets.QMenu(selection_sets_button)
+        selection_sets_menu.aboutToShow.connect(
+            lambda: self.selection_sets.build_menu(selection_sets_menu))
+        selection_sets_button.setMenu(selection_sets_menu)
+        selection_sets_button.setToolTip(
+            "Save, switch between and combine named file selections for this folder")
+        button_layout2.addWidget(selection_sets_button)
+
         load_prefs_button = QtWidgets.QPushButton("Load preferences")
         load_prefs_button.clicked.connect(self.load_from_prefs_button_clicked)
         button_layout2.addWidget(load_prefs_button)
@@ -718,6 +737,9 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
     def get_selected_files(self):
         return self.tree_manager.get_selected_files()
 
+    def get_file_levels(self):
+        return self.tree_manager.get_file_levels()
+
     def select_all(self):
         return self.tree_manager.select_all()
 
@@ -739,6 +761,54 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
     def delete_preset_dialog(self):
         return self.dialog_manager.delete_preset_dialog()
 
+    @property
+    def dialog_manager(self):
+        if self._dialog_manager is None:
+            from .components.dialogs import DialogManager
+            self._dialog_manager = DialogManager(self)
+        return self._dialog_manager
+
+    @property
+    def network_manager(self):
+        """Created on first use: QtNetwork and its TLS setup are slow to load."""
+        if self._network_manager is None:
+            from PySide6 import QtNetwork
+            self._network_manager = QtNetwork.QNetworkAccessManager(self)
+        return self._network_manager
+
+    def _deferred_startup(self):
+        """Work that does not affect the first frame; runs once it has been painted."""
+        if self._startup_deferred_done:
+            return
+        self._startup_deferred_done = True
+        logging.debug(
+            f"First paint {1000 * (time.perf_counter() - self._construct_started):.0f} ms after window construction began")
+        self._create_tray_icon()
+        self._send_metric_event("open")
+
+        now = datetime.now()
+        time_str = f"{now.strftime('%I').lstrip('0') or '12'}{now.strftime('%M')}{now.strftime('%p').lower()}"
+        outbox.get_outbox().ping(
+            f"https://wuu73.org/dixels/newaicp.html?t={time_str}&user={self.user_uuid}")
+
+        self._start_update_check()
+
+    def _create_tray_icon(self):
+        if self.app_icon is None or self.tray_icon is not None:
+            return
+        tray = QtWidgets.QSystemTrayIcon(self.app_icon, parent=self)
+        menu = QtWidgets.QMenu()
+        show_act = QtGui.QAction("Show", self)
+        quit_act = QtGui.QAction("Quit", self)
+        show_act.triggered.connect(self.show)
+        quit_act.triggered.connect(self.quit_without_processing)
+        menu.addAction(show_act)
+        menu.addSeparator()
+        menu.addAction(quit_act)
+        tray.setContextMenu(menu)
+        tray.show()
+        self.tray_icon = tray
+
     def _send_metric_event(self, event_type, token_count=None):
         return self.metrics_manager._send_metric_event(event_type, token_count)
 
@@ -754,18 +824,24 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
     def showEvent(self, event):
         return self.window_helpers.showEvent(event)
 
+    def paintEvent(self, event):
+        return self.window_helpers.paintEvent(event)
+
     def closeEvent(self, event):
         try:
             # Cancel any pending network requests before shutdown
-            if hasattr(self, 'network_manager'):
-                self.network_manager.clearAccessCache()
+            if self._network_manager is not None:
+                self._network_manager.clearAccessCache()
+            self.token_counter.cancel()
+            if getattr(self, 'preview_window', None):
+                self.preview_window.shutdown()
 
             # ... rest of your existing closeEvent code ...
 
-            # Don't send metrics during shutdown to avoid HTTP/2 errors
+            # Only queued to disk here; the outbox sends it on a later flush
             if self.action != 'process':
                 self.action = 'quit'
-                # self._send_metric_event("quit")  # Disabled to prevent HTTP/2 errors
+                self._send_metric_event("quit")
 
             super(FileSelectionGUI, self).closeEvent(event)
         except Exception as e:
@@ -862,47 +938,64 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         """Returns True if the pro level column is currently enabled and visible."""
         return getattr(self, 'pro_level_column_enabled', False)
 
-    def _generate_arrow_pixmaps(self):
-        """Generates arrow icons and saves them to the temporary directory."""
-        if not self.temp_dir.isValid():
-            return
+    @tracing.traced("tree.build")
+    def _populate_tree(self, files):
+        """Create tree items for the scanned files, applying saved or smart-default checks."""
+        root_node = self.tree_widget.invisibleRootItem()
+        for abs_path, rel_path, is_checked in files:
+            parts = rel_path.split(os.sep)
+            parent_node = root_node
+            path_so_far = ""
+            for part in parts[:-1]:
+                # Ensure Level column default state for intermediate folders if created
+                path_so_far = os.path.join(
+                    path_so_far, part) if path_so_far else part
+                if path_so_far in self.path_to_item:
+                    parent_node = self.path_to_item[path_so_far]
+                else:
+                    # Always create with two columns since tree widget always has two columns
+                    new_parent = QtWidgets.QTreeWidgetItem(
+                        parent_node, [part, ""])
+                    new_parent.setIcon(0, self.folder_icon)
+                    new_parent.setFlags(new_parent.flags()
+                                        | QtCore.Qt.ItemIsUserCheckable)
+                    new_parent.setCheckState(0, QtCore.Qt.Unchecked)
+                    self.path_to_item[path_so_far] = new_parent
+                    parent_node = new_parent
+
+            item_text = parts[-1]
+            # Always create with two columns since tree widget always has two columns
+            item = QtWidgets.QTreeWidgetItem(parent_node, [item_text, ""])
+            item.setData(0, QtCore.Qt.UserRole, abs_path)
+            self.path_to_item[rel_path] = item
+
+            is_dir = os.path.isdir(abs_path)
+            if self.preferences_manager.prefs_loaded:
+                # Folders start unchecked; their files carry the saved selection
+                is_checked = not is_dir and self.preferences_manager.selection_from_prefs.is_selected(rel_path)
+
+            if is_dir:
+                item.setIcon(0, self.folder_icon)
+                item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+                item.setCheckState(0, QtCore.Qt.Unchecked)
+            else:
+                item.setIcon(0, self.file_icon)
+                item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+                item.setData(0, IS_FILE_ROLE, True)
+                if smart_logic.is_binary_file(abs_path):
+                    item.setData(0, IS_BINARY_ROLE, True)
+                    is_checked = False
 
-        colors = {
-            "light_fg": "#333333",
-            "dark_fg": "#DDDDDD"
-        }
-
-        # Light theme arrows
-        pix_right_light = create_arrow_pixmap(
-            'right', color=colors["light_fg"])
-        path_right_light = os.path.join(
-            self.temp_dir.path(), "arrow_right_light.png")
-        pix_right_light.save(path_right_light, "PNG")
-
-        pix_down_light = create_arrow_pixmap('down', color=colors["light_fg"])
-        path_down_light = os.path.join(
-            self.temp_dir.path(), "arrow_down_light.png")
-        pix_down_light.save(path_down_light, "PNG")
-
-        # Dark theme arrows
-        pix_right_dark = create_arrow_pixmap('right', color=colors["dark_fg"])
-        path_right_dark = os.path.join(
-            self.temp_dir.path(), "arrow_right_dark.png")
-        pix_right_dark.save(path_right_dark, "PNG")
-
-        pix_down_dark = create_arrow_pixmap('down', color=colors["dark_fg"])
-        path_down_dark = os.path.join(
-            self.temp_dir.path(), "arrow_down_dark.png")
-        pix_down_dark.save(path_down_dark, "PNG")
-
-        self.arrow_pixmap_paths = {
-            "light": {"down": path_down_light, "right": path_right_light},
-            "dark": {"down": path_down_dark, "right": path_right_dark},
-        }
+            state = QtCore.Qt.Checked if is_checked else QtCore.Qt.Unchecked
+            if item.data(0, IS_FILE_ROLE):
+                self.tree_manager.set_item_checked(item, state)
+            else:
+                # Folder contents come from the scan, so no selection rule is needed
+                item.setCheckState(0, state)
 
     def _update_groupbox_style(self, groupbox: QtWidgets.QGroupBox):
         """Applies the custom QGroupBox style based on the current theme."""
-        if not groupbox or not self.temp_dir.isValid() or not self.arrow_pixmap_paths:
+        if not groupbox or not self.arrow_pixmap_paths:
             return
 
         theme = "dark" if self.is_dark_mode else "light"
@@ -915,20 +1008,19 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         groupbox.setStyleSheet(style)
 
     def _start_update_check(self):
-        """Starts the simple, non-blocking update check."""
-        self.update_thread = QtCore.QThread()
-        self.update_worker = UpdateCheckWorker()
-        self.update_worker.moveToThread(self.update_thread)
-
-        self.update_thread.started.connect(self.update_worker.run)
+        """
+        Shows the cached update-check result while it is fresh; otherwise checks
+        on the outbox thread, so the GUI never waits on the network.
+        """
+        cached = update_checker.cached_update_info()
+        if cached is not None:
+            self.on_update_check_finished(cached)
+            return
+        from .handlers.update_events import UpdateCheckWorker
+        # Parented to the window: its queued result is dropped if the window is gone
+        self.update_worker = UpdateCheckWorker(self)
         self.update_worker.finished.connect(self.on_update_check_finished)
-
-        # Clean up thread and worker after finishing
-        self.update_worker.finished.connect(self.update_thread.quit)
-        self.update_worker.finished.connect(self.update_worker.deleteLater)
-        self.update_thread.finished.connect(self.update_thread.deleteLater)
-
-        self.update_thread.start()
+        outbox.get_outbox().submit(self.update_worker.run)
 
     def on_update_check_finished(self, message: str):
         """Slot to handle the result of the update check."""
@@ -952,7 +1044,10 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
             fmt=chosen_fmt,
             prompt=prompt,
             prompt_to_top=self.prompt_top_checkbox.isChecked(),
-            prompt_to_bottom=self.prompt_bottom_checkbox.isChecked()
+            prompt_to_bottom=self.prompt_bottom_checkbox.isChecked(),
+            levels=self.get_file_levels(),
+            duplicates=self.near_duplicates.redundant_files(selected_files)
+            if self.skip_duplicates_checkbox.isChecked() else None
         ) > 0:
             output_path = os.path.join(os.getcwd(), "fullcode.txt")
             with open(output_path, "r", encoding="utf-8") as f:
@@ -967,10 +1062,12 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
 
             # Enhanced clipboard operation with error handling
             try:
-                clipboard = QtWidgets.QApplication.clipboard()
-                clipboard.setText(content)
-                # Verify the clipboard operation succeeded
-                if clipboard.text() != content:
+                with tracing.span("clipboard.copy", chars=len(content)):
+                    clipboard = QtWidgets.QApplication.clipboard()
+                    clipboard.setText(content)
+                    # Verify the clipboard operation succeeded
+                    copied = clipboard.text() == content
+                if not copied:
                     logging.warning("Clipboard verification failed")
                     self.text_label.setText(
                         "Warning: Clipboard copy may have failed. Content saved to fullcode.txt")
@@ -1019,18 +1116,9 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         self.close()
 
     def update_token_counter(self):
-        total_tokens = 0
-        for file_path in self.get_selected_files():
-            if file_path not in self.file_token_counts:
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        text = f.read()
-                    self.file_token_counts[file_path] = len(text) // 4
-                except Exception:
-                    self.file_token_counts[file_path] = 0
-            total_tokens += self.file_token_counts[file_path]
-        self.total_tokens = total_tokens
-        self.token_label.setText(f"Estimated tokens: {total_tokens:,}")
+        # total_tokens is kept current by the tree manager as checks change;
+        # files not yet counted are handled by a coalesced background recount
+        self.token_counter.schedule_recount()
 
     def _save_format_choice(self, idx):
         """Save the current format choice to preferences."""
@@ -1088,8 +1176,14 @@ class FileSelectionGUI(QtWidgets.QMainWindow):
         if selected_items:
             item = selected_items[0]
             file_path = item.data(0, QtCore.Qt.UserRole)
-            if file_path and os.path.isfile(file_path):
+            if file_path and item.data(0, IS_FILE_ROLE):
                 self.preview_window.preview_file(file_path)
+                # Warm the cache for arrow-key browsing in either direction
+                neighbours = (self.tree_widget.itemAbove(item),
+                              self.tree_widget.itemBelow(item))
+                self.preview_window.prefetch(
+                    n.data(0, QtCore.Qt.UserRole) for n in neighbours
+                    if n is not None and n.data(0, IS_FILE_ROLE))
             else:
                 self.preview_window.clear_preview()
         else:
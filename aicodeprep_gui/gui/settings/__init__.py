@@ -1,5 +1,13 @@
-from .presets import GlobalPresetManager, global_preset_manager
+from .presets import GlobalPresetManager, get_global_preset_manager
 from .preferences import PreferencesManager
+from .selection_sets import SelectionSetsManager
 from .ui_settings import UISettingsManager
 
-__all__ = ['GlobalPresetManager', 'global_preset_manager', 'PreferencesManager', 'UISettingsManager']
+__all__ = ['GlobalPresetManager', 'global_preset_manager', 'get_global_preset_manager',
+           'PreferencesManager', 'SelectionSetsManager', 'UISettingsManager']
+
+
+def __getattr__(name):
+    if name == "global_preset_manager":
+        return get_global_preset_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,8 +2,11 @@ import os
 import logging
 import base64
 from PySide6 import QtCore
+from aicodeprep_gui import tracing, workspace
+from aicodeprep_gui.gui.components.tree_widget import IS_BINARY_ROLE, IS_FILE_ROLE
+from aicodeprep_gui.selection_rules import SelectionRules
 
-AICODEPREP_GUI_VERSION = "1.0"
+AICODEPREP_GUI_VERSION = "1.1"
 
 
 def _prefs_path():
@@ -18,8 +21,11 @@ def _prefs_path():
         return new_path
 
 
-def _write_prefs_file(checked_relpaths, window_size=None, splitter_state=None, output_format=None):
-    """Write preferences to .aicodeprep-gui file, now supports [format] section."""
+def _write_prefs_file(selection, window_size=None, splitter_state=None, output_format=None):
+    """
+    Write preferences to .aicodeprep-gui file, now supports [format] section.
+    The checked files are written as SelectionRules in a [selection] section.
+    """
     new_path = os.path.join(os.getcwd(), ".aicodeprep-gui")
     try:
         with open(new_path, "w", encoding="utf-8") as f:
@@ -44,8 +50,8 @@ def _write_prefs_file(checked_relpaths, window_size=None, splitter_state=None, o
                 f.write("\n")
             if output_format in ("xml", "markdown"):
                 f.write(f"[format]\noutput_format={output_format}\n\n")
-            if checked_relpaths:
-                f.write("[files]\n" + "\n".join(checked_relpaths) + "\n")
+            if selection:
+                f.write("[selection]\n" + "\n".join(selection.lines()) + "\n")
         logging.info(f"Saved preferences to {new_path}")
     except Exception as e:
         logging.warning(f"Could not write .aicodeprep-gui: {e}")
@@ -53,9 +59,11 @@ def _write_prefs_file(checked_relpaths, window_size=None, splitter_state=None, o
 
 def _read_prefs_file():
     """Read preferences file with backwards compatibility for legacy .auicp files (migrates to .aicodeprep-gui).
-    Returns checked, window_size, splitter_state, output_format (default 'xml').
+    Returns selection, window_size, splitter_state, output_format (default 'xml').
+    The selection is read from [selection] rules, or from the one-path-per-line
+    [files] section written before version 1.1.
     """
-    checked, window_size, splitter_state = set(), None, None
+    selection, window_size, splitter_state = SelectionRules(), None, None
     width_val, height_val = None, None
     output_format = "xml"
 
@@ -74,9 +82,9 @@ def _read_prefs_file():
                 if not section:
                     continue
 
-                if section == "files":
+                if section in ("selection", "files"):
                     if line.strip():
-                        checked.add(line.strip())
+                        selection.add(line)
                 elif section == "window":
                     if line.startswith('width='):
                         try:
@@ -109,7 +117,7 @@ def _read_prefs_file():
             logging.info(
                 "Migrating preferences from .auicp to .aicodeprep-gui")
             try:
-                _write_prefs_file(list(checked), window_size,
+                _write_prefs_file(selection, window_size,
                                   splitter_state, output_format)
                 logging.info(
                     "Successfully migrated preferences to .aicodeprep-gui")
@@ -123,13 +131,13 @@ def _read_prefs_file():
     except Exception as e:
         logging.error(f"Error reading preferences file: {e}")
 
-    return checked, window_size, splitter_state, output_format
+    return selection, window_size, splitter_state, output_format
 
 
 class PreferencesManager:
     def __init__(self, main_window):
         self.main_window = main_window
-        self.checked_files_from_prefs = set()
+        self.selection_from_prefs = SelectionRules()
         self.window_size_from_prefs = None
         self.splitter_state_from_prefs = None
         self.output_format_from_prefs = "xml"
@@ -138,13 +146,21 @@ class PreferencesManager:
         # Backward-compat flag; set true only when prefs file exists
         self.prefs_loaded = False
 
+    @tracing.traced("prefs.load")
     def load_prefs_if_exists(self):
         # Determine if a prefs file exists before reading so we don't override smart defaults when missing
         prefs_path = _prefs_path()
         self.prefs_file_exists = os.path.exists(prefs_path)
 
-        checked, window_size, splitter_state, output_format = _read_prefs_file()
-        self.checked_files_from_prefs = checked
+        selection, window_size, splitter_state, output_format = _read_prefs_file()
+        ws = workspace.current()
+        if ws.multi_root:
+            # Entries saved by a single-root session are relative to the primary root
+            prefixes = tuple(label + os.sep for label in ws.labels)
+            selection = selection.map_paths(
+                lambda p: p if p in ws.labels or p.startswith(prefixes)
+                else os.path.join(ws.labels[0], p))
+        self.selection_from_prefs = selection
         self.window_size_from_prefs = window_size
         self.splitter_state_from_prefs = splitter_state
         self.output_format_from_prefs = output_format
@@ -152,17 +168,27 @@ class PreferencesManager:
         # Only mark as loaded when a prefs file actually exists
         self.prefs_loaded = self.prefs_file_exists
 
+    def checked_relpaths(self):
+        """Relative paths of the checked files, read from the maintained selection set."""
+        ws = workspace.current()
+        return [ws.display_path(p) for p in self.main_window.get_selected_files()]
+
+    def current_selection(self):
+        """
+        The checked files as SelectionRules, compressed against every file in
+        the tree. Binary files are left out of that universe: they are never
+        checked on load, whatever the rules say.
+        """
+        universe = [rel_path for rel_path, item in self.main_window.path_to_item.items()
+                    if item.data(0, IS_FILE_ROLE) and not item.data(0, IS_BINARY_ROLE)]
+        return SelectionRules.from_selection(self.checked_relpaths(), universe)
+
     def save_prefs(self):
-        checked_relpaths = []
-        for rel_path, item in self.main_window.path_to_item.items():
-            if item.checkState(0) == QtCore.Qt.Checked:
-                file_path_abs = item.data(0, QtCore.Qt.UserRole)
-                if file_path_abs and os.path.isfile(file_path_abs):
-                    checked_relpaths.append(rel_path)
+        selection = self.current_selection()
         size = self.main_window.size()
         splitter_state = self.main_window.splitter.saveState()
         fmt = self.main_window.format_combo.currentData()
-        _write_prefs_file(checked_relpaths, window_size=(
+        _write_prefs_file(selection, window_size=(
             size.width(), size.height()), splitter_state=splitter_state, output_format=fmt)
         self.main_window._save_prompt_options()
 
@@ -170,31 +196,23 @@ class PreferencesManager:
         prefs_path = _prefs_path()
         if os.path.exists(prefs_path):
             self.load_prefs_if_exists()
+            tree_manager = self.main_window.tree_manager
             self.main_window.tree_widget.blockSignals(True)
             try:
-                iterator = QtWidgets.QTreeWidgetItemIterator(
-                    self.main_window.tree_widget)
-                while iterator.value():
-                    item = iterator.value()
-                    if item.flags() & QtCore.Qt.ItemIsUserCheckable and os.path.isfile(item.data(0, QtCore.Qt.UserRole)):
-                        item.setCheckState(0, QtCore.Qt.Unchecked)
-                    iterator += 1
-
-                for rel_path in self.checked_files_from_prefs:
-                    if rel_path in self.main_window.path_to_item:
-                        item = self.main_window.path_to_item[rel_path]
-                        if os.path.isfile(item.data(0, QtCore.Qt.UserRole)):
-                            item.setCheckState(0, QtCore.Qt.Checked)
-                            parent = item.parent()
-                            while parent:
-                                if parent.checkState(0) != QtCore.Qt.PartiallyChecked and parent.checkState(0) != QtCore.Qt.Checked:
-                                    parent.setCheckState(
-                                        0, QtCore.Qt.PartiallyChecked)
-                                parent = parent.parent()
+                # Only the currently checked files need clearing
+                for item in list(self.main_window.selected_files.values()):
+                    tree_manager.set_item_checked(item, QtCore.Qt.Unchecked)
+                for item in list(self.main_window.selection_rules.values()):
+                    tree_manager.set_item_checked(item, QtCore.Qt.Unchecked)
             finally:
                 self.main_window.tree_widget.blockSignals(False)
-            self.main_window._expand_folders_for_paths(
-                self.checked_files_from_prefs)
+
+            # One pass over the tree's index; ancestors are refreshed once, in a batch
+            selection = self.selection_from_prefs
+            items = [item for rel_path, item in self.main_window.path_to_item.items()
+                     if item.data(0, IS_FILE_ROLE) and selection.is_selected(rel_path)]
+            tree_manager.set_items_checked(items, QtCore.Qt.Checked)
+            self.main_window._expand_folders_for_paths(self.checked_relpaths())
             file_type = ".auicp" if prefs_path.endswith(
                 ".auicp") else ".aicodeprep-gui"
             self.main_window.text_label.setText(
@@ -91,4 +91,19 @@ class GlobalPresetManager:
             return False
 
 
-global_preset_manager = GlobalPresetManager()
+_global_preset_manager = None
+
+
+def get_global_preset_manager():
+    """The shared preset manager, created on first use so QSettings stays off the import path."""
+    global _global_preset_manager
+    if _global_preset_manager is None:
+        _global_preset_manager = GlobalPresetManager()
+    return _global_preset_manager
+
+
+def __getattr__(name):
+    # Keeps `from .presets import global_preset_manager` working
+    if name == "global_preset_manager":
+        return get_global_preset_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,252 @@
+import os
+import logging
+from PySide6 import QtCore, QtWidgets
+from aicodeprep_gui import workspace
+from aicodeprep_gui.gui.components.tree_widget import IS_BINARY_ROLE, IS_FILE_ROLE
+from aicodeprep_gui.selection_rules import SelectionRules
+
+SETS_FILENAME = ".aicodeprep-gui-sets"
+
+
+def _sets_path():
+    return os.path.join(os.getcwd(), SETS_FILENAME)
+
+
+def _read_sets_file():
+    """Read named sets; each "[set: name]" section holds SelectionRules lines."""
+    sets = {}
+    try:
+        with open(_sets_path(), "r", encoding="utf-8") as f:
+            rules = None
+            for line in f.read().splitlines():
+                stripped = line.strip()
+                if not stripped or stripped.startswith('#'):
+                    continue
+                if stripped.startswith('[set:') and stripped.endswith(']'):
+                    rules = sets[stripped[5:-1].strip()] = SelectionRules()
+                elif rules is not None:
+                    rules.add(stripped)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.error(f"Error reading {SETS_FILENAME}: {e}")
+    return sets
+
+
+def _write_sets_file(sets):
+    path = _sets_path()
+    try:
+        if not sets:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# aicodeprep-gui named selection sets for this folder.\n"
+                    "# Rules: 'path/' is a folder, a leading '!' excludes, the most specific wins.\n\n")
+            for name, rules in sets.items():
+                f.write(f"[set: {name}]\n" + "\n".join(rules.lines()) + "\n\n")
+        logging.info(f"Saved {len(sets)} selection sets to {path}")
+    except Exception as e:
+        logging.warning(f"Could not write {SETS_FILENAME}: {e}")
+
+
+class SelectionSetsManager:
+    """
+    Named selection sets for the current folder, stored beside .aicodeprep-gui.
+
+    On disk each set is compact SelectionRules. In memory a set is resolved to
+    a bitset (a Python int) over an index of the tree's file items, so union,
+    difference and intersection are single integer operations and switching
+    only touches the items whose state actually changes. The index is rebuilt
+    when lazy expansion adds items to the tree.
+
+    Folders not loaded yet are combined whole: a folder selected as a whole
+    (a selection rule) stays one where the result still covers all of it,
+    and a folder the set only partly covers is loaded first, so that its
+    files join the bitsets.
+    """
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.sets = _read_sets_file()
+        self._paths = []  # bit position -> rel path
+        self._positions = {}  # rel path -> bit position
+        self._index_size = -1
+        self._bits = {}  # set name -> bitset over the current index
+        self._token_totals = {}  # set name -> (index size, counted, sized, total)
+
+    # --- Index and bitsets ---
+
+    def _ensure_index(self):
+        path_to_item = self.main_window.path_to_item
+        if self._index_size == len(path_to_item):
+            return
+        self._paths = [rel_path for rel_path, item in path_to_item.items()
+                       if item.data(0, IS_FILE_ROLE) and not item.data(0, IS_BINARY_ROLE)]
+        self._positions = {rel_path: i for i, rel_path in enumerate(self._paths)}
+        self._index_size = len(path_to_item)
+        self._bits.clear()
+        self._token_totals.clear()
+
+    def _to_bits(self, selected):
+        flags = bytearray(b'0' * len(self._paths))
+        for i in selected:
+            flags[i] = 0x31  # '1'
+        # Bit i is character i counted from the right
+        flags.reverse()
+        return int(flags.decode('ascii') or '0', 2)
+
+    @staticmethod
+    def _positions_of(bits):
+        return [i for i, bit in enumerate(reversed(bin(bits)[2:])) if bit == '1']
+
+    def bits_for(self, name):
+        self._ensure_index()
+        bits = self._bits.get(name)
+        if bits is None:
+            rules = self.sets[name]
+            bits = self._bits[name] = self._to_bits(
+                i for i, rel_path in enumerate(self._paths) if rules.is_selected(rel_path))
+        return bits
+
+    def current_bits(self):
+        """The checked files in the tree; folders selected as a whole are not included."""
+        self._ensure_index()
+        positions = self._positions
+        ws = workspace.current()
+        return self._to_bits(positions[rel_path] for rel_path in map(ws.display_path, self.main_window.selected_files)
+                             if rel_path in positions)
+
+    def token_total(self, name):
+        """Estimated tokens for a set, cached until the index or the counts change."""
+        mw = self.main_window
+        bits = self.bits_for(name)
+        key = (self._index_size, len(mw.file_token_counts), mw.tree_stats.sized_count)
+        cached = self._token_totals.get(name)
+        if cached is not None and cached[:3] == key:
+            return cached[3]
+        item_path = lambda i: mw.path_to_item[self._paths[i]].data(0, QtCore.Qt.UserRole)
+        total = sum(mw.tree_stats.estimated_tokens(item_path(i)) for i in self._positions_of(bits))
+        self._token_totals[name] = key + (total,)
+        return total
+
+    # --- Operations ---
+
+    def save_current(self, name):
+        self.sets[name] = self.main_window.preferences_manager.current_selection()
+        self._bits.pop(name, None)
+        self._token_totals.pop(name, None)
+        _write_sets_file(self.sets)
+
+    def delete(self, name):
+        if self.sets.pop(name, None) is not None:
+            self._bits.pop(name, None)
+            self._token_totals.pop(name, None)
+            _write_sets_file(self.sets)
+
+    def switch_to(self, name):
+        self.combine(name, lambda current, in_set: in_set)
+
+    def union(self, name):
+        self.combine(name, lambda current, in_set: current | in_set)
+
+    def difference(self, name):
+        self.combine(name, lambda current, in_set: current & ~in_set)
+
+    def intersection(self, name):
+        self.combine(name, lambda current, in_set: current & in_set)
+
+    def combine(self, name, op):
+        """
+        Make the tree's selection op(current selection, set), changing only
+        what differs. op works on bitsets over the loaded files and on 0/1 for
+        a whole folder that is not loaded.
+        """
+        mw = self.main_window
+        tm = mw.tree_manager
+        rules = self.sets[name]
+        ws = workspace.current()
+        rule_on, rule_off = [], []
+        pending = [item for item in mw.path_to_item.values()
+                   if not item.data(0, IS_FILE_ROLE) and not tm._children_loaded(item)]
+        while pending:
+            item = pending.pop()
+            dir_path = item.data(0, QtCore.Qt.UserRole)
+            if not dir_path:
+                continue
+            current = int(dir_path in mw.selection_rules)
+            in_set = rules.state_below(ws.display_path(dir_path))
+            if op(current, 0) == op(current, 1):
+                wanted = op(current, 0)
+            elif in_set is not None:
+                wanted = op(current, int(in_set))
+            else:
+                # The set covers part of this folder: load it and decide per child
+                tm.on_item_expanded(item)
+                children = (item.child(i) for i in range(item.childCount()))
+                pending.extend(child for child in children
+                               if not child.data(0, IS_FILE_ROLE) and not tm._children_loaded(child))
+                continue
+            if wanted != current:
+                (rule_on if wanted else rule_off).append(item)
+
+        current = self.current_bits()
+        target = op(current, self.bits_for(name))
+        item_of = lambda i: mw.path_to_item[self._paths[i]]
+        to_uncheck = [item_of(i) for i in self._positions_of(current & ~target)] + rule_off
+        to_check = [item_of(i) for i in self._positions_of(target & ~current)] + rule_on
+        tree = mw.tree_widget
+        tree.setUpdatesEnabled(False)
+        try:
+            if to_uncheck:
+                tm.set_items_checked(to_uncheck, QtCore.Qt.Unchecked)
+            if to_check:
+                tm.set_items_checked(to_check, QtCore.Qt.Checked)
+        finally:
+            tree.setUpdatesEnabled(True)
+        mw._expand_folders_for_paths([self._paths[i] for i in self._positions_of(target & ~current)])
+        logging.info(f"Selection set applied: +{len(to_check)} -{len(to_uncheck)} files and folders")
+
+    # --- Menu ---
+
+    def build_menu(self, menu):
+        """Fill the Selection sets button's menu; called each time it opens."""
+        menu.clear()
+        names = list(self.sets)
+        for name in names:
+            count = bin(self.bits_for(name)).count('1')
+            action = menu.addAction(
+                f"{name}  ({count} files, ~{self.token_total(name):,} tokens)")
+            action.triggered.connect(lambda checked=False, n=name: self.switch_to(n))
+        if not names:
+            placeholder = menu.addAction("No saved sets yet")
+            placeholder.setEnabled(False)
+        menu.addSeparator()
+        menu.addAction("Save current selection as...").triggered.connect(self._prompt_save)
+        for title, handler in (("Add set to selection", self.union),
+                               ("Remove set from selection", self.difference),
+                               ("Keep only files also in set", self.intersection),
+                               ("Delete set", self._confirm_delete)):
+            submenu = menu.addMenu(title)
+            submenu.setEnabled(bool(names))
+            for name in names:
+                submenu.addAction(name).triggered.connect(
+                    lambda checked=False, n=name, h=handler: h(n))
+
+    def _prompt_save(self):
+        mw = self.main_window
+        name, ok = QtWidgets.QInputDialog.getText(
+            mw, "Save selection set", "Name for the current selection:")
+        name = name.strip().replace('[', '(').replace(']', ')')
+        if not ok or not name:
+            return
+        if name in self.sets and QtWidgets.QMessageBox.question(
+                mw, "Replace set", f"Replace the saved set '{name}'?") != QtWidgets.QMessageBox.Yes:
+            return
+        self.save_current(name)
+        mw.text_label.setText(f"Saved selection set '{name}'")
+
+    def _confirm_delete(self, name):
+        if QtWidgets.QMessageBox.question(
+                self.main_window, "Delete set", f"Delete the saved set '{name}'?") == QtWidgets.QMessageBox.Yes:
+            self.delete(name)
@@ -1,5 +1,4 @@
 import logging
-import os
 from PySide6 import QtCore, QtWidgets
 from aicodeprep_gui.apptheme import (
     system_pref_is_dark, apply_dark_palette, apply_light_palette,
@@ -83,21 +82,18 @@ class UISettingsManager:
         settings = QtCore.QSettings("aicodeprep-gui", "PromptOptions")
         self.main_window.prompt_top_checkbox.setChecked(settings.value("prompt_to_top", True, type=bool))
         self.main_window.prompt_bottom_checkbox.setChecked(settings.value("prompt_to_bottom", True, type=bool))
+        self.main_window.skip_duplicates_checkbox.setChecked(settings.value("skip_near_duplicates", False, type=bool))
 
     def _save_prompt_options(self):
         settings = QtCore.QSettings("aicodeprep-gui", "PromptOptions")
         settings.setValue("prompt_to_top", self.main_window.prompt_top_checkbox.isChecked())
         settings.setValue("prompt_to_bottom", self.main_window.prompt_bottom_checkbox.isChecked())
+        settings.setValue("skip_near_duplicates", self.main_window.skip_duplicates_checkbox.isChecked())
 
     def _save_format_choice(self, idx):
         fmt = self.main_window.format_combo.currentData()
-        checked_relpaths = []
-        for rel_path, item in self.main_window.path_to_item.items():
-            if item.checkState(0) == QtCore.Qt.Checked:
-                file_path_abs = item.data(0, QtCore.Qt.UserRole)
-                if file_path_abs and os.path.isfile(file_path_abs):
-                    checked_relpaths.append(rel_path)
+        selection = self.main_window.preferences_manager.current_selection()
         size = self.main_window.size()
         splitter_state = self.main_window.splitter.saveState()
         from .preferences import _write_prefs_file
-        _write_prefs_file(checked_relpaths, window_size=(size.width(), size.height()), splitter_state=splitter_state, output_format=fmt)
+        _write_prefs_file(selection, window_size=(size.width(), size.height()), splitter_state=splitter_state, output_format=fmt)
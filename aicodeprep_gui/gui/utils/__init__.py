@@ -1,4 +1,5 @@
 from .metrics import MetricsManager
 from .helpers import WindowHelpers
+from .token_counter import TokenCounterManager
 
-__all__ = ['MetricsManager', 'WindowHelpers']
+__all__ = ['MetricsManager', 'WindowHelpers', 'TokenCounterManager']
@@ -4,11 +4,14 @@ import platform
 import ctypes
 import logging
 from datetime import datetime, date
-from PySide6 import QtWidgets, QtCore, QtGui, QtNetwork
+from PySide6 import QtWidgets, QtCore, QtGui
 from importlib import resources
+from aicodeprep_gui import tracing
 
 
 class WindowHelpers:
+    DEFERRED_STARTUP_FALLBACK_MS = 2000
+
     def __init__(self, main_window):
         self.main_window = main_window
 
@@ -30,18 +33,28 @@ class WindowHelpers:
     def dropEvent(self, event):
         folder_path = event.mimeData().urls()[0].toLocalFile()
         os.chdir(folder_path)
-        from aicodeprep_gui.smart_logic import collect_all_files
+        from aicodeprep_gui import workspace
         self.main_window.new_gui = self.main_window.__class__(
-            collect_all_files())
+            workspace.set_roots([folder_path]).scan())
         self.main_window.new_gui.show()
         self.main_window.close()
 
     def showEvent(self, event):
         super(self.main_window.__class__, self.main_window).showEvent(event)
         if getattr(self.main_window, "initial_show_event", False):
-            QtCore.QTimer.singleShot(0, self.main_window._start_update_check)
+            # Normally started by the first paint; this covers a window that is never painted
+            QtCore.QTimer.singleShot(
+                self.DEFERRED_STARTUP_FALLBACK_MS, self.main_window._deferred_startup)
             self.main_window.initial_show_event = False
 
+    def paintEvent(self, event):
+        super(self.main_window.__class__, self.main_window).paintEvent(event)
+        if not self.main_window.first_paint_done:
+            self.main_window.first_paint_done = True
+            tracing.mark("first_paint")
+            # Next loop pass, so the rest of the first frame is painted first
+            QtCore.QTimer.singleShot(0, self.main_window._deferred_startup)
+
     def closeEvent(self, event):
         try:
             settings = QtCore.QSettings("aicodeprep-gui", "UserIdentity")
@@ -56,17 +69,6 @@ class WindowHelpers:
         except Exception as e:
             logging.error(f"Error showing VoteDialog: {e}")
 
-        try:
-            if self.main_window.update_thread and self.main_window.update_thread.isRunning():
-                print("[gui] Stopping update check thread before closing...")
-                self.main_window.update_thread.quit()
-                if not self.main_window.update_thread.wait(3000):
-                    print("[gui] Force terminating update check thread...")
-                    self.main_window.update_thread.terminate()
-                    self.main_window.update_thread.wait()
-        except RuntimeError:
-            print("[gui] Update thread already cleaned up by Qt")
-
         if self.main_window.remember_checkbox and self.main_window.remember_checkbox.isChecked():
             self.main_window.save_prefs()
         if self.main_window.action != 'process':
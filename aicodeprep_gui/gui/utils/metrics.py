@@ -1,7 +1,6 @@
-import json
 import logging
 from datetime import datetime
-from PySide6 import QtNetwork, QtCore
+from aicodeprep_gui import outbox
 
 class MetricsManager:
     def __init__(self, main_window):
@@ -13,10 +12,6 @@ class MetricsManager:
                 logging.warning("Metrics: user_uuid not found, skipping event.")
                 return
 
-            endpoint_url = "https://wuu73.org/idea/aicp-metrics/event"
-            request = QtNetwork.QNetworkRequest(QtCore.QUrl(endpoint_url))
-            request.setHeader(QtNetwork.QNetworkRequest.ContentTypeHeader, "application/json")
-
             payload = {
                 "user_id": self.main_window.user_uuid,
                 "event_type": event_type,
@@ -25,9 +20,9 @@ class MetricsManager:
             if token_count is not None:
                 payload["token_count"] = token_count
 
-            json_data = QtCore.QByteArray(json.dumps(payload).encode('utf-8'))
-            self.main_window.network_manager.post(request, json_data)
-            logging.info(f"Sent metric event: {event_type}")
+            # Queued on disk and sent in batches by the outbox thread
+            outbox.get_outbox().enqueue(payload)
+            logging.info(f"Queued metric event: {event_type}")
 
         except Exception as e:
-            logging.error(f"Error creating metric request for event '{event_type}': {e}")
+            logging.error(f"Error queuing metric event '{event_type}': {e}")
@@ -0,0 +1,97 @@
+import logging
+from PySide6 import QtCore
+from aicodeprep_gui.gui.handlers.token_events import TokenCountWorker
+
+
+class TokenCounterManager:
+    """
+    Keeps the token label current without reading files on the GUI thread.
+
+    Selection changes only adjust the running total with counts already known;
+    uncounted files and rule-selected folders are picked up by one coalesced
+    background recount. Each recount bumps the generation, which makes any
+    older worker stop early.
+    """
+    COALESCE_MS = 50
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.generation = 0
+        self.counting = False
+        self._workers = {}
+        self._timer = QtCore.QTimer(main_window)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.COALESCE_MS)
+        self._timer.timeout.connect(self._start_recount)
+
+    def note_uncounted(self):
+        """Called when a file without a cached count joins the selection."""
+        self.counting = True
+
+    def schedule_recount(self):
+        """Refresh the label now and (re)start the coalescing timer."""
+        self._refresh_label()
+        self._timer.start()
+
+    def is_current(self, generation):
+        return generation == self.generation
+
+    def cancel(self):
+        self._timer.stop()
+        self.generation += 1
+        self.counting = False
+
+    def _start_recount(self):
+        mw = self.main_window
+        self.generation += 1
+        pending = [p for p in mw.selected_files if p not in mw.file_token_counts]
+        pending_dirs = [d for d in mw.selection_rules if d not in mw.rule_token_counts]
+        if not pending and not pending_dirs:
+            self.counting = False
+            self._refresh_label()
+            return
+        self.counting = True
+        worker = TokenCountWorker(
+            self.generation, pending, self.is_current, pending_dirs)
+        worker.signals.counted.connect(self._on_counted)
+        worker.signals.rule_counted.connect(self._on_rule_counted)
+        worker.signals.finished.connect(self._on_finished)
+        self._workers[self.generation] = worker
+        QtCore.QThreadPool.globalInstance().start(worker)
+        logging.debug(
+            f"Token recount {self.generation}: {len(pending)} files, {len(pending_dirs)} folders")
+        self._refresh_label()
+
+    def _on_counted(self, generation, results):
+        # Counts from superseded workers are still valid, so keep them
+        mw = self.main_window
+        for file_path, tokens in results:
+            if file_path in mw.file_token_counts:
+                continue
+            mw.file_token_counts[file_path] = tokens
+            if file_path in mw.selected_files:
+                mw.total_tokens += tokens
+            mw.tree_stats.file_counted(file_path, tokens)
+        self._refresh_label()
+
+    def _on_rule_counted(self, generation, dir_path, tokens, nbytes):
+        mw = self.main_window
+        if dir_path in mw.rule_token_counts:
+            return
+        mw.rule_token_counts[dir_path] = tokens
+        if dir_path in mw.selection_rules:
+            mw.total_tokens += tokens
+        mw.tree_stats.rule_counted(dir_path, tokens, nbytes)
+        self._refresh_label()
+
+    def _on_finished(self, generation):
+        self._workers.pop(generation, None)
+        if self.is_current(generation):
+            self.counting = False
+            self._refresh_label()
+
+    def _refresh_label(self):
+        text = f"Estimated tokens: {self.main_window.total_tokens:,}"
+        if self.counting:
+            text += " (counting…)"
+        self.main_window.token_label.setText(text)
@@ -0,0 +1,390 @@
+"""
+Local dependency graph: which project files each source file imports.
+
+parse_imports() finds the import specifiers in one file: Python through ast
+(on the import statements only, which is an order of magnitude faster than
+parsing whole modules), JS/TS import, export-from and require, Go import
+paths, Rust mod and use declarations, and C/C++ includes. Resolver maps them
+to files of the scan; anything that does not resolve to a project file (the
+standard library, installed packages) is dropped.
+
+DependencyIndex keeps the specifiers of every file keyed by a hash of its
+content, in the user cache directory. Rebuilding after edits re-reads only
+files whose size or modification time changed and re-parses only those whose
+content did; lookups re-check the files they walk, so the answer follows
+edits made since the last build.
+"""
+import ast
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from aicodeprep_gui import outbox
+
+CACHE_VERSION = 1
+# Larger files are generated or vendored, not worth parsing for imports
+MAX_SOURCE_BYTES = 2 * 1024 * 1024
+
+LANGUAGES = {}
+for _ext in (".py", ".pyi"):
+    LANGUAGES[_ext] = "python"
+for _ext in (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts", ".vue", ".svelte"):
+    LANGUAGES[_ext] = "js"
+LANGUAGES[".go"] = "go"
+LANGUAGES[".rs"] = "rust"
+for _ext in (".c", ".h", ".cc", ".cpp", ".cxx", ".hpp", ".hh", ".hxx", ".m", ".mm"):
+    LANGUAGES[_ext] = "c"
+
+# Extensions tried, in order, for a JS/TS specifier without one
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts", ".vue", ".svelte", ".json")
+
+_PY_IMPORT = re.compile(
+    r"^[ \t]*(?:from[ \t]+[\w.]+[ \t]+import[ \t]*(?:\([^)]*\)|(?:[^\n]*\\\n)*[^\n]*)"
+    r"|import[ \t]+(?:[^\n]*\\\n)*[^\n]*)", re.M)
+_JS_IMPORT = re.compile(r"""\b(?:from|import|require)\s*\(?\s*(['"])([^'"\n]+)\1""")
+_GO_IMPORT_BLOCK = re.compile(r"^import\s*\(([^)]*)\)", re.M)
+_GO_IMPORT_LINE = re.compile(r'^import\s+(?:[\w.]+\s+)?"([^"]+)"', re.M)
+_GO_PATH = re.compile(r'"([^"]+)"')
+_GO_MODULE = re.compile(r"^module\s+(\S+)", re.M)
+_RS_MOD = re.compile(r"^[ \t]*(?:pub(?:\([^)]*\))?[ \t]+)?mod[ \t]+(\w+)[ \t]*;", re.M)
+_RS_USE = re.compile(r"^[ \t]*(?:pub(?:\([^)]*\))?[ \t]+)?use[ \t]+((?:crate|super|self)(?:::\w+)+)", re.M)
+_C_INCLUDE = re.compile(r'^[ \t]*#[ \t]*(?:include|import)[ \t]*([<"])([^>"\n]+)[>"]', re.M)
+
+
+def language_of(path: str) -> Optional[str]:
+    return LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+
+def parse_imports(language: str, text: str) -> list:
+    """Import specifiers in a file's text, as JSON-friendly lists; see Resolver for their kinds."""
+    specs = []
+    if language == "python":
+        for match in _PY_IMPORT.finditer(text):
+            try:
+                tree = ast.parse(match.group().strip())
+            except SyntaxError:
+                continue  # a line inside a string, or a half-written statement
+            for node in tree.body:
+                if isinstance(node, ast.Import):
+                    specs.extend(["py", 0, alias.name, []] for alias in node.names)
+                elif isinstance(node, ast.ImportFrom):
+                    specs.append(["py", node.level, node.module or "",
+                                  [alias.name for alias in node.names if alias.name != "*"]])
+    elif language == "js":
+        specs.extend(["js", match.group(2)] for match in _JS_IMPORT.finditer(text)
+                     if match.group(2).startswith((".", "/", "@/", "~/")))
+    elif language == "go":
+        paths = [match.group(1) for match in _GO_IMPORT_LINE.finditer(text)]
+        for block in _GO_IMPORT_BLOCK.finditer(text):
+            paths.extend(_GO_PATH.findall(block.group(1)))
+        specs.extend(["go", path] for path in paths)
+    elif language == "rust":
+        specs.extend(["rs-mod", match.group(1)] for match in _RS_MOD.finditer(text))
+        specs.extend(["rs-use", match.group(1)] for match in _RS_USE.finditer(text))
+    elif language == "c":
+        specs.extend(["c", match.group(2), match.group(1) == '"'] for match in _C_INCLUDE.finditer(text))
+    return specs
+
+
+def _join(base, rel):
+    path = posixpath.normpath(posixpath.join(base, rel))
+    return "" if path == "." else path
+
+
+class Resolver:
+    """
+    Maps import specifiers to files of one workspace root. Paths are relative
+    to the root, with "/" separators.
+    """
+
+    def __init__(self, root: str, rel_paths: Iterable[str]):
+        self.root = root
+        self.files = set(rel_paths)
+        self.by_name: Dict[str, List[str]] = {}
+        self.dir_files: Dict[str, List[str]] = {}
+        for path in self.files:
+            self.by_name.setdefault(posixpath.basename(path), []).append(path)
+            self.dir_files.setdefault(posixpath.dirname(path), []).append(path)
+        # Python: the root, and the folder above each top-level package (src/ layouts)
+        roots = {""}
+        for path in self.by_name.get("__init__.py", ()):
+            package = posixpath.dirname(path)
+            parent = posixpath.dirname(package)
+            if _join(parent, "__init__.py") not in self.files:
+                roots.add(parent)
+        self.python_roots = sorted(roots, key=lambda d: (d.count("/"), d))
+        self.go_modules = self._go_modules()
+        self.crate_roots = sorted(
+            (_join(posixpath.dirname(path), "src") for path in self.by_name.get("Cargo.toml", ())),
+            key=len, reverse=True)
+
+    def _go_modules(self):
+        modules = []
+        for path in self.by_name.get("go.mod", ()):
+            try:
+                with open(os.path.join(self.root, path), encoding="utf-8", errors="ignore") as f:
+                    match = _GO_MODULE.search(f.read(4096))
+            except OSError:
+                continue
+            if match:
+                modules.append((match.group(1), posixpath.dirname(path)))
+        return modules
+
+    def resolve(self, importer: str, specs: list) -> List[str]:
+        """The project files importer's specifiers refer to, in order, without repeats."""
+        found = []
+        for spec in specs:
+            handler = getattr(self, "_" + spec[0].replace("-", "_"), None)
+            if handler is not None:
+                found.extend(handler(importer, *spec[1:]))
+        seen = {importer}
+        return [path for path in found if not (path in seen or seen.add(path))]
+
+    # --- Python ------------------------------------------------------------------
+
+    def _module_file(self, path):
+        for candidate in (path + ".py", path + "/__init__.py", path + ".pyi"):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _py(self, importer, level, module, names):
+        module_path = module.replace(".", "/")
+        if level:
+            base = posixpath.dirname(importer)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            bases = [base]
+        else:
+            # Scripts run directly also see their own folder
+            bases = self.python_roots + [posixpath.dirname(importer)]
+        for base in bases:
+            target = _join(base, module_path) if module_path else base
+            if target.startswith(".."):
+                continue
+            found = [path for path in (self._module_file(_join(target, name)) for name in names) if path]
+            package = self._module_file(target) if module_path else (
+                _join(target, "__init__.py") if _join(target, "__init__.py") in self.files else None)
+            if package:
+                found.insert(0, package)
+            if found:
+                return found
+        return []
+
+    # --- JS / TS -------------------------------------------------------------------
+
+    def _js(self, importer, spec):
+        if spec.startswith("."):
+            base = _join(posixpath.dirname(importer), spec)
+        elif spec.startswith(("@/", "~/")):
+            # The usual bundler alias for the project's src/ folder
+            parts = importer.split("/")
+            src = "/".join(parts[:len(parts) - 1 - parts[-2::-1].index("src")]) if "src" in parts[:-1] else "src"
+            base = _join(src, spec[2:])
+        else:
+            base = _join("", spec.lstrip("/"))
+        if base.startswith(".."):
+            return []
+        if base in self.files:
+            return [base]
+        stem = base
+        if base.endswith((".js", ".jsx", ".mjs", ".cjs")):
+            stem = base.rsplit(".", 1)[0]  # TS sources imported by their compiled name
+        for candidate in [stem + ext for ext in JS_EXTENSIONS] + [_join(base, "index" + ext) for ext in JS_EXTENSIONS]:
+            if candidate in self.files:
+                return [candidate]
+        return []
+
+    # --- Go -----------------------------------------------------------------------
+
+    def _go(self, importer, path):
+        for module, module_dir in self.go_modules:
+            if path == module or path.startswith(module + "/"):
+                package_dir = _join(module_dir, path[len(module):].lstrip("/"))
+                return sorted(name for name in self.dir_files.get(package_dir, ())
+                              if name.endswith(".go") and not name.endswith("_test.go"))
+        return []
+
+    # --- Rust ---------------------------------------------------------------------
+
+    @staticmethod
+    def _rust_module_dir(importer):
+        """The folder a Rust file's child modules live in."""
+        folder, name = posixpath.split(importer)
+        if name in ("main.rs", "lib.rs", "mod.rs"):
+            return folder
+        return _join(folder, name[:-3])
+
+    def _rust_file(self, folder, parts):
+        """The file of the longest module path prefix that exists."""
+        for end in range(len(parts), 0, -1):
+            path = _join(folder, "/".join(parts[:end]))
+            for candidate in (path + ".rs", path + "/mod.rs"):
+                if candidate in self.files:
+                    return [candidate]
+        return []
+
+    def _rs_mod(self, importer, name):
+        return self._rust_file(self._rust_module_dir(importer), [name])
+
+    def _rs_use(self, importer, path):
+        parts = path.split("::")
+        if parts[0] == "crate":
+            folder = next((root for root in self.crate_roots
+                           if importer.startswith(root + "/")), posixpath.dirname(importer))
+        elif parts[0] == "self":
+            folder = self._rust_module_dir(importer)
+        else:
+            folder = posixpath.dirname(self._rust_module_dir(importer))
+            while parts[1:2] == ["super"]:
+                folder = posixpath.dirname(folder)
+                parts = parts[1:]
+        return self._rust_file(folder, parts[1:])
+
+    # --- C / C++ ------------------------------------------------------------------
+
+    def _c(self, importer, path, quoted):
+        if quoted:
+            local = _join(posixpath.dirname(importer), path)
+            if local in self.files:
+                return [local]
+        candidates = [name for name in self.by_name.get(posixpath.basename(path), ())
+                      if name == path or name.endswith("/" + path)]
+        if not quoted and "/" not in path:
+            # <name.h> is usually a system header; take it only from an include folder
+            candidates = [name for name in candidates if "include/" in name]
+        if not candidates:
+            return []
+        # Several headers of that name: take the one nearest the importer
+        return [max(candidates, key=lambda name: len(posixpath.commonprefix([name, importer])))]
+
+
+class DependencyIndex:
+    """
+    The import graph of one workspace root, cached on disk by file content.
+    edges maps each source file to the project files it imports.
+    """
+
+    def __init__(self, root: str, cache_path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path or os.path.join(
+            outbox.user_cache_dir(), "deps",
+            hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16] + ".json")
+        self.resolver: Optional[Resolver] = None
+        self.edges: Dict[str, List[str]] = {}
+        self._files: Dict[str, list] = {}  # rel_path -> [mtime_ns, size, content key]
+        self._specs: Dict[str, list] = {}  # content key -> specifiers
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if data.get("version") != CACHE_VERSION or data.get("root") != self.root:
+            return {}, {}
+        return data.get("files", {}), data.get("specs", {})
+
+    def save(self):
+        if not self._dirty:
+            return
+        data = {"version": CACHE_VERSION, "root": self.root, "files": self._files, "specs": self._specs}
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            logging.warning(f"Could not save the dependency index: {e}")
+
+    def _entry(self, rel_path, old_files, old_specs, specs):
+        """
+        A file's [mtime_ns, size, key] entry, with its specifiers in specs.
+        Changed files are read and hashed; only content not seen before (in
+        old_specs or specs) is parsed.
+        """
+        language = language_of(rel_path)
+        if language is None:
+            return None
+        st = os.stat(os.path.join(self.root, rel_path))
+        entry = old_files.get(rel_path)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size and entry[2] in old_specs:
+            specs.setdefault(entry[2], old_specs[entry[2]])
+            return entry
+        if st.st_size > MAX_SOURCE_BYTES:
+            return None
+        with open(os.path.join(self.root, rel_path), "rb") as f:
+            data = f.read()
+        key = f"{language}:{hashlib.sha1(data).hexdigest()}"
+        if key not in specs:
+            specs[key] = old_specs[key] if key in old_specs else parse_imports(
+                language, data.decode("utf-8", errors="ignore"))
+        self._dirty = True
+        return [st.st_mtime_ns, st.st_size, key]
+
+    def build(self, rel_paths: Iterable[str], cancelled=lambda: False) -> bool:
+        """
+        (Re)build the graph for these files of the root. Only new or changed
+        files are read. Returns False if cancelled part way.
+        """
+        rel_paths = list(rel_paths)
+        old_files, old_specs = (self._files, self._specs) if self._files else self._load()
+        files, specs = {}, {}
+        for count, rel_path in enumerate(rel_paths):
+            if count % 256 == 0 and cancelled():
+                return False
+            try:
+                entry = self._entry(rel_path, old_files, old_specs, specs)
+            except OSError:
+                continue
+            if entry:
+                files[rel_path] = entry
+        self._dirty = self._dirty or files.keys() != old_files.keys()
+        self._files, self._specs = files, specs
+        self.resolver = Resolver(self.root, rel_paths)
+        self.edges = {rel_path: self.resolver.resolve(rel_path, specs[entry[2]])
+                      for rel_path, entry in files.items()}
+        self.save()
+        return True
+
+    def imports_of(self, rel_path: str) -> List[str]:
+        """A file's project imports, re-parsed first if it changed since the build."""
+        if rel_path not in self._files or self.resolver is None:
+            return self.edges.get(rel_path, [])
+        try:
+            entry = self._entry(rel_path, self._files, self._specs, self._specs)
+        except OSError:
+            entry = None
+        if entry is None:
+            return self.edges.get(rel_path, [])
+        if entry is not self._files[rel_path]:
+            self._files[rel_path] = entry
+            self.edges[rel_path] = self.resolver.resolve(rel_path, self._specs[entry[2]])
+        return self.edges[rel_path]
+
+    def dependencies(self, rel_path: str, depth: Optional[int] = None) -> List[str]:
+        """
+        Project files rel_path imports, directly or through others, up to
+        depth levels (all if None), nearest first.
+        """
+        seen = {rel_path}
+        order = []
+        queue = deque([(rel_path, 0)])
+        while queue:
+            path, level = queue.popleft()
+            if depth is not None and level >= depth:
+                continue
+            for dep in self.imports_of(path):
+                if dep not in seen:
+                    seen.add(dep)
+                    order.append(dep)
+                    queue.append((dep, level + 1))
+        return order
@@ -0,0 +1,216 @@
+"""
+Incremental reader for large JSON files.
+
+Scanner pulls one value at a time from a text stream read in fixed-size
+chunks, so a caller can walk the parts of a document it needs and step over
+the rest without decoding or keeping it: memory is bounded by what the caller
+keeps, not by the file. Long strings (base64 images, embedded files) are
+skipped with str.find rather than character by character.
+
+It understands only as much JSON as it needs to find where values end;
+malformed input raises ValueError.
+"""
+import json
+import re
+
+CHUNK_CHARS = 64 * 1024
+
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+# Text up to the next bracket, taking whole strings in one match; an unfinished
+# string at the end of the buffer is left for _skip_string
+_CONTAINER_BODY = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.S)
+_SCALAR = re.compile(r'[^\s,\]}]*')
+_SPACE = re.compile(r'\s*')
+_DECODER = json.JSONDecoder()
+
+
+class Scanner:
+    """Pull-style reader over a JSON text stream. Every value must be read or skipped."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self):
+        data = self.stream.read(CHUNK_CHARS)
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next significant character, or "" at the end of the stream."""
+        while True:
+            self.pos = _SPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r}")
+        self.pos += 1
+
+    def _next_item(self, close):
+        char = self.peek()
+        self.pos += 1
+        if char == close:
+            return False
+        if char != ",":
+            raise ValueError(f"expected ',' or {close!r}")
+        return True
+
+    def items(self):
+        """Yield the keys of the next object; the caller reads or skips each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.string()
+            self.expect(":")
+            yield key
+            if not self._next_item("}"):
+                return
+
+    def elements(self):
+        """Yield once per element of the next array; the caller reads or skips each."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if not self._next_item("]"):
+                return
+
+    def string(self, limit=None):
+        """
+        The next string. With a limit, only about that many characters are
+        kept and the rest is skipped, and (text, was_cut) is returned.
+        """
+        self.expect('"')
+        pieces, kept, cut = [], 0, False
+        while True:
+            end = _STRING_BODY.match(self.buf, self.pos).end()
+            closed = end < len(self.buf) and self.buf[end] == '"'
+            if not cut:
+                pieces.append(self.buf[self.pos:end])
+                kept += end - self.pos
+                cut = limit is not None and kept > limit
+            if closed:
+                self.pos = end + 1
+                break
+            # The match stops short of a trailing backslash; it is re-read with what follows
+            self.pos = end
+            if not self._fill():
+                raise ValueError("unterminated string")
+        raw = "".join(pieces)
+        if limit is None:
+            return json.loads('"' + raw + '"')
+        if not cut:
+            return json.loads('"' + raw + '"'), False
+        raw = raw[:limit]
+        for trim in range(7):  # do not decode half an escape sequence
+            try:
+                return json.loads('"' + raw[:len(raw) - trim] + '"'), True
+            except ValueError:
+                continue
+        raise ValueError("bad string escape")
+
+    def scalar(self) -> str:
+        """The next number, true, false or null, as its JSON text."""
+        pieces = []
+        while True:
+            end = _SCALAR.match(self.buf, self.pos).end()
+            pieces.append(self.buf[self.pos:end])
+            self.pos = end
+            if end < len(self.buf) or not self._fill():
+                return "".join(pieces)
+
+    def skip(self):
+        """Step over the next value without decoding or keeping it."""
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+        elif char in ("[", "{"):
+            self._skip_container()
+        elif char:
+            while True:
+                self.pos = _SCALAR.match(self.buf, self.pos).end()
+                if self.pos < len(self.buf) or not self._fill():
+                    return
+        else:
+            raise ValueError("unexpected end of file")
+
+    def _skip_string(self):
+        # str.find is much faster than the regex over long strings such as base64 images
+        self.pos += 1
+        while True:
+            quote = self.buf.find('"', self.pos)
+            if quote == -1:
+                # Keep a trailing run of backslashes: it decides whether the next quote is escaped
+                end = len(self.buf)
+                while end > self.pos and self.buf[end - 1] == "\\":
+                    end -= 1
+                self.pos = end
+                if not self._fill():
+                    raise ValueError("unterminated string")
+                continue
+            start = quote
+            while start > self.pos and self.buf[start - 1] == "\\":
+                start -= 1
+            self.pos = quote + 1
+            if (quote - start) % 2 == 0:
+                return
+
+    def skip_rest(self):
+        """Step over what is left of the array or object being read, including its end."""
+        self._skip_container(depth=1)
+
+    def count_rest(self) -> int:
+        """
+        Step over what is left of the array being read, including its end,
+        and return how many elements that was. Elements within the buffer are
+        stepped over by the C JSON decoder, much faster than skip(); one that
+        runs past the end of the buffer is skipped the usual way.
+        """
+        count = 0
+        while True:
+            char = self.peek()
+            if char == "]":
+                self.pos += 1
+                return count
+            if char != ",":
+                raise ValueError("expected ',' or ']'")
+            self.pos += 1
+            count += 1
+            if not self.peek():
+                raise ValueError("unexpected end of file")
+            try:
+                end = _DECODER.raw_decode(self.buf, self.pos)[1]
+            except ValueError:
+                end = len(self.buf)
+            if end < len(self.buf):
+                self.pos = end
+            else:
+                self.skip()  # cut by the end of the buffer, or a number that may continue
+
+    def _skip_container(self, depth=0):
+        while True:
+            self.pos = _CONTAINER_BODY.match(self.buf, self.pos).end()
+            if self.pos == len(self.buf):
+                if not self._fill():
+                    raise ValueError("unexpected end of file")
+                continue
+            char = self.buf[self.pos]
+            if char == '"':
+                self._skip_string()
+                continue
+            self.pos += 1
+            depth += 1 if char in "[{" else -1
+            if depth == 0:
+                return
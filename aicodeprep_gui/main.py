@@ -14,10 +14,15 @@ if "--delset" in sys.argv:
     QSettings("aicodeprep-gui", "UserIdentity").clear()
     print("All aicodeprep-gui user settings deleted.")
     sys.exit(0)
+
+# Enabled before the imports below so config loading is traced too
+if "--profile" in sys.argv:
+    from aicodeprep_gui import tracing
+    tracing.enable()
 import argparse
 import logging
 from typing import List
-from aicodeprep_gui.smart_logic import collect_all_files
+from aicodeprep_gui import workspace
 from aicodeprep_gui.gui import show_file_selection_gui
 
 # Configure logging with explicit console handler only
@@ -50,10 +55,16 @@ def main():
                         help="Output file name (default: fullcode.txt)")
     parser.add_argument("-d", "--debug", action="store_true",
                         help="Enable debug logging")
-    parser.add_argument("directory", nargs="?", default=".",
-                        help="Directory to process (default: current directory)")
+    parser.add_argument("directory", nargs="*", default=["."],
+                        help="Directory to process (default: current directory). Pass several "
+                             "to open them as one multi-root workspace; the first is the primary "
+                             "root, where the output and .aicodeprep-gui are written")
     parser.add_argument("--force-update-check", action="store_true",
                         help="Force update check (ignore 24h limit)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time startup and generation phases; writes aicodeprep-gui-trace.json "
+                             "(Chrome trace format) and prints a summary on exit. "
+                             "Also enabled by AICODEPREP_PROFILE=1 or AICODEPREP_PROFILE=<trace path>")
 
     # --- ADD THESE NEW ARGUMENTS ---
     if platform.system() == "Windows":
@@ -70,7 +81,9 @@ def main():
     if '--pro' in sys.argv:
         open('pro_enabled', 'w').close()   # Create marker file
 
-    force_update = args.force_update_check
+    if args.force_update_check:
+        from aicodeprep_gui import update_checker
+        update_checker.clear_cache()
 
     # Set Windows AppUserModelID for proper taskbar icon
     if platform.system() == "Windows":
@@ -120,7 +133,13 @@ def main():
         console_handler.setLevel(logging.DEBUG)
 
     # Get the target directory from the parsed arguments
-    target_dir = args.directory
+    target_dir, *extra_roots = args.directory or ["."]
+    # Resolved before the chdir below, since they may be relative to the launch directory
+    extra_roots = [os.path.abspath(root) for root in extra_roots]
+    for root in extra_roots:
+        if not os.path.isdir(root):
+            logger.error(f"Directory not found: {root}")
+            return
     logger.info(f"Target directory: {target_dir}")
 
     # Change to the specified directory with error handling
@@ -135,7 +154,10 @@ def main():
 
     logger.info("Starting code concatenation...")
 
-    all_files_with_flags = collect_all_files()
+    ws = workspace.set_roots([os.getcwd()] + extra_roots)
+    if ws.multi_root:
+        logger.info(f"Workspace roots: {', '.join(ws.roots)}")
+    all_files_with_flags = ws.scan()
 
     if not all_files_with_flags:
         logger.warning("No files found to process!")
@@ -0,0 +1,119 @@
+"""
+Groups of near-identical files: generated API clients, per-locale variants,
+copied migration templates, and exact copies.
+
+Each file is cut into shingles, pairs of consecutive non-blank lines with
+indentation stripped, and reduced to a MinHash signature: the smallest
+shingle hash in each of BINS ranges of the hash space (one-permutation
+MinHash, so a file is hashed once rather than once per bin). Two files agree
+on a bin about as often as their shingle sets overlap, so the share of equal
+bins estimates their Jaccard similarity.
+
+clusters() finds candidate pairs by locality-sensitive hashing, bucketing
+signatures by bands of ROWS bins, and keeps pairs at SIMILARITY or above.
+Splitting, hashing and sorting are all C-level work, with only a few lookups
+per bin in Python, so 20k files take seconds. Signatures use the process's
+string hashing and are not meant to be kept between sessions.
+"""
+import bisect
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+BINS = 64
+ROWS = 4  # bins per LSH band; 16 bands find pairs down to about 50% similar
+SIMILARITY = 0.7  # on line pairs; about 85% of lines the same
+# Files are compared on their start; enough to tell variants apart
+MAX_READ_CHARS = 256 * 1024
+# Fewer shingles than this is too little text to call anything a duplicate
+MIN_SHINGLES = 8
+
+# Shingles are hashed with hash(), signed and hash_info.width bits wide
+_BIN_WIDTH = (1 << sys.hash_info.width) // BINS
+_BIN_STARTS = [-(1 << (sys.hash_info.width - 1)) + i * _BIN_WIDTH for i in range(BINS + 1)]
+
+
+def signature(text: str) -> Optional[Tuple[int, ...]]:
+    """The MinHash signature of a text; None if it is too short to compare."""
+    lines = list(filter(None, map(str.strip, text.splitlines())))
+    shingles = sorted(set(map(hash, zip(lines, lines[1:]))))
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    values: List[Optional[int]] = []
+    for start, end in zip(_BIN_STARTS, _BIN_STARTS[1:]):
+        i = bisect.bisect_left(shingles, start)
+        values.append(shingles[i] if i < len(shingles) and shingles[i] < end else None)
+    # An empty bin borrows from the next filled one, marked with the distance,
+    # so that files of similar content still agree on it
+    for i, value in enumerate(values):
+        if value is None:
+            distance = 1
+            while values[(i + distance) % BINS] is None:
+                distance += 1
+            values[i] = hash((values[(i + distance) % BINS], distance))
+    return tuple(values)
+
+
+def file_signature(abs_path: str) -> Optional[Tuple[int, ...]]:
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        return signature(f.read(MAX_READ_CHARS))
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures' files."""
+    return sum(x == y for x, y in zip(a, b)) / BINS
+
+
+def clusters(signatures: Dict[str, Sequence[int]], threshold: float = SIMILARITY) -> List[List[str]]:
+    """
+    Groups of two or more paths whose files are near-identical, each sorted,
+    largest group first. A file is grouped with another when they are at
+    least threshold similar, directly or through other members.
+    """
+    parent = {}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    buckets = {}
+    for path, sig in signatures.items():
+        parent[path] = path
+        for band in range(0, BINS, ROWS):
+            first = buckets.setdefault((band, hash(tuple(sig[band:band + ROWS]))), path)
+            if first == path:
+                continue
+            # Compared with the bucket's first file only, so a bucket of
+            # many (e.g. empty templates) costs one check per file
+            a, b = find(first), find(path)
+            if a != b and similarity(signatures[first], sig) >= threshold:
+                parent[b] = a
+    groups = {}
+    for path in signatures:
+        groups.setdefault(find(path), []).append(path)
+    return sorted((sorted(group) for group in groups.values() if len(group) > 1),
+                  key=lambda group: (-len(group), group[0]))
+
+
+def redundant(selected: Iterable[str], groups: Iterable[Sequence[str]],
+              signatures: Dict[str, Sequence[int]] = None,
+              threshold: float = SIMILARITY) -> Dict[str, str]:
+    """
+    The selected files that can be left out because another selected file of
+    their group is kept, mapped to that file. The first selected member of a
+    group is kept. With signatures (current ones, e.g. re-read before writing
+    a bundle), a file is only left out if it is still similar to the kept one.
+    """
+    order = {path: i for i, path in enumerate(selected)}
+    skipped = {}
+    for group in groups:
+        members = sorted((path for path in group if path in order), key=order.__getitem__)
+        for path in members[1:]:
+            kept = members[0]
+            if signatures is not None:
+                a, b = signatures.get(kept), signatures.get(path)
+                if a is None or b is None or similarity(a, b) < threshold:
+                    continue
+            skipped[path] = kept
+    return skipped
@@ -0,0 +1,130 @@
+"""
+Jupyter notebooks (.ipynb) as source code instead of raw JSON.
+
+A notebook file is mostly outputs: base64 images, HTML tables, long logs.
+render() reads it with jsonscan.Scanner and keeps only the cells' sources, in
+the "percent" format (# %% markers, as used by Jupytext and most editors),
+optionally followed by the first lines of each cell's text outputs.
+Everything else is stepped over by the scanner without being decoded or
+kept, so memory is bounded by the sources and a multi-megabyte notebook
+renders in about the time it takes to read it.
+
+A file the scanner cannot follow raises ValueError, and the caller includes
+it as plain text.
+"""
+from aicodeprep_gui.jsonscan import Scanner
+
+DEFAULT_OUTPUT_LINES = 10
+# Kept per output; a printed log can be megabytes on a single line
+MAX_OUTPUT_CHARS = 2000
+
+
+def _source(scanner):
+    """A multiline string field: one string, or a list of lines."""
+    if scanner.peek() == "[":
+        return "".join(scanner.string() for _ in scanner.elements())
+    return scanner.string()
+
+
+def _output_lines(scanner, max_lines):
+    """The first max_lines lines of a text output, and whether any were left out."""
+    if scanner.peek() != "[":
+        text, cut = scanner.string(MAX_OUTPUT_CHARS)
+        pieces = [text]
+    else:
+        pieces, budget, newlines, cut = [], MAX_OUTPUT_CHARS, 0, False
+        for _ in scanner.elements():
+            if budget <= 0 or newlines >= max_lines:
+                scanner.skip_rest()
+                cut = True
+                break
+            text, clipped = scanner.string(budget)
+            pieces.append(text)
+            budget -= len(text)
+            newlines += text.count("\n")
+            cut = cut or clipped
+    lines = "".join(pieces).splitlines()
+    if len(lines) > max_lines:
+        lines, cut = lines[:max_lines], True
+    return lines, cut
+
+
+def _output(scanner, max_lines):
+    """One output, rendered as comment lines."""
+    lines, cut, error, omitted = [], False, {}, []
+    for key in scanner.items():
+        if key == "text":  # stream output; also execute results in nbformat 3
+            lines, cut = _output_lines(scanner, max_lines)
+        elif key == "data":
+            for mime in scanner.items():
+                if mime == "text/plain":
+                    lines, cut = _output_lines(scanner, max_lines)
+                else:
+                    scanner.skip()
+                    omitted.append(mime)
+        elif key in ("ename", "evalue"):
+            error[key] = scanner.string(MAX_OUTPUT_CHARS)[0]
+        else:
+            scanner.skip()
+    if error:
+        return [f"# {error.get('ename', 'Error')}: {error.get('evalue', '')}"]
+    rendered = [f"# {line}".rstrip() for line in lines]
+    if cut:
+        rendered.append("# ...")
+    rendered.extend(f"# [{mime} output omitted]" for mime in omitted
+                    if not mime.startswith("text/") or not lines)
+    return rendered
+
+
+def _cell(scanner, include_outputs, max_lines):
+    cell_type, source, outputs = "code", "", []
+    for key in scanner.items():
+        if key == "cell_type":
+            cell_type = scanner.string()
+        elif key in ("source", "input"):  # "input" in nbformat 3
+            source = _source(scanner)
+        elif key == "outputs" and include_outputs:
+            for _ in scanner.elements():
+                outputs.extend(_output(scanner, max_lines))
+        else:
+            scanner.skip()
+    source = source.strip("\n")
+    if not source and not outputs:
+        return None
+    header = "# %%" if cell_type == "code" else f"# %% [{cell_type}]"
+    parts = [header, source] if source else [header]
+    if outputs:
+        parts.append("# Output:")
+        parts.extend(outputs)
+    return "\n".join(parts)
+
+
+def _cells(scanner, rendered, include_outputs, max_lines):
+    for _ in scanner.elements():
+        text = _cell(scanner, include_outputs, max_lines)
+        if text is not None:
+            rendered.append(text)
+
+
+def render(abs_path: str, include_outputs: bool = True, output_lines: int = DEFAULT_OUTPUT_LINES) -> str:
+    """
+    The notebook's cells as percent-format source. Text outputs are kept to
+    output_lines lines each (none if include_outputs is False); images and
+    other rich outputs are named but not included.
+    """
+    rendered = []
+    with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+        scanner = Scanner(f)
+        for key in scanner.items():
+            if key == "cells":
+                _cells(scanner, rendered, include_outputs, output_lines)
+            elif key == "worksheets":  # nbformat 3
+                for _ in scanner.elements():
+                    for sheet_key in scanner.items():
+                        if sheet_key == "cells":
+                            _cells(scanner, rendered, include_outputs, output_lines)
+                        else:
+                            scanner.skip()
+            else:
+                scanner.skip()
+    return "\n\n".join(rendered)
@@ -0,0 +1,298 @@
+"""
+Background scheduler for the app's outbound network traffic.
+
+Metric events are appended to a JSON-lines queue in the user cache directory
+instead of being posted as they happen. One daemon thread flushes the queue
+shortly after startup and then every FLUSH_INTERVAL_SECONDS, posting the
+events of a batch over a single connection. When the server cannot be reached
+the unsent events stay on disk and the next attempt is pushed back
+exponentially (with jitter) up to MAX_BACKOFF_SECONDS, so an offline machine
+pays for one failed connection per backoff period rather than one per event,
+and nothing is lost across restarts. Other background requests (the update
+check, the open ping) run as jobs on the same thread.
+
+A flush first claims the queue by renaming it, so several running instances
+never send the same events twice; a claim left behind by a process that died
+mid-flush is picked up again once it is STALE_CLAIM_SECONDS old. Delivery is
+at-least-once.
+
+Endpoints can be pointed at a local stand-in server with the
+AICODEPREP_METRICS_URL (and, for the update check, AICODEPREP_UPDATE_URL)
+environment variables.
+"""
+import glob
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import http.client
+import urllib.parse
+from collections import deque
+
+METRICS_URL = "https://wuu73.org/idea/aicp-metrics/event"
+QUEUE_FILE = "outbox.jsonl"
+FLUSH_INTERVAL_SECONDS = 15 * 60
+STARTUP_DELAY_SECONDS = 3.0
+BATCH_SIZE = 50
+REQUEST_TIMEOUT_SECONDS = 5.0
+INITIAL_BACKOFF_SECONDS = 60.0
+MAX_BACKOFF_SECONDS = 6 * 60 * 60
+MAX_QUEUED_EVENTS = 1000
+MAX_EVENT_AGE_SECONDS = 30 * 24 * 60 * 60
+STALE_CLAIM_SECONDS = 10 * 60
+
+
+def user_cache_dir() -> str:
+    """Per-user cache directory shared by the app's background state files."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "aicodeprep-gui")
+
+
+def metrics_url() -> str:
+    return os.environ.get("AICODEPREP_METRICS_URL") or METRICS_URL
+
+
+class Outbox:
+    def __init__(self, queue_path=None, endpoint=None, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 startup_delay=STARTUP_DELAY_SECONDS, batch_size=BATCH_SIZE,
+                 timeout=REQUEST_TIMEOUT_SECONDS):
+        self.queue_path = queue_path or os.path.join(user_cache_dir(), QUEUE_FILE)
+        self.endpoint = endpoint or metrics_url()
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._file_lock = threading.Lock()
+        self._jobs = deque()
+        self._flush_due = time.monotonic() + startup_delay
+        self._backoff = 0.0
+        self._pending = 0
+        self._stopping = False
+        self._thread = None
+
+    # --- public API, safe to call from any thread -------------------------
+
+    def enqueue(self, payload):
+        """Persist an event for the next flush. Cheap: one appended line, no network."""
+        line = json.dumps({"queued_at": time.time(), "payload": payload}) + "\n"
+        try:
+            with self._file_lock:
+                os.makedirs(os.path.dirname(self.queue_path), exist_ok=True)
+                with open(self.queue_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logging.warning(f"Outbox: could not queue event: {e}")
+            return
+        with self._cond:
+            self._pending += 1
+            # A full batch is sent early, unless the endpoint is backing off
+            if self._pending >= self.batch_size and not self._backoff:
+                self._flush_due = time.monotonic()
+            self._ensure_thread()
+            self._cond.notify()
+
+    def submit(self, func, *args):
+        """Run func(*args) on the scheduler thread; exceptions are logged, not raised."""
+        with self._cond:
+            self._jobs.append((func, args))
+            self._ensure_thread()
+            self._cond.notify()
+
+    def ping(self, url):
+        """Fire-and-forget GET, made from the scheduler thread."""
+        self.submit(self._get, url)
+
+    def flush_now(self):
+        """Flush on the scheduler thread as soon as it is free, ignoring any backoff."""
+        with self._cond:
+            self._flush_due = time.monotonic()
+            self._backoff = 0.0
+            self._ensure_thread()
+            self._cond.notify()
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # --- scheduler thread --------------------------------------------------
+
+    def _ensure_thread(self):
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name="aicodeprep-outbox", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping and not self._jobs and time.monotonic() < self._flush_due:
+                    self._cond.wait(self._flush_due - time.monotonic())
+                if self._stopping:
+                    return
+                job = self._jobs.popleft() if self._jobs else None
+            if job is not None:
+                func, args = job
+                try:
+                    func(*args)
+                except Exception as e:
+                    logging.warning(f"Outbox: background job {getattr(func, '__name__', func)} failed: {e}")
+                continue
+            delivered = self._flush()
+            with self._cond:
+                if delivered:
+                    self._backoff = 0.0
+                    delay = self.flush_interval
+                else:
+                    self._backoff = min(MAX_BACKOFF_SECONDS,
+                                        self._backoff * 2 if self._backoff else INITIAL_BACKOFF_SECONDS)
+                    delay = self._backoff * random.uniform(0.8, 1.2)
+                    logging.info(f"Outbox: endpoint unavailable, next attempt in {delay:.0f}s")
+                self._flush_due = time.monotonic() + delay
+
+    def _claim(self):
+        """Move the queue, and any abandoned claims, aside for this flush."""
+        claimed = []
+        own = f"{self.queue_path}.{os.getpid()}.{threading.get_ident()}.sending"
+        with self._file_lock:
+            try:
+                os.replace(self.queue_path, own)
+                # A rename keeps the old mtime; refresh it so other instances see a live claim
+                os.utime(own)
+                claimed.append(own)
+            except FileNotFoundError:
+                pass
+            with self._cond:
+                self._pending = 0
+        now = time.time()
+        for path in glob.glob(glob.escape(self.queue_path) + ".*.sending"):
+            if path == own:
+                continue
+            try:
+                if now - os.path.getmtime(path) < STALE_CLAIM_SECONDS:
+                    continue  # another instance is still sending it
+                taken = f"{path}.{os.getpid()}.sending"
+                os.replace(path, taken)
+                os.utime(taken)
+                claimed.append(taken)
+            except OSError:
+                pass
+        return claimed
+
+    def _read(self, paths):
+        events = []
+        cutoff = time.time() - MAX_EVENT_AGE_SECONDS
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            continue  # a torn line from an interrupted write
+                        if event.get("queued_at", 0) >= cutoff:
+                            events.append(event)
+            except OSError as e:
+                logging.warning(f"Outbox: could not read {path}: {e}")
+        events.sort(key=lambda event: event.get("queued_at", 0))
+        return events[-MAX_QUEUED_EVENTS:]
+
+    def _requeue(self, events):
+        if not events:
+            return
+        with self._file_lock:
+            os.makedirs(os.path.dirname(self.queue_path), exist_ok=True)
+            with open(self.queue_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(event) + "\n" for event in events)
+        with self._cond:
+            self._pending += len(events)
+
+    def _flush(self):
+        """Send everything queued. Returns False if the endpoint failed and events remain."""
+        claimed = self._claim()
+        if not claimed:
+            return True
+        events = self._read(claimed)
+        sent = 0
+        for start in range(0, len(events), self.batch_size):
+            done, error = self._send_batch([event["payload"] for event in events[start:start + self.batch_size]])
+            sent += done
+            if error:
+                logging.info(f"Outbox: {error}")
+                break
+        try:
+            self._requeue(events[sent:])
+        except OSError as e:
+            # Leave the claims in place; they are retried once stale
+            logging.warning(f"Outbox: could not requeue unsent events: {e}")
+            return False
+        for path in claimed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if sent:
+            logging.info(f"Outbox: delivered {sent} event(s)")
+        return sent == len(events)
+
+    def _connection(self, url):
+        parts = urllib.parse.urlsplit(url)
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        return cls(parts.netloc, timeout=self.timeout), target
+
+    def _send_batch(self, payloads):
+        """
+        POST each payload over one kept-alive connection. Returns how many were
+        consumed and, if the endpoint failed part way, why.
+        """
+        conn, target = self._connection(self.endpoint)
+        done = 0
+        try:
+            for payload in payloads:
+                try:
+                    conn.request("POST", target, body=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+                    response = conn.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException) as e:
+                    return done, f"sending to {self.endpoint} failed: {e}"
+                if response.status >= 500 or response.status == 429:
+                    return done, f"{self.endpoint} answered HTTP {response.status}"
+                # Other errors are the event's fault; retrying would not help, so it is dropped
+                if response.status >= 400:
+                    logging.warning(f"Outbox: event rejected with HTTP {response.status}")
+                done += 1
+        finally:
+            conn.close()
+        return done, None
+
+    def _get(self, url):
+        conn, target = self._connection(url)
+        try:
+            conn.request("GET", target)
+            conn.getresponse().read()
+        finally:
+            conn.close()
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    """The process-wide outbox; its thread starts with the first queued event or job."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+        return _outbox
@@ -0,0 +1,107 @@
+import heapq
+import re
+from array import array
+from typing import Iterable, List, Optional
+
+
+class PathIndex:
+    """
+    In-memory search index over relative paths for the tree filter box.
+
+    Every whitespace-separated query term must appear as a substring of the
+    path; candidates come from trigram posting lists and are then verified.
+    When a single-term query has no substring hits, paths are matched as a
+    fuzzy subsequence ("mwin" finds "main_window.py"). Results are ordered by score, best first.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self.paths: List[str] = []
+        self._keys: List[str] = []
+        self._grams = {}
+        for path in paths:
+            self.add(path)
+
+    def __len__(self):
+        return len(self.paths)
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return path.replace('\\', '/').lower()
+
+    def add(self, path: str):
+        """Add one path; cheap enough to call for lazily loaded tree items."""
+        idx = len(self.paths)
+        key = self._key(path)
+        self.paths.append(path)
+        self._keys.append(key)
+        for gram in {key[i:i + 3] for i in range(len(key) - 2)}:
+            postings = self._grams.get(gram)
+            if postings is None:
+                postings = self._grams[gram] = array('I')
+            postings.append(idx)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        terms = self._key(query).split()
+        if not terms:
+            return []
+        scored = [(self._substring_score(self._keys[i], terms), i)
+                  for i in self._substring_candidates(terms)]
+        if not scored and len(terms) == 1:
+            scored = self._fuzzy_matches(terms[0])
+        keys = self._keys
+        order = lambda entry: (-entry[0], keys[entry[1]])
+        if limit is not None and limit < len(scored):
+            scored = heapq.nsmallest(limit, scored, key=order)
+        else:
+            scored.sort(key=order)
+        return [self.paths[i] for _, i in scored]
+
+    def _substring_candidates(self, terms):
+        grams = {term[i:i + 3] for term in terms for i in range(len(term) - 2)}
+        if not grams:
+            # One or two character terms: a linear scan is still fast
+            if len(terms) == 1:
+                term = terms[0]
+                return [i for i, key in enumerate(self._keys) if term in key]
+            return [i for i, key in enumerate(self._keys)
+                    if all(term in key for term in terms)]
+        postings = []
+        for gram in grams:
+            hits = self._grams.get(gram)
+            if hits is None:
+                return []
+            postings.append(hits)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for hits in postings[1:]:
+            candidates.intersection_update(hits)
+            if not candidates:
+                return []
+        return [i for i in candidates
+                if all(term in self._keys[i] for term in terms)]
+
+    @staticmethod
+    def _substring_score(key, terms):
+        base = key.rfind('/') + 1
+        score = 100.0 - len(key) * 0.01
+        for term in terms:
+            pos = key.rfind(term)
+            if pos >= base:
+                score += 50.0 - (pos - base)
+            else:
+                score -= key.find(term) * 0.1
+        return score
+
+    def _fuzzy_matches(self, term):
+        search = re.compile('.*?'.join(re.escape(ch) for ch in term)).search
+        scored = []
+        for idx, key in enumerate(self._keys):
+            match = search(key)
+            if match is None:
+                continue
+            # Tighter matches score higher, and so do matches within the file name
+            score = len(term) - (match.end() - match.start()) - len(key) * 0.01
+            if match.start() > key.rfind('/'):
+                score += 20.0
+            scored.append((score, idx))
+        return scored
@@ -17,7 +17,8 @@ class ComboBoxLevelDelegate(QtWidgets.QStyledItemDelegate):
         "   ",
         "path/to/fileName.only",     # changed from "Paths only"
         "Skeleton (partial)",        # unchanged
-        "Full File Contents"         # changed from "Full content"
+        "Full File Contents",        # changed from "Full content"
+        "Data summary"               # schema, first records, row count
     ]
 
     def __init__(self, parent=None, is_dark_mode: bool = False):
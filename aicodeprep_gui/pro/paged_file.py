@@ -0,0 +1,95 @@
+"""Memory-mapped, line-indexed access to large text files for the preview dock."""
+import mmap
+import os
+from array import array
+
+# Record the byte offset of every STRIDE-th line; lines in between are found
+# with a few short scans, which keeps the index tiny even for huge logs.
+STRIDE = 64
+INDEX_CHUNK = 4 * 1024 * 1024
+
+
+class PagedFile:
+    """
+    A read-only view of a text file that decodes only the lines asked for.
+
+    The file is memory-mapped and its line index is built incrementally, one
+    chunk per index_more() call, so opening is instant and memory use does
+    not grow with the file size. Until indexing completes, line_count() is an
+    estimate extrapolated from the part scanned so far.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = None
+        self._mm = None
+        if self.size:
+            self._file = open(path, 'rb')
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._checkpoints = array('Q', [0])
+        self._line_starts = 1  # line 0 starts at offset 0
+        self._indexed_to = 0
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def fully_indexed(self) -> bool:
+        return self._indexed_to >= self.size
+
+    def index_more(self, max_bytes: int = INDEX_CHUNK) -> bool:
+        """Index the next chunk of the file; returns True once the whole file is indexed."""
+        if self.fully_indexed:
+            return True
+        start = self._indexed_to
+        end = min(start + max_bytes, self.size)
+        pos, line = start, self._line_starts
+        for segment in self._mm[start:end].split(b'\n')[:-1]:
+            pos += len(segment) + 1
+            if line % STRIDE == 0:
+                self._checkpoints.append(pos)
+            line += 1
+        self._line_starts = line
+        self._indexed_to = end
+        return self.fully_indexed
+
+    def line_count(self) -> int:
+        if not self.size:
+            return 0
+        if not self._indexed_to:
+            return self._line_starts
+        if self.fully_indexed:
+            ends_with_newline = self._mm[self.size - 1] == 0x0A
+            return self._line_starts - (1 if ends_with_newline else 0)
+        return max(self._line_starts,
+                   int(self._line_starts * self.size / max(self._indexed_to, 1)))
+
+    def _line_offset(self, line: int) -> int:
+        while line >= self._line_starts and not self.fully_indexed:
+            self.index_more()
+        line = min(line, self._line_starts - 1)
+        pos = self._checkpoints[line // STRIDE]
+        for _ in range(line % STRIDE):
+            pos = self._mm.find(b'\n', pos) + 1
+        return pos
+
+    def read_lines(self, first: int, count: int, max_bytes: int = 1024 * 1024) -> str:
+        """Decode `count` lines starting at line `first` (capped at max_bytes)."""
+        if not self.size or count <= 0:
+            return ""
+        start = self._line_offset(first)
+        end = start
+        for _ in range(count):
+            nl = self._mm.find(b'\n', end, min(self.size, start + max_bytes))
+            if nl == -1:
+                end = min(self.size, start + max_bytes)
+                break
+            end = nl + 1
+        text = self._mm[start:end].decode('utf-8', errors='ignore')
+        return text[:-1] if text.endswith('\n') else text
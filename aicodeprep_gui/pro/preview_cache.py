@@ -0,0 +1,110 @@
+"""Background loading and LRU caching of preview pages for the preview dock."""
+import os
+from collections import OrderedDict
+from PySide6 import QtCore
+from aicodeprep_gui.smart_logic import is_binary_file
+from .paged_file import PagedFile
+
+PAGE_LINES = 300
+PAGE_MAX_BYTES = 256 * 1024
+
+
+class PreviewPage:
+    """The decoded first page of a file plus what the dock needs to show around it."""
+    __slots__ = ("path", "stamp", "lines", "line_count", "complete",
+                 "is_binary", "size", "error")
+
+    def __init__(self, path, stamp=None, lines=(), line_count=0, complete=True,
+                 is_binary=False, size=0, error=None):
+        self.path = path
+        self.stamp = stamp  # (mtime_ns, size) when loaded
+        self.lines = list(lines)
+        self.line_count = line_count
+        self.complete = complete  # line_count is exact, not an estimate
+        self.is_binary = is_binary
+        self.size = size
+        self.error = error
+
+    @property
+    def nbytes(self):
+        return sum(len(line) for line in self.lines) + 64
+
+
+def file_stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_preview_page(path):
+    """Read the first page of a file. Safe to call from a worker thread."""
+    try:
+        stamp = file_stamp(path)
+        if is_binary_file(path):
+            return PreviewPage(path, stamp, is_binary=True, size=stamp[1])
+        paged = PagedFile(path)
+        try:
+            paged.index_more()
+            text = paged.read_lines(0, PAGE_LINES, max_bytes=PAGE_MAX_BYTES)
+            return PreviewPage(path, stamp, text.split('\n') if text else [],
+                               paged.line_count(), paged.fully_indexed,
+                               size=paged.size)
+        finally:
+            paged.close()
+    except Exception as e:
+        return PreviewPage(path, error=str(e))
+
+
+class PreviewPageCache:
+    """Least-recently-used cache of PreviewPage objects, bounded by decoded size."""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._pages = OrderedDict()
+
+    def __contains__(self, path):
+        return path in self._pages
+
+    def get(self, path):
+        page = self._pages.get(path)
+        if page is not None:
+            self._pages.move_to_end(path)
+        return page
+
+    def put(self, page):
+        old = self._pages.pop(page.path, None)
+        if old is not None:
+            self.total_bytes -= old.nbytes
+        self._pages[page.path] = page
+        self.total_bytes += page.nbytes
+        while self.total_bytes > self.max_bytes and len(self._pages) > 1:
+            _, evicted = self._pages.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+
+
+class PreviewLoadSignals(QtCore.QObject):
+    loaded = QtCore.Signal(str, object)  # path, PreviewPage or None if unchanged
+
+
+class PreviewLoadWorker(QtCore.QRunnable):
+    """
+    Loads one preview page on a thread pool. Given the stamp of a cached
+    page, it only stats the file and reports None when nothing changed.
+    """
+
+    def __init__(self, path, known_stamp=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.known_stamp = known_stamp
+        self.signals = PreviewLoadSignals()
+
+    def run(self):
+        if self.known_stamp is not None:
+            try:
+                if file_stamp(self.path) == self.known_stamp:
+                    self.signals.loaded.emit(self.path, None)
+                    return
+            except OSError:
+                pass
+        self.signals.loaded.emit(self.path, load_preview_page(self.path))
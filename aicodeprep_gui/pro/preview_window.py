@@ -1,16 +1,40 @@
 """Docked file preview window for pro features."""
 import os
 from PySide6 import QtWidgets, QtCore, QtGui
-from aicodeprep_gui.smart_logic import is_binary_file
+from .paged_file import PagedFile
+from .preview_cache import PreviewPageCache, PreviewLoadWorker
+
 
 class FilePreviewDock(QtWidgets.QDockWidget):
-    """A dockable window for previewing file contents."""
+    """
+    A dockable window for previewing file contents.
+
+    Files are memory-mapped and only the lines currently in view are decoded,
+    so large files open instantly and the whole file can be scrolled. The text
+    edit never holds more than one screen of text; a separate scroll bar walks
+    the file by line number while the line index is built in idle time.
+
+    First pages are loaded on a small thread pool and kept in an LRU cache,
+    and the tree's neighbours of the selection are prefetched, so moving
+    through files with the arrow keys never waits on disk. The file itself
+    is only mapped once the view scrolls past the cached page.
+    """
 
     def __init__(self, parent=None):
         super().__init__("File Preview", parent)
         self.setObjectName("file_preview_dock")
         self.setAllowedAreas(QtCore.Qt.RightDockWidgetArea)
 
+        self.paged_file = None
+        self.current_path = None
+        self.current_page = None
+        self.top_line = 0
+
+        self.page_cache = PreviewPageCache()
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._loads = {}  # path -> in-flight PreviewLoadWorker
+
         # Create the content widget
         content = QtWidgets.QWidget()
         layout = QtWidgets.QVBoxLayout(content)
@@ -20,65 +44,226 @@ class FilePreviewDock(QtWidgets.QDockWidget):
         self.text_edit = QtWidgets.QPlainTextEdit()
         self.text_edit.setReadOnly(True)
         self.text_edit.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.text_edit.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.text_edit.installEventFilter(self)
+        self.text_edit.viewport().installEventFilter(self)
 
         # Font setup
         font = QtGui.QFont("Consolas", 10)
         font.setStyleHint(QtGui.QFont.Monospace)
         self.text_edit.setFont(font)
 
+        # Scrolls through the whole file by line number
+        self.scroll_bar = QtWidgets.QScrollBar(QtCore.Qt.Vertical)
+        self.scroll_bar.setRange(0, 0)
+        self.scroll_bar.valueChanged.connect(self._render_from)
+
+        text_row = QtWidgets.QHBoxLayout()
+        text_row.setContentsMargins(0, 0, 0, 0)
+        text_row.setSpacing(0)
+        text_row.addWidget(self.text_edit)
+        text_row.addWidget(self.scroll_bar)
+
         # Status label
         self.status_label = QtWidgets.QLabel()
         self.status_label.setAlignment(QtCore.Qt.AlignCenter)
         self.status_label.setStyleSheet("color: #666; font-style: italic;")
 
-        layout.addWidget(self.text_edit)
+        layout.addLayout(text_row)
         layout.addWidget(self.status_label)
 
         self.setWidget(content)
         self.setMinimumWidth(300)
         self.setMaximumWidth(600)
 
+        # Builds the line index a chunk at a time without blocking the GUI
+        self._index_timer = QtCore.QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_step)
+
         # Hide initially
         self.hide()
 
     def preview_file(self, file_path):
-        """Load and display file contents."""
-        if not file_path or not os.path.isfile(file_path):
+        """Show a file's first page, from the cache when possible, and revalidate it in the background."""
+        if not file_path:
             self.clear_preview()
             return
 
-        try:
-            # Check if binary
-            if is_binary_file(file_path):
-                self.show_binary_warning(file_path)
-                return
+        self._close_file()
+        self.current_path = file_path
+        page = self.page_cache.get(file_path)
+        if page is not None:
+            self._show_page(page)
+        else:
+            self.current_page = None
+            self.text_edit.clear()
+            self.status_label.setText(
+                f"Loading {os.path.basename(file_path)}…")
+        self._request_page(file_path, page.stamp if page else None, priority=1)
 
-            # Read file
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+    def prefetch(self, file_paths):
+        """Load pages for files the user is likely to select next."""
+        for path in file_paths:
+            if path and path not in self.page_cache:
+                self._request_page(path, None, priority=0)
 
-            # Truncate very large files
-            max_chars = 100000
-            if len(content) > max_chars:
-                content = content[:max_chars] + "\n\n... [Content truncated]"
+    def _request_page(self, path, known_stamp, priority):
+        if path in self._loads:
+            return
+        worker = PreviewLoadWorker(path, known_stamp)
+        worker.signals.loaded.connect(self._on_page_loaded)
+        self._loads[path] = worker
+        self._pool.start(worker, priority)
 
-            self.text_edit.setPlainText(content)
-            self.status_label.setText(f"Preview: {os.path.basename(file_path)}")
+    def _on_page_loaded(self, path, page):
+        self._loads.pop(path, None)
+        if page is None:
+            return  # cached page is still current
+        self.page_cache.put(page)
+        if path == self.current_path:
+            self._close_file()
+            self._show_page(page)
 
-        except Exception as e:
-            self.text_edit.setPlainText(f"Error loading file: {str(e)}")
+    def _show_page(self, page):
+        self.current_page = page
+        if page.error:
+            self.text_edit.setPlainText(f"Error loading file: {page.error}")
             self.status_label.setText("Error")
+            return
+        if page.is_binary:
+            self.show_binary_warning(page.path, page.size)
+            return
+        self.top_line = 0
+        self._update_scroll_range()
+        self.scroll_bar.setValue(0)
+        self._render_from(0)
+        self._update_status()
 
-    def show_binary_warning(self, file_path):
+    def show_binary_warning(self, file_path, size=None):
         """Show warning for binary files."""
+        if size is None:
+            size = os.path.getsize(file_path)
         self.text_edit.setPlainText(
             f"[Binary file - contents not shown]\n\n"
             f"File: {os.path.basename(file_path)}\n"
-            f"Size: {os.path.getsize(file_path):,} bytes"
+            f"Size: {size:,} bytes"
         )
         self.status_label.setText("Binary file")
 
     def clear_preview(self):
         """Clear the preview."""
+        self._close_file()
+        self.current_path = None
+        self.current_page = None
         self.text_edit.clear()
         self.status_label.setText("Select a file to preview")
+
+    def shutdown(self):
+        """Drop queued loads and wait for running ones before the window goes away."""
+        self._pool.clear()
+        self._pool.waitForDone()
+        self._loads.clear()
+        self._close_file()
+
+    def _open_paged_file(self):
+        """Map the current file for scrolling beyond the cached first page."""
+        if self.paged_file is None:
+            try:
+                self.paged_file = PagedFile(self.current_path)
+            except Exception as e:
+                self.status_label.setText(f"Error: {e}")
+                return False
+            if not self.paged_file.index_more():
+                self._index_timer.start()
+        return True
+
+    def _close_file(self):
+        self._index_timer.stop()
+        if self.paged_file is not None:
+            self.paged_file.close()
+            self.paged_file = None
+        self.scroll_bar.setRange(0, 0)
+
+    def _visible_lines(self):
+        line_height = max(1, self.text_edit.fontMetrics().lineSpacing())
+        return max(1, self.text_edit.viewport().height() // line_height)
+
+    def _line_count(self):
+        if self.paged_file is not None:
+            return self.paged_file.line_count()
+        return self.current_page.line_count
+
+    def _showing_text(self):
+        page = self.current_page
+        return page is not None and not page.error and not page.is_binary
+
+    def _update_scroll_range(self):
+        if not self._showing_text():
+            return
+        visible = self._visible_lines()
+        self.scroll_bar.setPageStep(visible)
+        self.scroll_bar.setMaximum(max(0, self._line_count() - visible))
+
+    def _render_from(self, first_line):
+        if not self._showing_text():
+            return
+        self.top_line = first_line
+        visible = self._visible_lines()
+        page = self.current_page
+        if self.paged_file is None and (first_line + visible <= len(page.lines)
+                                        or (page.complete and page.line_count <= len(page.lines))):
+            text = "\n".join(page.lines[first_line:first_line + visible])
+        elif self._open_paged_file():
+            text = self.paged_file.read_lines(first_line, visible)
+        else:
+            return
+        # Keep the horizontal position while paging vertically
+        h_value = self.text_edit.horizontalScrollBar().value()
+        self.text_edit.setPlainText(text)
+        self.text_edit.horizontalScrollBar().setValue(h_value)
+
+    def _index_step(self):
+        if self.paged_file is None or self.paged_file.index_more():
+            self._index_timer.stop()
+        self._update_scroll_range()
+        self._update_status()
+
+    def _update_status(self):
+        if not self._showing_text():
+            return
+        name = os.path.basename(self.current_path)
+        if self.paged_file is not None:
+            complete = self.paged_file.fully_indexed
+        else:
+            complete = self.current_page.complete
+        if complete:
+            self.status_label.setText(
+                f"Preview: {name} ({self._line_count():,} lines)")
+        else:
+            self.status_label.setText(
+                f"Preview: {name} (~{self._line_count():,} lines)")
+
+    def eventFilter(self, obj, event):
+        if getattr(self, "current_page", None) is not None:
+            if event.type() == QtCore.QEvent.Wheel and obj is self.text_edit.viewport():
+                steps = event.angleDelta().y() // 40
+                if steps:
+                    self.scroll_bar.setValue(self.scroll_bar.value() - steps)
+                    return True
+            elif event.type() == QtCore.QEvent.KeyPress and obj is self.text_edit:
+                page = self.scroll_bar.pageStep()
+                moves = {
+                    QtCore.Qt.Key_PageDown: page,
+                    QtCore.Qt.Key_PageUp: -page,
+                    QtCore.Qt.Key_Down: 1,
+                    QtCore.Qt.Key_Up: -1,
+                }
+                if event.key() in moves:
+                    self.scroll_bar.setValue(
+                        self.scroll_bar.value() + moves[event.key()])
+                    return True
+            elif event.type() == QtCore.QEvent.Resize and obj is self.text_edit.viewport():
+                self._update_scroll_range()
+                self._render_from(self.scroll_bar.value())
+        return super().eventFilter(obj, event)
@@ -0,0 +1,421 @@
+"""
+Per-project configuration: the bundled defaults, the project's
+aicodeprep-gui.toml and any aicodeprep-gui.toml files in its subfolders.
+
+Nothing is read at import time. config_for(root) loads a project's settings
+on first use and keeps them, with their compiled pattern matchers, until the
+modification time of one of the files they came from changes (checked at most
+once every STALE_CHECK_SECONDS, so per-file lookups stay cheap).
+
+A nested aicodeprep-gui.toml applies to its folder and everything below it,
+cascading the way .gitignore files do. Its exclude_patterns and
+default_include_patterns are matched relative to that folder and are checked
+before those of the folders above it, so the deepest pattern that matches a
+path decides (a "!" pattern re-includes). Its max_file_size and
+code_extensions replace the inherited values for that subtree, and its
+[large_files] settings are merged over the inherited ones. The project's own
+file keeps its old meaning: its keys replace the defaults, except
+[large_files], which is merged the same way.
+
+Unless use_gitignore is turned off, .gitignore files are honoured the same
+way: the project's own, those in its subfolders, those in the folders between
+it and the top of its git work tree, and .git/info/exclude. Paths git ignores
+are excluded, unless an exclude_patterns "!" pattern brings them back.
+
+Each config or .gitignore file is compiled once, into one Level; every folder
+maps to the Level of its nearest ancestor that has either, so matching a path
+never compiles anything.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from importlib import resources
+from typing import Dict, Optional
+
+from aicodeprep_gui import tracing
+
+CONFIG_FILE_NAME = "aicodeprep-gui.toml"
+GITIGNORE_NAME = ".gitignore"
+# Keys a nested config file may set; anything else in it is ignored
+NESTED_KEYS = ("exclude_patterns", "default_include_patterns", "code_extensions", "max_file_size",
+               "large_files")
+DEFAULT_MAX_FILE_SIZE = 1000000
+DEFAULT_HEAD_LINES = 200
+DEFAULT_TAIL_LINES = 50
+# config_for() re-checks the files a config came from at most this often
+STALE_CHECK_SECONDS = 1.0
+
+
+def get_config_path():
+    """Get the path to the default configuration file."""
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+        config_path = os.path.join(base_path, 'aicodeprep_gui', 'data', 'default_config.toml')
+    else:
+        try:
+            with resources.path('aicodeprep_gui.data', 'default_config.toml') as config_file:
+                config_path = str(config_file)
+        except ModuleNotFoundError:
+            config_path = os.path.join(os.path.dirname(__file__), 'data', 'default_config.toml')
+    return config_path
+
+
+def load_config_from_path(path: str) -> dict:
+    """Loads a TOML configuration file from a given path."""
+    if not os.path.exists(path):
+        return {}
+    import toml
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return toml.load(f)
+    except Exception as e:
+        logging.error(f"Error loading or parsing TOML config at {path}: {e}")
+        return {}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _compile(patterns, always=False):
+    if not patterns and not always:
+        return None
+    from pathspec import PathSpec
+    from pathspec.patterns import GitWildMatchPattern
+    return PathSpec.from_lines(GitWildMatchPattern, patterns)
+
+
+def _decision(spec, path):
+    """True/False from the last pattern in spec that matches path, None if none does."""
+    check = getattr(spec, "check_file", None)
+    if check is not None:
+        return check(path).include
+    decision = None
+    for pattern in spec.patterns:
+        if pattern.include is not None and pattern.match_file(path):
+            decision = pattern.include
+    return decision
+
+
+def merge_large_files(base, override):
+    """[large_files] settings: override's keys win, per-extension entries are merged one by one."""
+    merged = dict(base or {})
+    for key, value in (override or {}).items():
+        if key == 'extensions' and isinstance(value, dict):
+            extensions = {ext: dict(rule) for ext, rule in merged.get('extensions', {}).items()}
+            for ext, rule in value.items():
+                extensions[ext.lower()] = dict(extensions.get(ext.lower(), {}), **rule)
+            merged['extensions'] = extensions
+        else:
+            merged[key] = value
+    return merged
+
+
+def _norm(rel_path):
+    if rel_path in ('', '.'):
+        return ''
+    return os.path.normpath(rel_path).replace(os.sep, '/')
+
+
+def _read_ignore_file(path):
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def _git_top(path):
+    """The enclosing git work tree's top folder, or None."""
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+class Level:
+    """
+    The settings in force below one folder that has an aicodeprep-gui.toml,
+    a .gitignore, or both, with compiled matchers.
+    """
+
+    __slots__ = ("base", "prefix", "parent", "present", "config", "exclude_spec", "include_spec",
+                 "ignore_spec", "outer_ignores", "has_ignores", "code_extensions", "max_file_size",
+                 "large_files", "_size_rules", "min_size_limit")
+
+    def __init__(self, base, config, parent=None, ignore_lines=(), outer_ignores=(),
+                 present=(False, False)):
+        self.base = base
+        self.prefix = base + '/' if base else ''
+        self.parent = parent
+        # (has aicodeprep-gui.toml, has .gitignore), as last seen
+        self.present = present
+        self.config = config
+        # The root level always has specs; nested levels only for the lists they set
+        self.exclude_spec = _compile(config.get('exclude_patterns', []), always=parent is None)
+        self.include_spec = _compile(config.get('default_include_patterns', []), always=parent is None)
+        self.ignore_spec = _compile(ignore_lines)
+        # .gitignore files above the project root and .git/info/exclude, as
+        # (spec, path from their folder to the root), nearest first
+        self.outer_ignores = parent.outer_ignores if parent is not None else tuple(outer_ignores)
+        self.has_ignores = (self.ignore_spec is not None
+                            or (parent.has_ignores if parent is not None else bool(self.outer_ignores)))
+        if 'code_extensions' in config or parent is None:
+            self.code_extensions = frozenset(config.get('code_extensions', []))
+        else:
+            self.code_extensions = parent.code_extensions
+        if 'max_file_size' in config or parent is None:
+            self.max_file_size = config.get('max_file_size', DEFAULT_MAX_FILE_SIZE)
+        else:
+            self.max_file_size = parent.max_file_size
+        self.large_files = merge_large_files(parent.large_files if parent is not None else None,
+                                             config.get('large_files'))
+        # Resolved once: (max_file_size, head_lines, tail_lines), by extension and otherwise
+        head = self.large_files.get('head_lines', DEFAULT_HEAD_LINES)
+        tail = self.large_files.get('tail_lines', DEFAULT_TAIL_LINES)
+        by_extension = {
+            ext: (rule.get('max_file_size', self.max_file_size),
+                  rule.get('head_lines', head), rule.get('tail_lines', tail))
+            for ext, rule in self.large_files.get('extensions', {}).items()}
+        self._size_rules = ((self.max_file_size, head, tail), by_extension)
+        # No file at or under this size is affected, whatever its extension
+        self.min_size_limit = min([self.max_file_size] + [rule[0] for rule in by_extension.values()])
+
+    def size_policy(self, name: str, size: int):
+        """
+        How a file of this size goes into the bundle: None for in full,
+        (head_lines, tail_lines) for cut down to its first and last lines,
+        or False for left out (large_files.mode = "skip").
+        """
+        if size <= self.min_size_limit:
+            return None
+        default, by_extension = self._size_rules
+        limit, head, tail = by_extension.get(os.path.splitext(name)[1].lower(), default)
+        if size <= limit:
+            return None
+        if self.large_files.get('mode', 'truncate') != 'truncate':
+            return False
+        return head, tail
+
+    def _cascade(self, attr, path):
+        """The deepest level's decision for path; None if no pattern matches it anywhere."""
+        level = self
+        while level is not None:
+            spec = getattr(level, attr)
+            if spec is not None:
+                # Paths outside this level's folder cannot reach here
+                decision = _decision(spec, path[len(level.prefix):])
+                if decision is not None:
+                    return decision
+            level = level.parent
+        return None
+
+    def _git_ignored(self, path):
+        decision = self._cascade("ignore_spec", path)
+        if decision is None:
+            for spec, lead in self.outer_ignores:
+                decision = _decision(spec, lead + path)
+                if decision is not None:
+                    break
+        return bool(decision)
+
+    def is_excluded(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        rel_path is relative to the project root. exclude_patterns decide
+        first, so a "!" pattern there can bring back a git-ignored file; paths
+        they do not mention are excluded if git ignores them.
+        """
+        path = _norm(rel_path) + ('/' if is_dir else '')
+        decision = self._cascade("exclude_spec", path)
+        if decision is None and self.has_ignores:
+            return self._git_ignored(path)
+        return bool(decision)
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Whether git ignores rel_path and exclude_patterns do not bring it back."""
+        if not self.has_ignores:
+            return False
+        path = _norm(rel_path) + ('/' if is_dir else '')
+        return self._cascade("exclude_spec", path) is not False and self._git_ignored(path)
+
+    def is_default_included(self, rel_path: str, is_dir: bool = False) -> bool:
+        path = _norm(rel_path) + ('/' if is_dir else '')
+        return bool(self._cascade("include_spec", path))
+
+    def is_code_file(self, name: str) -> bool:
+        return os.path.splitext(name)[1].lower() in self.code_extensions
+
+
+class ProjectConfig:
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._lock = threading.RLock()
+        # Every file the settings were read from (or looked for), with its mtime
+        self.sources: Dict[str, Optional[int]] = {}
+        self.root_level = self._load_root()
+        self._levels: Dict[str, Level] = {'': self.root_level}
+        self.checked_at = time.monotonic()
+
+    def _source(self, path):
+        self.sources[path] = _mtime(path)
+        return path
+
+    @tracing.traced("config.load")
+    def _load_root(self):
+        default_path = self._source(get_config_path())
+        config = load_config_from_path(default_path)
+        if not config:
+            logging.critical("Failed to load default configuration. Exiting.")
+            sys.exit("Could not load the default configuration file.")
+        user_path = self._source(os.path.join(self.root, CONFIG_FILE_NAME))
+        user_config = load_config_from_path(user_path)
+        if user_config:
+            logging.info(f"Found user configuration at {user_path}. Merging settings.")
+            large_files = merge_large_files(config.get('large_files'), user_config.pop('large_files', None))
+            tables = {key: {**config.get(key, {}), **user_config.pop(key, {})}
+                      for key in ('notebooks', 'data_files', 'relevance')}
+            config.update(user_config)
+            config['large_files'] = large_files
+            config.update(tables)
+        ignore_lines, outer = [], []
+        if config.get('use_gitignore', True):
+            ignore_lines = _read_ignore_file(self._source(os.path.join(self.root, GITIGNORE_NAME)))
+            outer = self._outer_ignores()
+        return Level('', config, ignore_lines=ignore_lines, outer_ignores=outer,
+                     present=(os.path.isfile(user_path), bool(ignore_lines)))
+
+    def _outer_ignores(self):
+        """Ignore files that apply to the root from above it, nearest first."""
+        top = _git_top(self.root)
+        if top is None:
+            return []
+        outer = []
+        folder = self.root
+        while folder != top:
+            folder = os.path.dirname(folder)
+            spec = _compile(_read_ignore_file(self._source(os.path.join(folder, GITIGNORE_NAME))))
+            if spec is not None:
+                outer.append((spec, _norm(os.path.relpath(self.root, folder)) + '/'))
+        lead = '' if top == self.root else _norm(os.path.relpath(self.root, top)) + '/'
+        spec = _compile(_read_ignore_file(self._source(os.path.join(top, ".git", "info", "exclude"))))
+        if spec is not None:
+            outer.append((spec, lead))
+        return outer
+
+    @property
+    def config(self) -> dict:
+        """The merged top-level settings (defaults updated by the project's file)."""
+        return self.root_level.config
+
+    @property
+    def exclude_spec(self):
+        return self.root_level.exclude_spec
+
+    @property
+    def include_spec(self):
+        return self.root_level.include_spec
+
+    def is_stale(self) -> bool:
+        return any(_mtime(path) != mtime for path, mtime in list(self.sources.items()))
+
+    def level(self, rel_dir: str, names=None) -> Level:
+        """
+        The Level in force in folder rel_dir. names, when the caller has just
+        listed the folder (as the scan does), are the file names in it; they
+        correct what was cached if a config or .gitignore file appeared or went
+        away. Otherwise the cached answer is used, or the folder is checked once.
+        """
+        key = _norm(rel_dir)
+        if not key:
+            return self.root_level
+        cached = self._levels.get(key)
+        present = None
+        if names is not None:
+            present = (CONFIG_FILE_NAME in names,
+                       GITIGNORE_NAME in names and self.root_level.config.get('use_gitignore', True))
+        if cached is not None:
+            cached_present = cached.present if cached.base == key else (False, False)
+            if present is None or present == cached_present:
+                return cached
+        with self._lock:
+            if cached is not None:
+                # Folders below inherit differently now
+                below = key + '/'
+                for other in [k for k in self._levels if k.startswith(below)]:
+                    del self._levels[other]
+            parent = self.level(os.path.dirname(key)) if '/' in key else self.root_level
+            config_path = os.path.join(self.root, key, CONFIG_FILE_NAME)
+            ignore_path = os.path.join(self.root, key, GITIGNORE_NAME)
+            if present is None:
+                present = (os.path.isfile(config_path),
+                           self.root_level.config.get('use_gitignore', True) and os.path.isfile(ignore_path))
+            level = parent
+            if any(present):
+                nested, ignore_lines = {}, []
+                if present[0]:
+                    nested = load_config_from_path(self._source(config_path))
+                    nested = {k: v for k, v in nested.items() if k in NESTED_KEYS}
+                    logging.info(f"Found nested configuration at {config_path}.")
+                if present[1]:
+                    ignore_lines = _read_ignore_file(self._source(ignore_path))
+                level = Level(key, nested, parent, ignore_lines=ignore_lines, present=present)
+            self._levels[key] = level
+            return level
+
+    def level_for(self, rel_path: str) -> Level:
+        """The Level that applies to a file or folder at rel_path."""
+        # Fast path for the usual already-normalized path of a known folder
+        level = self._levels.get(os.path.dirname(rel_path).replace(os.sep, '/'))
+        if level is not None:
+            return level
+        return self.level(os.path.dirname(_norm(rel_path)))
+
+    def is_excluded(self, rel_path: str, is_dir: bool = False) -> bool:
+        return self.level_for(rel_path).is_excluded(rel_path, is_dir)
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        return self.level_for(rel_path).is_ignored(rel_path, is_dir)
+
+    def is_default_included(self, rel_path: str, is_dir: bool = False) -> bool:
+        return self.level_for(rel_path).is_default_included(rel_path, is_dir)
+
+
+_projects: Dict[str, ProjectConfig] = {}
+_projects_lock = threading.Lock()
+
+
+def config_for(root: Optional[str] = None, fresh: bool = False) -> ProjectConfig:
+    """
+    The configuration of the project at root (default: the current directory).
+    fresh re-checks the config files now, rather than at most once a second.
+    """
+    root = root or os.getcwd()
+    project = _projects.get(root)
+    if project is None:
+        root = os.path.abspath(root)
+        with _projects_lock:
+            project = _projects.get(root)
+    if project is not None:
+        now = time.monotonic()
+        if not fresh and now - project.checked_at < STALE_CHECK_SECONDS:
+            return project
+        if not project.is_stale():
+            project.checked_at = now
+            return project
+    project = ProjectConfig(root)
+    with _projects_lock:
+        _projects[root] = project
+    return project
+
+
+def clear_cache():
+    with _projects_lock:
+        _projects.clear()
@@ -0,0 +1,332 @@
+"""
+Ranks the files of a project against a prompt with BM25.
+
+Files are split into terms the way code is written: identifiers are indexed
+whole and by their camelCase and snake_case parts, so "TokenCounter" and
+"token_counter" both match a prompt that says "token counter". The file's
+path counts too, with extra weight.
+
+RelevanceIndex is an inverted index kept in flat arrays, which stay small
+and load from the user cache directory without per-entry work: terms are
+stored as 32-bit hashes in a sorted array, pointing into one array holding
+every term's postings (file number and frequency, packed). Files indexed
+since the arrays were last rebuilt go to a small per-term delta instead, and
+removed or changed files are only marked, so keeping the index current
+costs about as much as reading the changed files. Both are folded back into
+the arrays once they have grown.
+"""
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import math
+import os
+import re
+import sys
+import zlib
+from array import array
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+from aicodeprep_gui import outbox
+
+CACHE_VERSION = 1
+# Only the start of a file is indexed; names and imports are at the top
+MAX_INDEXED_CHARS = 64 * 1024
+# Longer words are hashes, base64 and the like, not something a prompt names
+MAX_TERM_CHARS = 40
+PATH_WEIGHT = 3
+K1 = 1.2
+B = 0.75
+# Postings scored per query at most, rarest terms first; the common terms
+# past this point barely move the ranking but dominate the cost
+MAX_SCORED_POSTINGS = 400_000
+# The delta is folded into the arrays when it grows past this many postings
+MAX_DELTA_POSTINGS = 2_000_000
+
+STOPWORDS = frozenset("""
+    about above after again all also an and any are as at be because been before
+    being below between both but by can could did do does doing don down during
+    each either else few for from further get got had has have having he her
+    here him his how if in into is it its itself just let like make me more most
+    my need no nor not now of off on once one only or other our out over own
+    please same she should so some such than that the their them then there
+    these they this those through to too under until up us use very want was we
+    were what when where which while who whom why will with would you your
+    def return self cls import none true false null var const new function
+    class public private static void int str string end
+""".split())
+
+_IDENT = re.compile(r"[^\W\d]\w+")
+_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+")
+
+
+class _Terms(dict):
+    """identifier -> hashes of its terms; shared, since identifiers repeat across files."""
+    MAX_SIZE = 200_000
+
+    def __missing__(self, ident):
+        if len(self) > self.MAX_SIZE:
+            self.clear()
+        low = ident.lower()
+        parts = [part.lower() for part in _PART.findall(ident) if len(part) > 1]
+        words = [low] + parts if len(parts) > 1 else [low]
+        hashes = tuple(zlib.crc32(word.encode("utf-8")) for word in words
+                       if word not in STOPWORDS and len(word) <= MAX_TERM_CHARS)
+        self[ident] = hashes
+        return hashes
+
+
+_terms = _Terms()
+
+
+def terms(text: str) -> Counter:
+    """Frequencies of a text's terms, by term hash."""
+    return Counter(itertools.chain.from_iterable(map(_terms.__getitem__, _IDENT.findall(text))))
+
+
+class RelevanceIndex:
+    """
+    BM25 index of one workspace root's files. Paths are relative to the
+    root, with "/" separators.
+    """
+
+    def __init__(self, root: str, cache_path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path or os.path.join(
+            outbox.user_cache_dir(), "relevance",
+            hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16] + ".idx")
+        self.paths: List[Optional[str]] = []  # doc id -> path, None once removed
+        self.stats: List[Optional[list]] = []  # doc id -> [mtime_ns, size]
+        self.lengths = array("I")  # doc id -> number of terms, 0 once removed
+        # Postings are doc id << 8 | min(frequency, 255)
+        self.keys = array("I")  # sorted term hashes
+        self.starts = array("I", [0])  # keys[i]'s postings are postings[starts[i]:starts[i + 1]]
+        self.postings = array("I")
+        self.delta = {}  # term hash -> postings added since the last merge
+        self.delta_size = 0
+        self.by_path = {}
+        self.total_length = 0
+        self.removed = 0
+        self._norms = None
+        self._loaded = False
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.by_path)
+
+    # --- Persistence -------------------------------------------------------------
+
+    def load(self):
+        self._loaded = True
+        try:
+            with open(self.cache_path, "rb") as f:
+                header = json.loads(f.readline())
+                body = array("I")
+                body.frombytes(f.read())
+        except (OSError, ValueError):
+            return
+        if (header.get("version") != CACHE_VERSION or header.get("root") != self.root
+                or header.get("byteorder") != sys.byteorder):
+            return
+        sizes = header["sizes"]
+        if len(body) != sum(sizes):
+            logging.warning(f"Ignoring a damaged relevance index: {self.cache_path}")
+            return
+        sections, offset = [], 0
+        for size in sizes:
+            sections.append(body[offset:offset + size])
+            offset += size
+        self.lengths, self.keys, self.starts, self.postings, delta_keys, delta_counts, delta = sections
+        offset = 0
+        for key, count in zip(delta_keys, delta_counts):
+            self.delta[key] = delta[offset:offset + count]
+            offset += count
+        self.delta_size = len(delta)
+        self.paths = header["paths"]
+        self.stats = header["stats"]
+        self.by_path = {path: doc for doc, path in enumerate(self.paths) if path is not None}
+        self.total_length = sum(self.lengths)
+        self.removed = len(self.paths) - len(self.by_path)
+
+    def save(self):
+        if not self._dirty:
+            return
+        delta_keys = array("I", self.delta)
+        delta_counts = array("I", map(len, self.delta.values()))
+        delta = array("I")
+        for posting in self.delta.values():
+            delta.extend(posting)
+        sections = (self.lengths, self.keys, self.starts, self.postings, delta_keys, delta_counts, delta)
+        header = {"version": CACHE_VERSION, "root": self.root, "byteorder": sys.byteorder,
+                  "paths": self.paths, "stats": self.stats, "sizes": [len(s) for s in sections]}
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+                for section in sections:
+                    section.tofile(f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            logging.warning(f"Could not save the relevance index: {e}")
+
+    # --- Updates -----------------------------------------------------------------
+
+    def add(self, rel_path: str, text: str, stat: Optional[list] = None):
+        """Index a file's text, replacing what was indexed for it before."""
+        self.remove(rel_path)
+        counts = terms(text)
+        for key, count in terms(rel_path.replace("/", " ")).items():
+            counts[key] += count * PATH_WEIGHT
+        doc = len(self.paths)
+        self.paths.append(rel_path)
+        self.stats.append(stat)
+        length = sum(counts.values())
+        self.lengths.append(length)
+        self.total_length += length
+        self.by_path[rel_path] = doc
+        delta = self.delta
+        for key, count in counts.items():
+            posting = delta.get(key)
+            if posting is None:
+                delta[key] = array("I", (doc << 8 | min(count, 255),))
+            else:
+                posting.append(doc << 8 | min(count, 255))
+        self.delta_size += len(counts)
+        self._norms = None
+        self._dirty = True
+
+    def remove(self, rel_path: str):
+        doc = self.by_path.pop(rel_path, None)
+        if doc is None:
+            return
+        self.total_length -= self.lengths[doc]
+        self.paths[doc] = self.stats[doc] = None
+        self.lengths[doc] = 0
+        self.removed += 1
+        self._norms = None
+        self._dirty = True
+
+    def merge(self):
+        """
+        Fold the delta into the arrays and, if files were removed, drop their
+        postings and renumber the rest.
+        """
+        renumber = None
+        if self.removed:
+            renumber = array("i", [-1]) * len(self.paths)
+            for new, old in enumerate(doc for doc, path in enumerate(self.paths) if path is not None):
+                renumber[old] = new
+        keys, starts, postings = array("I"), array("I", [0]), array("I")
+        old_keys, old_starts, old_postings = self.keys, self.starts, self.postings
+        delta_keys = sorted(self.delta)
+        i = j = 0
+        while i < len(old_keys) or j < len(delta_keys):
+            if j == len(delta_keys) or (i < len(old_keys) and old_keys[i] < delta_keys[j]):
+                key, posting = old_keys[i], old_postings[old_starts[i]:old_starts[i + 1]]
+                i += 1
+            else:
+                key, posting = delta_keys[j], self.delta[delta_keys[j]]
+                j += 1
+                if i < len(old_keys) and old_keys[i] == key:
+                    posting = old_postings[old_starts[i]:old_starts[i + 1]] + posting
+                    i += 1
+            if renumber is not None:
+                posting = array("I", (renumber[p >> 8] << 8 | p & 255 for p in posting
+                                      if renumber[p >> 8] >= 0))
+            if posting:
+                keys.append(key)
+                postings.extend(posting)
+                starts.append(len(postings))
+        self.keys, self.starts, self.postings = keys, starts, postings
+        self.delta, self.delta_size = {}, 0
+        if renumber is not None:
+            alive = [path is not None for path in self.paths]
+            self.lengths = array("I", itertools.compress(self.lengths, alive))
+            self.stats = list(itertools.compress(self.stats, alive))
+            self.paths = list(itertools.compress(self.paths, alive))
+            self.by_path = {path: doc for doc, path in enumerate(self.paths)}
+            self.removed = 0
+        self._norms = None
+        self._dirty = True
+
+    def build(self, rel_paths: Iterable[str], cancelled=lambda: False) -> bool:
+        """
+        Bring the index up to date with these files of the root: new and
+        changed files are read, files no longer listed are removed. Returns
+        False if cancelled part way; what was done so far is kept.
+        """
+        if not self._loaded:
+            self.load()
+        rel_paths = list(rel_paths)
+        for rel_path in set(self.by_path).difference(rel_paths):
+            self.remove(rel_path)
+        for count, rel_path in enumerate(rel_paths):
+            if count % 256 == 0 and cancelled():
+                return False
+            abs_path = os.path.join(self.root, rel_path)
+            try:
+                st = os.stat(abs_path)
+                doc = self.by_path.get(rel_path)
+                if doc is not None and self.stats[doc] == [st.st_mtime_ns, st.st_size]:
+                    continue
+                with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+                    text = f.read(MAX_INDEXED_CHARS)
+            except OSError:
+                self.remove(rel_path)
+                continue
+            self.add(rel_path, text, [st.st_mtime_ns, st.st_size])
+            if self.delta_size > MAX_DELTA_POSTINGS:
+                self.merge()
+        _terms.clear()
+        if self.delta_size > len(self.postings) // 8 or self.removed > len(self.by_path) // 8:
+            self.merge()
+        self.save()
+        return True
+
+    # --- Queries -----------------------------------------------------------------
+
+    def _posting(self, key):
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            posting = self.postings[self.starts[i]:self.starts[i + 1]]
+            if key in self.delta:
+                posting.extend(self.delta[key])
+            return posting
+        return self.delta.get(key)
+
+    def _doc_norms(self):
+        """k1 * (1 - b + b * length / average length) per doc; infinite for removed docs."""
+        if self._norms is None:
+            average = self.total_length / max(1, len(self.by_path)) or 1.0
+            self._norms = [K1 * (1 - B + B * length / average) if length else math.inf
+                           for length in self.lengths]
+        return self._norms
+
+    def search(self, text: str, limit: int = 100) -> List[Tuple[str, float]]:
+        """The best matching files for a prompt, as (path, score), best first."""
+        postings = [posting for posting in map(self._posting, terms(text)) if posting]
+        if not postings:
+            return []
+        postings.sort(key=len)
+        norms = self._doc_norms()
+        total_docs = len(self.by_path)
+        scores = {}
+        scored = 0
+        for posting in postings:
+            if scored and scored + len(posting) > MAX_SCORED_POSTINGS:
+                break
+            scored += len(posting)
+            df = len(posting)
+            weight = math.log(1 + (total_docs - df + 0.5) / (df + 0.5)) * (K1 + 1)
+            get = scores.get
+            for packed in posting:
+                doc = packed >> 8
+                tf = packed & 255
+                scores[doc] = get(doc, 0.0) + weight * tf / (tf + norms[doc])
+        best = heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+        return [(self.paths[doc], score) for doc, score in best if score > 0]
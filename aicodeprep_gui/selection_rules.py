@@ -0,0 +1,147 @@
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class SelectionRules:
+    """
+    A saved file selection, stored as path rules rather than one line per file.
+
+    Each rule is a relative path. A trailing "/" makes it a folder rule that
+    covers everything below the folder; a leading "!" excludes instead of
+    includes. The most specific rule wins: a file's own entry, then the
+    nearest folder rule above it. Paths no rule covers are not selected.
+    A plain list of file paths (the old [files] section) is a valid rule set.
+    """
+
+    def __init__(self, lines: Iterable[str] = ()):
+        self.files: Dict[str, bool] = {}
+        self.dirs: Dict[str, bool] = {}
+        for line in lines:
+            self.add(line)
+
+    def __bool__(self):
+        return bool(self.files) or bool(self.dirs)
+
+    def __len__(self):
+        return len(self.files) + len(self.dirs)
+
+    def __eq__(self, other):
+        return (isinstance(other, SelectionRules)
+                and self.files == other.files and self.dirs == other.dirs)
+
+    def add(self, line: str):
+        line = line.strip()
+        included = not line.startswith('!')
+        path = line.lstrip('!')
+        is_dir = path.endswith(('/', os.sep))
+        path = path.rstrip('/' + os.sep)
+        if not path:
+            return
+        path = os.path.normpath(path)
+        (self.dirs if is_dir else self.files)[path] = included
+
+    def is_selected(self, rel_path: str) -> bool:
+        """Whether the rules select rel_path; O(depth) dictionary lookups."""
+        if rel_path in self.files:
+            return self.files[rel_path]
+        if self.dirs:
+            path = rel_path
+            while path:
+                if path in self.dirs:
+                    return self.dirs[path]
+                path = os.path.dirname(path)
+        return False
+
+    def state_below(self, dir_path: str) -> Optional[bool]:
+        """
+        Whether the rules select every path below dir_path (True) or none
+        (False); None if rules inside the folder decide path by path.
+        """
+        prefix = dir_path + os.sep
+        if any(path.startswith(prefix) for path in self.files) \
+                or any(path.startswith(prefix) for path in self.dirs):
+            return None
+        path = dir_path
+        while path:
+            if path in self.dirs:
+                return self.dirs[path]
+            path = os.path.dirname(path)
+        return False
+
+    def map_paths(self, func: Callable[[str], str]) -> "SelectionRules":
+        mapped = SelectionRules()
+        mapped.files = {func(path): included for path, included in self.files.items()}
+        mapped.dirs = {func(path): included for path, included in self.dirs.items()}
+        return mapped
+
+    def lines(self) -> List[str]:
+        """The rules in path order, parents before the paths they contain."""
+        entries = [(path, True, included) for path, included in self.dirs.items()]
+        entries += [(path, False, included) for path, included in self.files.items()]
+        entries.sort(key=lambda entry: (entry[0].split(os.sep), not entry[1]))
+        return [("" if included else "!") + path + ("/" if is_dir else "")
+                for path, is_dir, included in entries]
+
+    @classmethod
+    def from_selection(cls, selected: Iterable[str], universe: Iterable[str]) -> "SelectionRules":
+        """
+        The smallest rule set that selects exactly `selected` among the
+        `universe` of files the loader will evaluate. Selected paths outside
+        the universe are kept as plain file entries, so the result is exact
+        whatever the universe. Each folder picks whichever of include or
+        exclude needs fewer lines for its subtree (a two-state tree DP).
+        """
+        selected = set(selected)
+        root = _Dir()
+        for rel_path in universe:
+            root.add(rel_path.split(os.sep), rel_path in selected)
+        rules = cls()
+        _emit(root, "", False, rules)
+        for rel_path in selected:
+            if not rules.is_selected(rel_path):
+                rules.files[rel_path] = True
+        return rules
+
+
+class _Dir:
+    __slots__ = ("files", "dirs", "cost")
+
+    def __init__(self):
+        self.files = {}  # name -> selected
+        self.dirs = {}   # name -> _Dir
+        self.cost = None  # (lines if this folder ends up excluded, lines if included)
+
+    def add(self, parts, selected):
+        node = self
+        for part in parts[:-1]:
+            node = node.dirs.get(part) or node.dirs.setdefault(part, _Dir())
+        node.files[parts[-1]] = selected
+
+
+def _costs(node):
+    """Fewest rule lines for node's subtree given it is excluded / included."""
+    if node.cost is None:
+        cost = []
+        for state in (False, True):
+            lines = sum(1 for selected in node.files.values() if selected != state)
+            for child in node.dirs.values():
+                child_cost = _costs(child)
+                # The child either inherits this state or needs its own rule line
+                lines += min(child_cost[state], child_cost[not state] + 1)
+            cost.append(lines)
+        node.cost = tuple(cost)
+    return node.cost
+
+
+def _emit(node, path, state, rules):
+    for name, selected in node.files.items():
+        if selected != state:
+            rules.files[os.path.join(path, name) if path else name] = selected
+    for name, child in node.dirs.items():
+        child_path = os.path.join(path, name) if path else name
+        child_cost = _costs(child)
+        child_state = state
+        if child_cost[not state] + 1 < child_cost[state]:
+            child_state = not state
+            rules.dirs[child_path] = child_state
+        _emit(child, child_path, child_state, rules)
@@ -1,52 +1,20 @@
-from importlib import resources
 import os
-import sys
 import logging
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 import fnmatch
 
-# New imports for the refactoring
-import toml
-from pathspec import PathSpec
-from pathspec.patterns import GitWildMatchPattern
+from aicodeprep_gui import data_summary, notebook, tracing, truncation, workspace
+from aicodeprep_gui import project_config
+from aicodeprep_gui.project_config import config_for
+
+# Moved to project_config; still importable from here for older callers
+get_config_path = project_config.get_config_path
+load_config_from_path = project_config.load_config_from_path
 
-def get_config_path():
-    """Get the path to the default configuration file."""
-    if getattr(sys, 'frozen', False):
-        base_path = sys._MEIPASS
-        config_path = os.path.join(base_path, 'aicodeprep_gui', 'data', 'default_config.toml')
-    else:
-        try:
-            with resources.path('aicodeprep_gui.data', 'default_config.toml') as config_file:
-                config_path = str(config_file)
-        except ModuleNotFoundError:
-            config_path = os.path.join(os.path.dirname(__file__), 'data', 'default_config.toml')
-    return config_path
-
-def load_config_from_path(path: str) -> dict:
-    """Loads a TOML configuration file from a given path."""
-    if not os.path.exists(path):
-        return {}
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return toml.load(f)
-    except Exception as e:
-        logging.error(f"Error loading or parsing TOML config at {path}: {e}")
-        return {}
-
-def load_configurations() -> dict:
-    """Load default config, then load user config and merge them."""
-    default_config_path = get_config_path()
-    config = load_config_from_path(default_config_path)
-    if not config:
-        logging.critical("Failed to load default configuration. Exiting.")
-        sys.exit("Could not load the default configuration file.")
-    user_config_path = os.path.join(os.getcwd(), 'aicodeprep-gui.toml')
-    user_config = load_config_from_path(user_config_path)
-    if user_config:
-        logging.info(f"Found user configuration at {user_config_path}. Merging settings.")
-        config.update(user_config)
-    return config
+
+def load_configurations(root_dir: str = None) -> dict:
+    """The merged default and project settings for root_dir (default: the current directory)."""
+    return config_for(root_dir).config
 
 def is_binary_file(filepath: str) -> bool:
     """Return True if this file is likely binary."""
@@ -56,35 +24,144 @@ def is_binary_file(filepath: str) -> bool:
     if chunk.startswith((b'\xEF\xBB\xBF', b'\xFF\xFE', b'\xFE\xFF', b'\xFF\xFE\x00\x00', b'\x00\x00\xFE\xFF')): return False
     return b'\x00' in chunk
 
-# --- CONFIG AND PATHSPEC LOADING ---
-config = load_configurations()
-CODE_EXTENSIONS = set(config.get('code_extensions', []))
-MAX_FILE_SIZE = config.get('max_file_size', 1000000)
-exclude_spec = PathSpec.from_lines(GitWildMatchPattern, config.get('exclude_patterns', []))
-include_spec = PathSpec.from_lines(GitWildMatchPattern, config.get('default_include_patterns', []))
-# These are still useful for some simple checks in the GUI and logic
-EXCLUDE_DIRS = [p.rstrip('/') for p in config.get('exclude_patterns', []) if p.endswith('/')]
-EXCLUDE_FILES = [p for p in config.get('exclude_patterns', []) if not p.endswith('/')]
-EXCLUDE_PATTERNS = EXCLUDE_FILES # Simplified for backward compatibility
-INCLUDE_FILES = config.get('default_include_patterns', [])
-INCLUDE_DIRS = [p.rstrip('/') for p in INCLUDE_FILES if p.endswith('/')]
-EXCLUDE_EXTENSIONS = [] # This concept is now handled by patterns
+def size_policy(abs_path: str, size: int, root_dir: str = None):
+    """
+    The large-file policy for abs_path (see Level.size_policy), from the
+    config of root_dir (default: the workspace root the file belongs to).
+    """
+    root_dir = root_dir or workspace.current().root_of(abs_path)
+    prefix = root_dir.rstrip(os.sep) + os.sep
+    if abs_path.startswith(prefix):
+        rel_path = abs_path[len(prefix):]
+    else:
+        try:
+            rel_path = os.path.relpath(abs_path, root_dir)
+        except ValueError:
+            rel_path = os.path.basename(abs_path)
+    return config_for(root_dir).level_for(rel_path).size_policy(os.path.basename(abs_path), size)
+
+def notebook_text(abs_path: str, root_dir: str = None):
+    """
+    A Jupyter notebook rendered as source (see notebook.render), with the
+    [notebooks] settings of root_dir's project. None if rendering is turned
+    off or the file cannot be parsed, in which case it is treated as text.
+    """
+    root_dir = root_dir or workspace.current().root_of(abs_path)
+    settings = config_for(root_dir).config.get('notebooks', {})
+    if not settings.get('render', True):
+        return None
+    try:
+        return notebook.render(abs_path, include_outputs=settings.get('include_outputs', True),
+                               output_lines=settings.get('output_lines', notebook.DEFAULT_OUTPUT_LINES))
+    except (ValueError, UnicodeDecodeError) as e:
+        logging.warning(f"Could not parse notebook {abs_path} ({e}); including it as text")
+        return None
+
+def summarizes(abs_path: str, size: int, root_dir: str = None) -> bool:
+    """
+    Whether a data file goes into the bundle as a summary unless its level
+    says otherwise: it is over [data_files] summarize_over.
+    """
+    if data_summary.kind_of(abs_path) is None:
+        return False
+    root_dir = root_dir or workspace.current().root_of(abs_path)
+    limit = config_for(root_dir).config.get('data_files', {}).get('summarize_over', -1)
+    return 0 <= limit < size
+
+def data_file_summary(abs_path: str, root_dir: str = None):
+    """
+    A data file's summary (see data_summary.summarize), or None if it cannot
+    be read as its kind, in which case it is treated as text.
+    """
+    root_dir = root_dir or workspace.current().root_of(abs_path)
+    settings = config_for(root_dir).config.get('data_files', {})
+    try:
+        return data_summary.summarize(abs_path, settings.get('sample_rows', data_summary.DEFAULT_SAMPLE_ROWS))
+    except ValueError as e:
+        logging.warning(f"Could not summarize {abs_path} ({e}); including it as text")
+        return None
+
+def estimate_tokens(filepath: str, root_dir: str = None) -> int:
+    """
+    Rough token estimate for a text file (about 4 characters per token), read
+    in chunks. Files over their size limit count as the excerpt the bundle gets,
+    notebooks as their rendered source and large data files as their summary.
+    """
+    chars = 0
+    if filepath.endswith(".ipynb"):
+        text = notebook_text(filepath, root_dir)
+        if text is not None:
+            return len(text) // 4
+    try:
+        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+            size = os.fstat(f.fileno()).st_size
+            if summarizes(filepath, size, root_dir):
+                text = data_file_summary(filepath, root_dir)
+                if text is not None:
+                    return len(text) // 4
+            cut = size_policy(filepath, size, root_dir)
+            if cut is False:
+                return 0
+            if cut:
+                return len(truncation.head_tail(filepath, *cut, size=size)) // 4
+            for chunk in iter(lambda: f.read(65536), ""):
+                chars += len(chunk)
+    except Exception:
+        return 0
+    return chars // 4
+
+# --- CONFIG ---
+# Settings are no longer loaded at import. The old module-level names are
+# resolved on access, for the project in the current directory; code that
+# knows its root should use config_for(root) instead.
+def _legacy_settings(cfg) -> dict:
+    config = cfg.config
+    excludes = config.get('exclude_patterns', [])
+    includes = config.get('default_include_patterns', [])
+    return {
+        'config': config,
+        'CODE_EXTENSIONS': set(cfg.root_level.code_extensions),
+        'MAX_FILE_SIZE': cfg.root_level.max_file_size,
+        'exclude_spec': cfg.exclude_spec,
+        'include_spec': cfg.include_spec,
+        'EXCLUDE_DIRS': [p.rstrip('/') for p in excludes if p.endswith('/')],
+        'EXCLUDE_FILES': [p for p in excludes if not p.endswith('/')],
+        'EXCLUDE_PATTERNS': [p for p in excludes if not p.endswith('/')],
+        'INCLUDE_FILES': includes,
+        'INCLUDE_DIRS': [p.rstrip('/') for p in includes if p.endswith('/')],
+        'EXCLUDE_EXTENSIONS': [],
+    }
+
+
+def __getattr__(name):
+    if name in ('config', 'CODE_EXTENSIONS', 'MAX_FILE_SIZE', 'exclude_spec', 'include_spec',
+                'EXCLUDE_DIRS', 'EXCLUDE_FILES', 'EXCLUDE_PATTERNS', 'INCLUDE_FILES',
+                'INCLUDE_DIRS', 'EXCLUDE_EXTENSIONS'):
+        return _legacy_settings(config_for())[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # --- REWRITTEN collect_all_files FOR LAZY LOADING ---
-def collect_all_files() -> List[Tuple[str, str, bool]]:
+@tracing.traced("scan")
+def collect_all_files(root_dir: str = None) -> List[Tuple[str, str, bool]]:
     """
-    Collects files and directories. For excluded directories, it returns them as
-    a single entry without their contents, allowing the GUI to lazy-load them.
+    Collects files and directories under root_dir (default: the current
+    directory). For excluded directories, it returns them as a single entry
+    without their contents, allowing the GUI to lazy-load them.
     Returns a list of (absolute_path, relative_path, is_checked_by_default).
     """
     all_paths = []
-    root_dir = os.getcwd()
+    root_dir = os.path.abspath(root_dir or os.getcwd())
+    cfg = config_for(root_dir, fresh=True)
     seen_paths = set()
     logging.info(f"Starting initial fast scan in: {root_dir}")
 
     for root, dirs, files in os.walk(root_dir, topdown=True):
         rel_root = os.path.relpath(root, root_dir)
         if rel_root == '.': rel_root = ''
+        # The folder was just listed, so this also notices config and .gitignore
+        # files added since the last scan
+        level = cfg.level(rel_root, names=files)
 
         # Add the directory itself unless it's the root
         if rel_root and root not in seen_paths:
@@ -92,31 +169,29 @@ def collect_all_files() -> List[Tuple[str, str, bool]]:
              seen_paths.add(root)
 
         # Prune directories from the walk
-        dirs_to_prune = []
-        for d in dirs:
-            rel_dir_path = os.path.join(rel_root, d)
-            if exclude_spec.match_file(rel_dir_path + '/'):
-                dirs_to_prune.append(d)
-        dirs[:] = [d for d in dirs if d not in dirs_to_prune]
+        dirs[:] = [d for d in dirs if not level.is_excluded(os.path.join(rel_root, d), is_dir=True)]
+        dir_names = set(dirs)
 
         # Process all items (unpruned dirs and files)
         for name in dirs + files:
             abs_path = os.path.join(root, name)
             rel_path = os.path.join(rel_root, name)
             if abs_path in seen_paths: continue
+            is_dir = name in dir_names
+            # Ignored directories were pruned above; ignored files are not even sniffed
+            if not is_dir and level.has_ignores and level.is_ignored(rel_path):
+                continue
 
             # Determine default check state
             is_checked = False
-            check_path = rel_path + '/' if os.path.isdir(abs_path) else rel_path
-
-            if include_spec.match_file(check_path):
+            if level.is_default_included(rel_path, is_dir):
                 is_checked = True
-            elif os.path.isfile(abs_path) and os.path.splitext(name)[1].lower() in CODE_EXTENSIONS:
+            elif not is_dir and os.path.isfile(abs_path) and level.is_code_file(name):
                  is_checked = True
 
-            # Final filters for files
-            if os.path.isfile(abs_path):
-                if is_binary_file(abs_path) or os.path.getsize(abs_path) > MAX_FILE_SIZE:
+            # Final filters for files; large files stay checked when they are bundled as an excerpt
+            if not is_dir and os.path.isfile(abs_path):
+                if is_binary_file(abs_path) or level.size_policy(name, os.path.getsize(abs_path)) is False:
                     is_checked = False
 
             all_paths.append((abs_path, rel_path, is_checked))
@@ -125,10 +200,30 @@ def collect_all_files() -> List[Tuple[str, str, bool]]:
     logging.info(f"Initial scan collected {len(all_paths)} items.")
     return all_paths
 
+def iter_included_files(dir_path: str, root_dir: str = None) -> Iterator[str]:
+    """
+    Yields the files a checked folder stands for, in sorted order: excluded
+    directories are pruned as in collect_all_files, excluded and binary files
+    are skipped. Patterns are matched relative to root_dir (default: the
+    current directory), i.e. the workspace root the folder belongs to.
+    """
+    root_dir = root_dir or os.getcwd()
+    cfg = config_for(root_dir)
+    for root, dirs, files in os.walk(dir_path, topdown=True):
+        rel_root = os.path.relpath(root, root_dir)
+        level = cfg.level(rel_root)
+        dirs[:] = sorted(d for d in dirs
+                         if not level.is_excluded(os.path.join(rel_root, d), is_dir=True))
+        for name in sorted(files):
+            abs_path = os.path.join(root, name)
+            if level.is_excluded(os.path.join(rel_root, name)) or is_binary_file(abs_path):
+                continue
+            yield abs_path
+
 def is_excluded_directory(path: str) -> bool:
     """Simplified check used by GUI folder-click logic."""
     dir_name = os.path.basename(path)
-    return any(fnmatch.fnmatch(dir_name, pat) for pat in EXCLUDE_DIRS)
+    return any(fnmatch.fnmatch(dir_name, pat) for pat in _legacy_settings(config_for())['EXCLUDE_DIRS'])
 
 def matches_pattern(filename: str, pattern: str) -> bool:
     """Helper used by GUI logic."""
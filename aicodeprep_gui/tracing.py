@@ -0,0 +1,160 @@
+"""
+Lightweight span tracing for startup and generation phases.
+
+Enabled with `--profile` or the AICODEPREP_PROFILE environment variable (set
+it to 1, or to the path the trace should be written to). On exit a Chrome
+trace-event JSON is written (open it in chrome://tracing or Perfetto) and a
+per-span summary table is printed.
+
+While disabled, span() hands back one shared no-op context manager and
+traced() calls straight through, so instrumented code costs a global check.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+ENV_VAR = "AICODEPREP_PROFILE"
+DEFAULT_TRACE_FILE = "aicodeprep-gui-trace.json"
+
+_enabled = False
+_trace_path = None
+_events = []  # list.append is atomic, so worker threads record without a lock
+_thread_names = {}
+_origin = time.perf_counter()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        thread = threading.current_thread()
+        _thread_names.setdefault(thread.ident, thread.name)
+        _events.append((self.name, self.start, end - self.start,
+                        thread.ident, self.args))
+        return False
+
+    def set(self, **args):
+        """Attach arguments known only once the work is done (e.g. counts)."""
+        self.args.update(args)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(trace_path: str = None):
+    """Start recording spans; the trace is written to trace_path at exit."""
+    global _enabled, _trace_path
+    _trace_path = os.path.abspath(trace_path or DEFAULT_TRACE_FILE)
+    if not _enabled:
+        _enabled = True
+        atexit.register(finish)
+
+
+def span(name: str, **args):
+    """Context manager timing a block: `with tracing.span("scan"): ...`."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: str):
+    """Decorator form of span() for whole functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def mark(name: str):
+    """Record a zero-length event, e.g. the first paint."""
+    if _enabled:
+        thread = threading.current_thread()
+        _thread_names.setdefault(thread.ident, thread.name)
+        _events.append((name, time.perf_counter(), None, thread.ident, {}))
+
+
+def chrome_trace() -> dict:
+    pid = os.getpid()
+    trace_events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+         "args": {"name": thread_name}}
+        for tid, thread_name in _thread_names.items()
+    ]
+    for name, start, duration, tid, args in list(_events):
+        event = {"name": name, "pid": pid, "tid": tid,
+                 "ts": round((start - _origin) * 1e6, 1), "args": args}
+        if duration is None:
+            event.update(ph="i", s="t")
+        else:
+            event.update(ph="X", dur=round(duration * 1e6, 1))
+        trace_events.append(event)
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def summary_table() -> str:
+    totals = {}
+    for name, _, duration, _, _ in list(_events):
+        if duration is None:
+            continue
+        count, total, longest = totals.get(name, (0, 0.0, 0.0))
+        totals[name] = (count + 1, total + duration, max(longest, duration))
+    width = max([len("span")] + [len(name) for name in totals])
+    lines = [f"{'span':<{width}}  {'count':>6}  {'total ms':>10}  {'mean ms':>9}  {'max ms':>9}"]
+    for name, (count, total, longest) in sorted(
+            totals.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name:<{width}}  {count:>6}  {total * 1000:>10.1f}  "
+                     f"{total * 1000 / count:>9.2f}  {longest * 1000:>9.1f}")
+    return "\n".join(lines)
+
+
+def finish():
+    """Write the Chrome trace and print the summary table. Runs at exit."""
+    if not _enabled or not _events:
+        return
+    try:
+        with open(_trace_path, "w", encoding="utf-8") as f:
+            json.dump(chrome_trace(), f)
+        print(f"[profile] Chrome trace written to {_trace_path}")
+    except OSError as e:
+        logging.error(f"Could not write trace file {_trace_path}: {e}")
+    print(summary_table())
+
+
+if os.environ.get(ENV_VAR, "").strip() not in ("", "0"):
+    _value = os.environ[ENV_VAR].strip()
+    enable(None if _value.lower() in ("1", "true", "yes") else _value)
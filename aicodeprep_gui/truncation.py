@@ -0,0 +1,86 @@
+"""
+Head-and-tail excerpts of large files.
+
+A file over its size limit goes into the bundle as its first and last lines
+with a marker between them, instead of being left out or read in full.
+Only two bounded blocks are read, one from each end of the file, so the cost
+is the same for a 5 MB file as for a 5 GB one. Lines longer than
+MAX_LINE_CHARS (minified code, one-line JSON) are cut as well, so a single
+line cannot defeat the limit.
+"""
+import os
+
+# Bytes read per requested line; lines are rarely longer on average
+BYTES_PER_LINE = 512
+MIN_BLOCK_BYTES = 16 * 1024
+MAX_BLOCK_BYTES = 1024 * 1024
+MAX_LINE_CHARS = 2000
+
+
+def _block_size(lines):
+    return max(MIN_BLOCK_BYTES, min(MAX_BLOCK_BYTES, lines * BYTES_PER_LINE))
+
+
+def _clip(line):
+    if len(line) > MAX_LINE_CHARS:
+        return line[:MAX_LINE_CHARS] + f" ... [line cut at {MAX_LINE_CHARS:,} characters]"
+    return line
+
+
+def _decode(data):
+    return data.decode("utf-8", errors="ignore")
+
+
+def marker(omitted_bytes, size):
+    return f"... [truncated: {omitted_bytes:,} of {size:,} bytes omitted] ..."
+
+
+def head_tail(abs_path: str, head_lines: int, tail_lines: int, size: int = None) -> str:
+    """
+    The first head_lines and last tail_lines of the file, joined by a marker
+    saying how much was left out. The whole file if it has no more lines
+    than that within the blocks read.
+    """
+    if size is None:
+        size = os.path.getsize(abs_path)
+    head_block, tail_block = _block_size(head_lines), _block_size(tail_lines)
+    with open(abs_path, "rb") as f:
+        head_data = f.read(head_block)
+        if len(head_data) >= size:
+            # Both ends fit in one block: cut by line count only
+            lines = _decode(head_data).splitlines()
+            if len(lines) <= head_lines + tail_lines:
+                return "\n".join(_clip(line) for line in lines)
+            head, tail = lines[:head_lines], lines[len(lines) - tail_lines:] if tail_lines else []
+            omitted = len("\n".join(lines[head_lines:len(lines) - tail_lines]).encode("utf-8"))
+            return _join(head, tail, omitted, size)
+        tail_start = max(len(head_data), size - tail_block)
+        f.seek(tail_start)
+        tail_data = f.read(size - tail_start) if tail_lines else b""
+
+    head_chunks = head_data.split(b"\n")
+    if len(head_chunks) > head_lines:
+        head_chunks = head_chunks[:head_lines]
+    elif len(head_chunks) > 1:
+        head_chunks = head_chunks[:-1]  # the last one was cut by the block boundary
+    head_end = sum(len(chunk) + 1 for chunk in head_chunks)
+
+    tail_chunks = tail_data.split(b"\n") if tail_data else []
+    if tail_chunks and tail_start > head_end:
+        tail_chunks = tail_chunks[1:]  # starts mid-line
+    if tail_chunks and tail_chunks[-1] == b"":
+        tail_chunks = tail_chunks[:-1]  # trailing newline
+    tail_chunks = tail_chunks[-tail_lines:] if tail_lines else []
+    tail_bytes = sum(len(chunk) + 1 for chunk in tail_chunks)
+
+    omitted = max(0, size - head_end - tail_bytes)
+    head = [_decode(chunk).rstrip("\r") for chunk in head_chunks]
+    tail = [_decode(chunk).rstrip("\r") for chunk in tail_chunks]
+    return _join(head, tail, omitted, size)
+
+
+def _join(head, tail, omitted, size):
+    parts = [_clip(line) for line in head]
+    parts.append(marker(omitted, size))
+    parts.extend(_clip(line) for line in tail)
+    return "\n".join(parts)
@@ -1,18 +1,84 @@
+import json
 import logging
+import os
+import time
 from typing import Optional
 
-from packaging.version import parse as parse_version
-
-try:
-    import requests
-except ImportError:
-    requests = None
-
 from . import __version__
 
 UPDATE_URL = "https://wuu73.org/aicp/aicp-ver.md"
+CACHE_FILE = "update_check.json"
+CHECK_TTL_SECONDS = 24 * 60 * 60
+# After a failed check (offline, server down) wait this long before trying again
+FAILED_CHECK_TTL_SECONDS = 6 * 60 * 60
+
+
+def update_url() -> str:
+    return os.environ.get("AICODEPREP_UPDATE_URL") or UPDATE_URL
+
+
+def _cache_path() -> str:
+    from .outbox import user_cache_dir
+    return os.path.join(user_cache_dir(), CACHE_FILE)
+
+
+def cached_update_info() -> Optional[str]:
+    """
+    The result of the last check while it is still fresh: the update message,
+    or "" when no update was found. None when a new check is due.
+    """
+    try:
+        with open(_cache_path(), encoding="utf-8") as f:
+            cached = json.load(f)
+        # Upgrading (or downgrading) invalidates the answer
+        if cached.get("version") != __version__:
+            return None
+        ttl = CHECK_TTL_SECONDS if cached.get("ok") else FAILED_CHECK_TTL_SECONDS
+        if not 0 <= time.time() - cached["checked_at"] < ttl:
+            return None
+        return cached.get("message") or ""
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _store(ok: bool, message: Optional[str]):
+    path = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"checked_at": time.time(), "version": __version__,
+                       "ok": ok, "message": message}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.warning(f"Update check: could not cache the result: {e}")
 
-def get_update_info() -> Optional[str]:
+
+def clear_cache():
+    """Forget the last result, so the next check goes to the server (--force-update-check)."""
+    try:
+        os.remove(_cache_path())
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"Update check: could not clear the cache: {e}")
+
+
+def get_update_info(use_cache: bool = True) -> Optional[str]:
+    """
+    Like fetch_update_info(), but answers from the cached result while it is
+    fresh and caches what the server says.
+    """
+    if use_cache:
+        cached = cached_update_info()
+        if cached is not None:
+            return cached or None
+    ok, message = _fetch()
+    _store(ok, message)
+    return message
+
+
+def fetch_update_info() -> Optional[str]:
     """
     Fetches update information from a simple markdown file on a server.
 
@@ -25,18 +91,28 @@ def get_update_info() -> Optional[str]:
         Returns None if requests is not installed, on network errors, or if the
         file format is incorrect.
     """
-    if not requests:
+    return _fetch()[1]
+
+
+def _fetch():
+    """(whether the server gave a usable answer, the update message or None)."""
+    # Imported here: requests is slow to import and only needed off the GUI thread
+    try:
+        import requests
+    except ImportError:
         logging.warning("Requests library not installed, skipping update check.")
-        return None
+        return False, None
+    from packaging.version import parse as parse_version
 
+    url = update_url()
     try:
-        response = requests.get(UPDATE_URL, timeout=5)
+        response = requests.get(url, timeout=5)
         response.raise_for_status()
 
         lines = response.text.strip().split('\n')
         if len(lines) < 2:
-            logging.warning(f"Update check: Fetched file from {UPDATE_URL} has fewer than 2 lines.")
-            return None
+            logging.warning(f"Update check: Fetched file from {url} has fewer than 2 lines.")
+            return True, None
 
         latest_version_line = lines[0].strip()
         update_message_line = lines[1].strip()
@@ -46,34 +122,35 @@ def get_update_info() -> Optional[str]:
             latest_version_str = latest_version_line.replace("###", "").strip()
         else:
             logging.warning(f"Update check: Malformed version line: '{latest_version_line}'")
-            return None
+            return True, None
 
         # Extract message from a line like "#### New Version available!..."
         if update_message_line.startswith("####"):
             update_message = update_message_line.replace("####", "").strip()
         else:
             logging.warning(f"Update check: Malformed message line: '{update_message_line}'")
-            return None
+            return True, None
 
         # Compare versions using packaging.version
         if parse_version(latest_version_str) > parse_version(__version__):
             logging.info(f"Update available: {latest_version_str} (current: {__version__})")
-            return update_message
+            return True, update_message
         else:
             # This is not an error, just for debugging.
             logging.info(f"Application is up to date. (current: {__version__}, latest: {latest_version_str})")
-            return None
+            return True, None
 
     except Exception as e:
         # Silently fail on any error (network, parsing, etc.) as requested.
         logging.warning(f"Update check failed with an exception: {e}")
-        return None
+        return False, None
 
 def is_newer_version(current: str, latest: str) -> bool:
     """
     Helper function to compare two version strings.
     Returns True if latest > current.
     """
+    from packaging.version import parse as parse_version
     try:
         return parse_version(latest) > parse_version(current)
     except Exception:
@@ -0,0 +1,105 @@
+"""
+Workspace roots: the folders whose files are shown and bundled together.
+
+The first root is the primary one: the process runs inside it, and the
+output file and .aicodeprep-gui are written there. With a single root every
+path is shown relative to it, exactly as before. With several roots each one
+is a top-level node named after its folder, and paths are qualified with that
+name ("shared-lib/src/util.py") in the tree, the prefs file and the output.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+_current = None
+
+
+class Workspace:
+    def __init__(self, roots: List[str]):
+        self.roots = []
+        for root in roots:
+            root = os.path.abspath(root)
+            if root not in self.roots:
+                self.roots.append(root)
+        self.labels = self._make_labels(self.roots)
+        # Longest first, so nested roots claim their own files
+        self._by_length = sorted(zip(self.roots, self.labels),
+                                 key=lambda entry: -len(entry[0]))
+
+    @staticmethod
+    def _make_labels(roots):
+        labels = []
+        for root in roots:
+            base = os.path.basename(root.rstrip(os.sep)) or root.strip(os.sep + ':') or "root"
+            label, n = base, 2
+            while label in labels:
+                label = f"{base} ({n})"
+                n += 1
+            labels.append(label)
+        return labels
+
+    @property
+    def primary(self) -> str:
+        return self.roots[0]
+
+    @property
+    def multi_root(self) -> bool:
+        return len(self.roots) > 1
+
+    def _locate(self, abs_path):
+        for root, label in self._by_length:
+            if abs_path == root or abs_path.startswith(root.rstrip(os.sep) + os.sep):
+                return root, label
+        return self.roots[0], self.labels[0]
+
+    def root_of(self, abs_path: str) -> str:
+        return self._locate(abs_path)[0]
+
+    def root_relpath(self, abs_path: str) -> str:
+        """Path relative to the file's own root; what config patterns match against."""
+        return os.path.relpath(abs_path, self.root_of(abs_path))
+
+    def display_path(self, abs_path: str) -> str:
+        """The path shown in the tree and written to the output and prefs file."""
+        root, label = self._locate(abs_path)
+        rel_path = os.path.relpath(abs_path, root)
+        if not self.multi_root:
+            return rel_path
+        return label if rel_path == '.' else os.path.join(label, rel_path)
+
+    def scan(self) -> List[Tuple[str, str, bool]]:
+        """
+        Scan all roots concurrently into one list of
+        (absolute_path, display_path, is_checked_by_default) entries.
+        A file reachable from two overlapping roots is listed once.
+        """
+        from aicodeprep_gui.smart_logic import collect_all_files
+        if not self.multi_root:
+            return collect_all_files(self.primary)
+        with ThreadPoolExecutor(max_workers=min(8, len(self.roots))) as pool:
+            results = list(pool.map(collect_all_files, self.roots))
+        # Each root is a real folder node, so it can be checked as a whole
+        merged = [(root, label, False) for root, label in zip(self.roots, self.labels)]
+        seen = set(self.roots)
+        for entries in results:
+            for abs_path, _, is_checked in entries:
+                if abs_path in seen:
+                    continue
+                seen.add(abs_path)
+                merged.append((abs_path, self.display_path(abs_path), is_checked))
+        logging.info(f"Workspace scan of {len(self.roots)} roots collected {len(merged)} items.")
+        return merged
+
+
+def current() -> Workspace:
+    """The active workspace; a single root at the current directory unless set."""
+    if _current is None:
+        return Workspace([os.getcwd()])
+    return _current
+
+
+def set_roots(roots: List[str]) -> Workspace:
+    global _current
+    _current = Workspace(roots)
+    return _current
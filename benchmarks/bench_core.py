@@ -0,0 +1,98 @@
+"""
+Benchmarks for the non-GUI pipeline on synthetic repositories.
+
+    python -m benchmarks.bench_core --sizes 1k,10k
+    python -m benchmarks.bench_core --sizes 100k,1M --repeat 3 -o after.json
+    python -m benchmarks.compare before.json after.json
+
+Covered: the initial scan (collect_all_files), exclude/include pattern
+matching, binary detection, token estimation and writing the bundle in both
+output formats. Synthetic repos are generated once per (size, seed) and cached
+under the system temp directory (see --cache-dir).
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness, synthetic_repo
+
+DEFAULT_SIZES = "1k,10k"
+
+
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        scale = {"k": 1_000, "m": 1_000_000}.get(part[-1:], 1)
+        sizes.append(int(float(part.rstrip("km")) * scale))
+    return sizes
+
+
+def bench_size(suite, n_files, seed, cache_dir):
+    from aicodeprep_gui import smart_logic, workspace
+    from aicodeprep_gui.file_processor import process_files
+
+    print(f"Preparing synthetic repo with {n_files:,} files...", flush=True)
+    root = synthetic_repo.repo_for(n_files, seed, cache_dir)
+    workspace.set_roots([root])
+    planned = [rel_path for rel_path, _, _ in synthetic_repo.plan(n_files, seed)]
+    dirs = sorted({os.path.dirname(p) + "/" for p in planned if os.path.dirname(p)})
+    candidates = planned + dirs
+    print(f"{n_files:,} files ({root})", flush=True)
+
+    entries = suite.run("scan.collect_all_files", n_files,
+                        lambda: smart_logic.collect_all_files(root))
+    files = [abs_path for abs_path, _, _ in entries if os.path.isfile(abs_path)]
+    checked = [abs_path for abs_path, _, is_checked in entries
+               if is_checked and os.path.isfile(abs_path)]
+
+    cfg = smart_logic.config_for(root)
+    suite.run("patterns.exclude_match", n_files,
+              lambda: sum(1 for p in candidates if cfg.exclude_spec.match_file(p)),
+              paths=len(candidates))
+    suite.run("patterns.include_match", n_files,
+              lambda: sum(1 for p in candidates if cfg.include_spec.match_file(p)),
+              paths=len(candidates))
+    suite.run("binary.is_binary_file", n_files,
+              lambda: sum(1 for p in files if smart_logic.is_binary_file(p)),
+              files=len(files))
+    suite.run("tokens.estimate_tokens", n_files,
+              lambda: sum(smart_logic.estimate_tokens(p) for p in checked),
+              files=len(checked))
+
+    with tempfile.TemporaryDirectory(prefix="aicodeprep-bench-out-") as out_dir:
+        for fmt in ("xml", "markdown"):
+            output = os.path.join(out_dir, f"bundle.{fmt}")
+            suite.run(f"process_files.{fmt}", n_files,
+                      lambda: process_files(checked, output, fmt=fmt, prompt="Review this."),
+                      files=len(checked))
+        suite.record("bundle.bytes", n_files, bytes=os.path.getsize(output))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the core aicodeprep-gui pipeline.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated repo sizes, e.g. 1k,10k,100k,1M (default: {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per benchmark (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds first (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic repo seed (default: 0)")
+    parser.add_argument("--cache-dir", default=None,
+                        help=f"Where synthetic repos are kept (default: {synthetic_repo.default_cache_dir()})")
+    parser.add_argument("-o", "--output", help="Results JSON path (default: benchmarks/results/core-<time>.json)")
+    args = parser.parse_args(argv)
+
+    # The pipeline logs every processed file at INFO, which would dominate the timings
+    logging.basicConfig(level=logging.WARNING)
+    suite = harness.Suite("core", repeat=args.repeat, warmup=args.warmup)
+    for n_files in parse_sizes(args.sizes):
+        bench_size(suite, n_files, args.seed, args.cache_dir)
+    suite.write(args.output)
+
+
+if __name__ == "__main__":
+    main()
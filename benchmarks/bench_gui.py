@@ -0,0 +1,184 @@
+"""
+Headless benchmarks for the file-selection window.
+
+    python -m benchmarks.bench_gui --sizes 1k,10k
+    python -m benchmarks.compare before.json after.json
+
+Runs FileSelectionGUI under the offscreen Qt platform on the scan of a
+synthetic repository and times the interaction hot paths: building the
+window and tree, select all, deselect all, checking the largest folder
+(handle_item_changed with its cascade), "Load preferences" and
+get_selected_files. Memory is tracked with tracemalloc: the peak while the
+window is built and what it still holds afterwards.
+
+User settings (QSettings) are redirected to a temporary directory so runs
+neither read nor change the real ones. Background workers are drained
+between rounds so each round starts from the same state.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness, synthetic_repo
+from benchmarks.bench_core import DEFAULT_SIZES, parse_sizes
+
+
+SETTLE_SECONDS = 0.25  # longer than the window's coalescing and repaint timers
+
+
+def _settle(app):
+    """Let pending timers, queued signals and background workers finish, untimed."""
+    from PySide6 import QtCore
+    pool = QtCore.QThreadPool.globalInstance()
+    deadline = time.perf_counter() + SETTLE_SECONDS
+    while True:
+        pool.waitForDone()
+        app.processEvents()
+        if time.perf_counter() >= deadline and pool.activeThreadCount() == 0:
+            break
+        time.sleep(0.01)
+
+
+def _dispose(app, window):
+    from PySide6 import QtCore
+    # Deliver the workers' last signals while their receivers still exist
+    _settle(app)
+    window.deleteLater()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def _largest_folder(window):
+    """The top-level folder with the most files below it."""
+    from aicodeprep_gui.gui.components.tree_widget import IS_FILE_ROLE
+    counts = {}
+    for rel_path, item in window.path_to_item.items():
+        if item.data(0, IS_FILE_ROLE) and os.sep in rel_path:
+            top = rel_path.split(os.sep, 1)[0]
+            counts[top] = counts.get(top, 0) + 1
+    top = max(counts, key=counts.get)
+    return window.path_to_item[top], counts[top]
+
+
+def bench_size(suite, app, n_files, seed, cache_dir):
+    from PySide6 import QtCore
+    from aicodeprep_gui import smart_logic, workspace
+    from aicodeprep_gui.gui.main_window import FileSelectionGUI
+
+    print(f"Preparing synthetic repo with {n_files:,} files...", flush=True)
+    root = synthetic_repo.repo_for(n_files, seed, cache_dir)
+    # The window keeps its prefs file in the current directory
+    os.chdir(root)
+    for name in (".aicodeprep-gui", ".aicodeprep-gui-sets"):
+        if os.path.exists(name):
+            os.remove(name)
+    workspace.set_roots([root])
+    files = smart_logic.collect_all_files(root)
+    print(f"{n_files:,} files, {len(files):,} scan entries", flush=True)
+
+    built = []
+
+    def dispose_built():
+        while built:
+            _dispose(app, built.pop())
+        _settle(app)
+
+    suite.run("window.construct", n_files, lambda _: built.append(FileSelectionGUI(files)),
+              setup=dispose_built, entries=len(files))
+    dispose_built()
+
+    # Memory: peak while building, and what the window retains once built
+    _settle(app)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    window = FileSelectionGUI(files)
+    _, peak = tracemalloc.get_traced_memory()
+    _settle(app)
+    after = tracemalloc.take_snapshot()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    tracemalloc.stop()
+    suite.record("memory.construct", n_files, peak_bytes=peak, retained_bytes=retained)
+    print(f"  {'memory.construct':<32} {n_files:>8}  peak {peak / 1e6:>8.1f} MB"
+          f"  retained {retained / 1e6:>8.1f} MB", flush=True)
+
+    def fresh(state_fn):
+        def setup():
+            state_fn()
+            _settle(app)
+        return setup
+
+    suite.run("tree.select_all", n_files, lambda _: window.select_all(),
+              setup=fresh(window.deselect_all))
+    suite.run("tree.deselect_all", n_files, lambda _: window.deselect_all(),
+              setup=fresh(window.select_all))
+
+    folder, folder_files = _largest_folder(window)
+    # setCheckState goes through itemChanged -> handle_item_changed, as a click does
+    suite.run("tree.check_large_folder", n_files,
+              lambda _: folder.setCheckState(0, QtCore.Qt.Checked),
+              setup=fresh(window.deselect_all), files=folder_files)
+    suite.run("tree.uncheck_large_folder", n_files,
+              lambda _: folder.setCheckState(0, QtCore.Qt.Unchecked),
+              setup=fresh(lambda: folder.setCheckState(0, QtCore.Qt.Checked)), files=folder_files)
+
+    window.select_all()
+    _settle(app)
+    selected = window.get_selected_files()
+
+    def drop_order_cache():
+        window.selected_files_order = None
+    suite.run("tree.get_selected_files", n_files, lambda _: window.get_selected_files(),
+              setup=drop_order_cache, files=len(selected))
+    suite.run("tree.get_selected_files.cached", n_files, window.get_selected_files,
+              files=len(selected))
+
+    window.save_prefs()
+    prefs_lines = sum(1 for _ in open(".aicodeprep-gui", encoding="utf-8"))
+    suite.run("prefs.load_button", n_files, lambda _: window.load_from_prefs_button_clicked(),
+              setup=fresh(window.deselect_all), files=len(selected), prefs_lines=prefs_lines)
+
+    _dispose(app, window)
+    os.remove(".aicodeprep-gui")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the aicodeprep-gui window headlessly.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated repo sizes, e.g. 1k,10k,100k (default: {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per benchmark (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds first (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic repo seed (default: 0)")
+    parser.add_argument("--cache-dir", default=None,
+                        help=f"Where synthetic repos are kept (default: {synthetic_repo.default_cache_dir()})")
+    parser.add_argument("-o", "--output", help="Results JSON path (default: benchmarks/results/gui-<time>.json)")
+    args = parser.parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+
+    logging.basicConfig(level=logging.WARNING)
+    from PySide6 import QtCore, QtWidgets
+    settings_dir = tempfile.mkdtemp(prefix="aicodeprep-bench-settings-")
+    for fmt in (QtCore.QSettings.NativeFormat, QtCore.QSettings.IniFormat):
+        QtCore.QSettings.setPath(fmt, QtCore.QSettings.UserScope, settings_dir)
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    suite = harness.Suite("gui", repeat=args.repeat, warmup=args.warmup)
+    start_dir = os.getcwd()
+    try:
+        for n_files in parse_sizes(args.sizes):
+            bench_size(suite, app, n_files, args.seed, args.cache_dir)
+    finally:
+        os.chdir(start_dir)
+    suite.write(output)
+
+
+if __name__ == "__main__":
+    main()
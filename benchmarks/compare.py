@@ -0,0 +1,29 @@
+"""
+Compare two benchmark result files:
+
+    python -m benchmarks.compare before.json after.json [--threshold 0.05]
+
+Exits with status 1 when any benchmark's median got slower than the threshold.
+"""
+import argparse
+import os
+import sys
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="Relative median change treated as noise (default: 0.05)")
+    args = parser.parse_args(argv)
+    return 1 if harness.compare(args.old, args.new, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
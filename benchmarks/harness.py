@@ -0,0 +1,130 @@
+"""
+Timing, result files and run-to-run comparison shared by the benchmark scripts.
+
+A Suite runs each benchmark a few warmup rounds and then `repeat` timed
+rounds with the garbage collector paused, and records min / median / mean /
+stdev in milliseconds. Results are written as JSON together with the machine,
+Python and git revision they came from; compare() lines two result files up
+by (benchmark, size) and reports the change in median.
+"""
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "git": _git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+class Suite:
+    def __init__(self, name, repeat=5, warmup=1, quiet=False):
+        self.name = name
+        self.repeat = repeat
+        self.warmup = warmup
+        self.quiet = quiet
+        self.results = []
+
+    def run(self, benchmark, size, func, setup=None, repeat=None, **extra):
+        """
+        Time func() `repeat` times. setup(), if given, runs untimed before every
+        round and its return value is passed to func. Returns the last result.
+        """
+        repeat = repeat or self.repeat
+        times, value = [], None
+        for round_no in range(self.warmup + repeat):
+            arg = setup() if setup else None
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                value = func(arg) if setup else func()
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            if round_no >= self.warmup:
+                times.append(elapsed * 1000)
+        record = {
+            "benchmark": benchmark,
+            "size": size,
+            "repeat": repeat,
+            "min_ms": round(min(times), 3),
+            "median_ms": round(statistics.median(times), 3),
+            "mean_ms": round(statistics.fmean(times), 3),
+            "stdev_ms": round(statistics.stdev(times), 3) if len(times) > 1 else 0.0,
+        }
+        record.update(extra)
+        self.results.append(record)
+        if not self.quiet:
+            print(f"  {benchmark:<32} {str(size):>8}  median {record['median_ms']:>10.2f} ms"
+                  f"  min {record['min_ms']:>10.2f} ms", flush=True)
+        return value
+
+    def record(self, benchmark, size, **values):
+        """Add a non-timing measurement (e.g. peak memory) to the results."""
+        self.results.append(dict({"benchmark": benchmark, "size": size}, **values))
+
+    def write(self, path=None):
+        if path is None:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(RESULTS_DIR, f"{self.name}-{stamp}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"suite": self.name, "environment": environment(),
+                       "results": self.results}, f, indent=2)
+        print(f"Results written to {path}")
+        return path
+
+
+def compare(old_path, new_path, threshold=0.05, out=sys.stdout):
+    """
+    Print the median change for every benchmark present in both files.
+    Changes smaller than threshold (a fraction) are reported as unchanged.
+    Returns the number of regressions.
+    """
+    def load(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {(r["benchmark"], str(r["size"])): r for r in data["results"] if "median_ms" in r}
+
+    old, new = load(old_path), load(new_path)
+    regressions = 0
+    print(f"{'benchmark':<32} {'size':>8} {'old ms':>10} {'new ms':>10} {'change':>8}", file=out)
+    for key in sorted(set(old) & set(new)):
+        before, after = old[key]["median_ms"], new[key]["median_ms"]
+        change = (after - before) / before if before else 0.0
+        verdict = ""
+        if change > threshold:
+            verdict = "slower"
+            regressions += 1
+        elif change < -threshold:
+            verdict = "faster"
+        print(f"{key[0]:<32} {key[1]:>8} {before:>10.2f} {after:>10.2f} {change:>+7.1%} {verdict}",
+              file=out)
+    for key in sorted(set(old) ^ set(new)):
+        print(f"{key[0]:<32} {key[1]:>8}  only in {'old' if key in old else 'new'} results", file=out)
+    return regressions
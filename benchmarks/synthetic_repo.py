@@ -0,0 +1,203 @@
+"""
+Deterministic synthetic repositories for the benchmarks.
+
+generate(root, n_files, seed) lays out n_files files whose shape resembles a
+real project: source packages several levels deep, docs and configs at the
+top, plus the things the scanner has to cope with: excluded directories
+(node_modules, .git, __pycache__, build output), binary assets and a few
+files over max_file_size. The same (n_files, seed) always produces the same
+tree byte for byte, so timings from different runs are comparable.
+
+Generated trees are cached: a manifest records what was built, and a tree
+with a matching manifest is reused instead of being written again.
+"""
+import json
+import os
+import random
+import shutil
+import tempfile
+
+GENERATOR_VERSION = 1
+MANIFEST = ".synthetic-repo.json"
+
+# (share of files, kind); shares sum to 1
+MIX = [
+    (0.52, "source"),
+    (0.06, "docs"),
+    (0.04, "config"),
+    (0.20, "excluded"),
+    (0.12, "binary"),
+    (0.05, "data"),
+    (0.01, "large"),
+]
+
+SOURCE_EXTENSIONS = [".py", ".js", ".ts", ".tsx", ".go", ".rs", ".java", ".c", ".h", ".css"]
+CONFIG_NAMES = ["config.yaml", "settings.toml", "package.json", "tsconfig.json", ".env.example", "Makefile"]
+EXCLUDED_DIRS = ["node_modules", ".git/objects", "__pycache__", "build", "dist", ".venv/lib"]
+BINARY_EXTENSIONS = [".png", ".jpg", ".woff2", ".pdf", ".so", ".pyc"]
+WORDS = ("data value result config handler request response client server index "
+         "cache token parse render build update create delete select filter "
+         "model view route event stream buffer queue worker thread").split()
+LARGE_FILE_BYTES = 4_200_000  # just over the default max_file_size
+MAX_LARGE_FILES = 20  # keeps the 1M-file tree to a few GB
+
+
+def default_cache_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), "aicodeprep-bench")
+
+
+def _source_text(rng, ext, lines):
+    comment = "#" if ext == ".py" else "//"
+    out = [f"{comment} generated module"]
+    for i in range(lines):
+        a, b = rng.choice(WORDS), rng.choice(WORDS)
+        if ext == ".py":
+            out.append(f"def {a}_{b}_{i}(x):\n    return x + {i}  # {rng.choice(WORDS)}")
+        else:
+            out.append(f"function {a}_{b}_{i}(x) {{ return x + {i}; }} {comment} {rng.choice(WORDS)}")
+    return "\n".join(out) + "\n"
+
+
+def _prose(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "\n"
+
+
+def _dir_for(rng, kind, pkgs):
+    if kind == "excluded":
+        base = rng.choice(EXCLUDED_DIRS)
+        return os.path.join(base, f"pkg{rng.randrange(200)}", f"m{rng.randrange(20)}")
+    if kind in ("docs",):
+        return rng.choice(["", "docs", os.path.join("docs", "guide")])
+    if kind == "config":
+        return rng.choice(["", "config", os.path.join("services", f"svc{rng.randrange(8)}")])
+    if kind in ("binary", "large"):
+        return rng.choice(["assets", os.path.join("assets", "img"), os.path.join("static", "fonts")])
+    if kind == "data":
+        return rng.choice(["data", os.path.join("data", "fixtures")])
+    return rng.choice(pkgs)
+
+
+def _packages(rng, n_files):
+    """Source directories: a few top-level packages, nested up to seven levels."""
+    count = max(4, n_files // 40)
+    pkgs = []
+    for i in range(count):
+        depth = min(7, 1 + int(rng.expovariate(0.6)))
+        parts = ["src", f"pkg{i % 50}"] + [f"{rng.choice(WORDS)}{rng.randrange(10)}" for _ in range(depth - 1)]
+        pkgs.append(os.path.join(*parts))
+    return pkgs
+
+
+def plan(n_files, seed=0):
+    """The (relative path, kind, size hint) of every file, without touching disk."""
+    rng = random.Random(seed)
+    pkgs = _packages(rng, n_files)
+    entries, seen = [], set()
+    counts = [int(share * n_files) if kind != "large" else min(MAX_LARGE_FILES, max(1, n_files // 100))
+              for share, kind in MIX]
+    counts[0] += n_files - sum(counts)
+    for (share, kind), count in zip(MIX, counts):
+        i = 0
+        while i < count:
+            directory = _dir_for(rng, kind, pkgs)
+            if kind == "source":
+                name = f"{rng.choice(WORDS)}_{rng.randrange(10_000)}{rng.choice(SOURCE_EXTENSIONS)}"
+            elif kind == "excluded":
+                name = f"{rng.choice(WORDS)}_{rng.randrange(10_000)}.js"
+            elif kind == "docs":
+                name = f"{rng.choice(WORDS).upper()}_{rng.randrange(1000)}.md"
+            elif kind == "config":
+                name = f"{rng.randrange(1000)}_{rng.choice(CONFIG_NAMES)}"
+            elif kind == "binary":
+                name = f"{rng.choice(WORDS)}_{rng.randrange(10_000)}{rng.choice(BINARY_EXTENSIONS)}"
+            elif kind == "data":
+                name = f"{rng.choice(WORDS)}_{rng.randrange(10_000)}.{rng.choice(['csv', 'json'])}"
+            else:
+                name = f"bundle_{rng.randrange(10_000)}.js"
+            rel_path = os.path.join(directory, name) if directory else name
+            if rel_path in seen:
+                continue
+            seen.add(rel_path)
+            # Roughly log-normal file sizes, as in real trees
+            size = LARGE_FILE_BYTES if kind == "large" else int(min(200_000, rng.lognormvariate(7.5, 1.0)))
+            entries.append((rel_path, kind, size))
+            i += 1
+    return entries
+
+
+def _write(abs_path, rng, kind, size, rel_path):
+    ext = os.path.splitext(rel_path)[1]
+    if kind == "binary":
+        head = b"\x89PNG\r\n\x1a\n\x00\x00" if ext == ".png" else b"\x00\x01\x02\x03"
+        n = max(0, min(size, 20_000) - len(head))
+        data = head + rng.getrandbits(8 * n).to_bytes(n, "little") if n else head
+        with open(abs_path, "wb") as f:
+            f.write(data)
+        return
+    if kind == "large":
+        chunk = _source_text(rng, ".js", 200)
+        with open(abs_path, "w", encoding="utf-8") as f:
+            f.write(chunk * (size // len(chunk) + 1))
+        return
+    if kind in ("source", "excluded"):
+        text = _source_text(rng, ext, max(1, size // 60))
+    elif kind == "data" and ext == ".csv":
+        text = "id,name,value\n" + "".join(f"{i},{rng.choice(WORDS)},{rng.random():.4f}\n"
+                                          for i in range(max(1, size // 24)))
+    elif kind == "data":
+        text = json.dumps([{"id": i, "name": rng.choice(WORDS)} for i in range(max(1, size // 30))])
+    else:
+        text = _prose(rng, max(5, size // 7))
+    with open(abs_path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def generate(root, n_files, seed=0, force=False):
+    """Create (or reuse) the synthetic repo at root; returns its manifest."""
+    manifest_path = os.path.join(root, MANIFEST)
+    wanted = {"generator": GENERATOR_VERSION, "files": n_files, "seed": seed}
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if {k: manifest.get(k) for k in wanted} == wanted:
+            return manifest
+    if os.path.exists(root):
+        # Only ever delete a tree this module generated
+        if os.listdir(root) and not os.path.exists(manifest_path):
+            raise ValueError(f"{root} exists and is not a synthetic repo; refusing to overwrite it")
+        shutil.rmtree(root)
+    os.makedirs(root)
+    rng = random.Random(seed + 1)
+    made_dirs = set()
+    by_kind, total_bytes = {}, 0
+    for rel_path, kind, size in plan(n_files, seed):
+        abs_path = os.path.join(root, rel_path)
+        directory = os.path.dirname(abs_path)
+        if directory not in made_dirs:
+            os.makedirs(directory, exist_ok=True)
+            made_dirs.add(directory)
+        _write(abs_path, rng, kind, size, rel_path)
+        by_kind[kind] = by_kind.get(kind, 0) + 1
+        total_bytes += os.path.getsize(abs_path)
+    manifest = dict(wanted, by_kind=by_kind, bytes=total_bytes, directories=len(made_dirs))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def repo_for(n_files, seed=0, cache_dir=None):
+    """Path of the cached synthetic repo for (n_files, seed), generating it if needed."""
+    root = os.path.join(cache_dir or default_cache_dir(), f"repo-{n_files}-s{seed}")
+    generate(root, n_files, seed)
+    return root
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic repository.")
+    parser.add_argument("root")
+    parser.add_argument("files", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="Regenerate even if cached")
+    args = parser.parse_args()
+    print(json.dumps(generate(args.root, args.files, args.seed, args.force), indent=2))
@@ -0,0 +1,52 @@
+import os
+import random
+
+from aicodeprep_gui.gui.settings.preferences import _read_prefs_file, _write_prefs_file
+from aicodeprep_gui.selection_rules import SelectionRules
+
+
+def _universe():
+    paths = []
+    for top in ("src", "tests", "docs"):
+        for sub in ("", "core", "util", os.path.join("util", "deep")):
+            for i in range(6):
+                paths.append(os.path.join(top, sub, f"f{i}.py") if sub else os.path.join(top, f"f{i}.py"))
+    return paths + ["README.md", "setup.py"]
+
+
+def test_from_selection_selects_exactly_the_given_files():
+    universe = _universe()
+    rng = random.Random(0)
+    outside = [os.path.join("vendor", "lib.py"), "notes.txt"]
+    cases = [
+        [],
+        list(universe),
+        [p for p in universe if p.startswith("src" + os.sep)],
+        [p for p in universe if not p.startswith(os.path.join("src", "util"))],
+    ] + [[p for p in universe if rng.random() < share] for share in (0.1, 0.5, 0.9) for _ in range(5)]
+    for selected in cases + [cases[2] + outside]:
+        rules = SelectionRules.from_selection(selected, universe)
+        for path in universe + outside:
+            assert rules.is_selected(path) == (path in selected), path
+        # The saved lines read back as the same rules
+        assert SelectionRules(rules.lines()) == rules
+    # Whole folders become one rule rather than one line per file
+    assert len(SelectionRules.from_selection(cases[2], universe)) == 1
+
+
+def test_legacy_files_section_round_trips(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    files = [os.path.join("src", "main.py"), os.path.join("src", "util", "helpers.py"), "README.md"]
+    (tmp_path / ".aicodeprep-gui").write_text(
+        "version=1.0\n\n[window]\nwidth=900\nheight=700\n\n"
+        "[format]\noutput_format=markdown\n\n[files]\n" + "\n".join(files) + "\n",
+        encoding="utf-8")
+    selection, window_size, splitter_state, output_format = _read_prefs_file()
+    assert sorted(selection.lines()) == sorted(files)
+    assert all(selection.is_selected(path) for path in files)
+    assert not selection.is_selected(os.path.join("src", "other.py"))
+
+    _write_prefs_file(selection, window_size, splitter_state, output_format)
+    text = (tmp_path / ".aicodeprep-gui").read_text(encoding="utf-8")
+    assert "[selection]" in text and "[files]" not in text
+    assert _read_prefs_file() == (selection, (900, 700), None, "markdown")